@@ -1,5 +1,12 @@
 __version__ = "0.3.2"
 
-from epopt.cvxpy_solver import solve
-from epopt.functions import *
-from epopt.prox import eval_prox
+try:
+    import cvxpy
+except ImportError:
+    # The CVXPY interface is optional, problems can also be built with
+    # epopt.model
+    pass
+else:
+    from epopt.cvxpy_solver import solve
+    from epopt.functions import *
+    from epopt.prox import eval_prox
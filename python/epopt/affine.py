@@ -52,6 +52,11 @@ class LinearMapType(object):
         if self.linear_map.linear_map_type == LinearMap.TRANSPOSE:
             A = LinearMapType(self.linear_map.arg[0])
             return A.eval_ops()
+        if self.linear_map.linear_map_type in (
+                LinearMap.SELECT, LinearMap.PERMUTE, LinearMap.SCATTER):
+            # Selections are a special case of sparse matrices
+            return LinearMapType(
+                LinearMap(linear_map_type=LinearMap.SPARSE_MATRIX))
         return self
 
     def copy(self):
@@ -74,7 +79,7 @@ class LinearMapType(object):
 
         if self.kronecker_product:
             return add_kronecker(self, B)
-        if B.kronecker_pdocut:
+        if B.kronecker_product:
             return add_kronecker(B, self)
 
         return dense_type()
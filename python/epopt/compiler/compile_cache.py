@@ -0,0 +1,200 @@
+"""On-disk cache of compiled problems keyed by structural fingerprint.
+
+The fingerprint covers the structure of the converted problem including
+shapes, signs, scalar constants and the identity of parameters, but not the
+values of dense and sparse constants. Before compilation, constant locations
+are replaced by placeholders and variable/parameter ids by canonical ids, so
+that a cached problem can be re-bound to the constants and variables of a new
+instance of the same model.
+"""
+
+import cPickle as pickle
+import errno
+import hashlib
+import logging
+import os
+import tempfile
+
+from epopt import __version__
+from epopt import expression
+from epopt.compiler import compiler
+from epopt.proto.epsilon import expression_pb2
+from epopt.proto.epsilon import solver_params_pb2
+from epopt.proto.epsilon.expression_pb2 import Expression
+
+PLACEHOLDER_PREFIX = "/cache/"
+VARIABLE_PREFIX = "cache:var:"
+PARAMETER_PREFIX = "cache:param:"
+
+# Version of the compiled problem format, part of the fingerprint. Bump this
+# whenever the output of the compiler or its transforms changes so that
+# entries written by an older compiler are no longer used.
+COMPILED_FORMAT_VERSION = 1
+
+class Bindings(object):
+    """Maps the canonical form of a problem to a particular instance."""
+    def __init__(self, data):
+        self.instance_data = data
+
+        # Placeholder locations and their values
+        self.locations = {}
+        self.data = {}
+
+        # Canonical variable/parameter ids to those of the instance
+        self.canonical_ids = {}
+        self.ids = {}
+
+    def location(self, location):
+        if location not in self.locations:
+            placeholder = PLACEHOLDER_PREFIX + str(len(self.locations))
+            self.locations[location] = placeholder
+            self.data[placeholder] = self.instance_data[location]
+        return self.locations[location]
+
+    def canonical_id(self, instance_id, prefix):
+        if instance_id not in self.canonical_ids:
+            canonical_id = prefix + str(len(self.canonical_ids))
+            self.canonical_ids[instance_id] = canonical_id
+            self.ids[canonical_id] = instance_id
+        return self.canonical_ids[instance_id]
+
+def canonicalize_constant(c, bindings):
+    if c.data_location:
+        c.data_location = bindings.location(c.data_location)
+    if c.parameter_id:
+        c.parameter_id = bindings.canonical_id(c.parameter_id, PARAMETER_PREFIX)
+
+def canonicalize_linear_map(A, bindings):
+    if A.HasField("constant"):
+        canonicalize_constant(A.constant, bindings)
+    for arg in A.arg:
+        canonicalize_linear_map(arg, bindings)
+
+def canonicalize_expr(expr, bindings):
+    proto = expression_pb2.Expression()
+    proto.CopyFrom(expr.proto)
+    if proto.expression_type == Expression.VARIABLE:
+        proto.variable.variable_id = bindings.canonical_id(
+            proto.variable.variable_id, VARIABLE_PREFIX)
+    if proto.HasField("constant"):
+        canonicalize_constant(proto.constant, bindings)
+    if proto.HasField("linear_map"):
+        canonicalize_linear_map(proto.linear_map, bindings)
+
+    return expression.from_proto(
+        proto,
+        [canonicalize_expr(arg, bindings) for arg in expr.arg],
+        {})
+
+def canonicalize(problem):
+    """Returns the canonical form of problem and its bindings."""
+    bindings = Bindings(problem.expression_data())
+    objective = canonicalize_expr(problem.objective, bindings)
+    constraint = [canonicalize_expr(c, bindings) for c in problem.constraint]
+    objective.data = bindings.data
+    return expression.Problem(objective, constraint), bindings
+
+def fingerprint(canonical_problem, params):
+    """Fingerprint of a canonical problem and the parameters compiling it."""
+    key_params = solver_params_pb2.SolverParams()
+    key_params.CopyFrom(params)
+    key_params.ClearField("compile_cache_dir")
+
+    h = hashlib.sha1()
+    h.update(__version__)
+    h.update(str(COMPILED_FORMAT_VERSION))
+    h.update(key_params.SerializeToString())
+    h.update(canonical_problem.SerializeToString())
+    return h.hexdigest()
+
+def bind_constant(c, bindings):
+    if c.parameter_id:
+        c.parameter_id = bindings.ids[c.parameter_id]
+
+def bind_linear_map(A, bindings):
+    if A.HasField("constant"):
+        bind_constant(A.constant, bindings)
+    for arg in A.arg:
+        bind_linear_map(arg, bindings)
+
+def bind_expr(proto, bindings):
+    """Convert proto to an Expression, replacing canonical ids."""
+    expr_proto = expression_pb2.Expression()
+    expr_proto.CopyFrom(proto)
+    del expr_proto.arg[:]
+    if expr_proto.expression_type == Expression.VARIABLE:
+        # Variables introduced by the compiler keep their canonical ids
+        variable_id = expr_proto.variable.variable_id
+        expr_proto.variable.variable_id = bindings.ids.get(
+            variable_id, variable_id)
+    if expr_proto.HasField("constant"):
+        bind_constant(expr_proto.constant, bindings)
+    if expr_proto.HasField("linear_map"):
+        bind_linear_map(expr_proto.linear_map, bindings)
+
+    return expression.from_proto(
+        expr_proto,
+        [bind_expr(arg, bindings) for arg in proto.arg],
+        {})
+
+def bind(compiled, bindings):
+    """Bind a compiled canonical problem to an instance."""
+    proto = expression_pb2.Problem.FromString(compiled["problem"])
+    objective = bind_expr(proto.objective, bindings)
+    objective.data = dict(compiled["data"])
+    objective.data.update(bindings.data)
+    return expression.Problem(
+        objective,
+        [bind_expr(c, bindings) for c in proto.constraint])
+
+def cache_path(cache_dir, key):
+    return os.path.join(cache_dir, key + ".pkl")
+
+def load(cache_dir, key):
+    try:
+        with open(cache_path(cache_dir, key), "rb") as f:
+            return pickle.load(f)
+    except IOError:
+        return None
+
+def store(cache_dir, key, compiled):
+    try:
+        os.makedirs(cache_dir)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+    # Write to a temporary file first so that concurrent readers never see a
+    # partially written entry.
+    with tempfile.NamedTemporaryFile(
+            dir=cache_dir, suffix=".tmp", delete=False) as f:
+        pickle.dump(compiled, f, pickle.HIGHEST_PROTOCOL)
+    os.rename(f.name, cache_path(cache_dir, key))
+
+def compile_problem(problem, params):
+    """Compile problem, using the cache in params.compile_cache_dir."""
+    canonical_problem, bindings = canonicalize(problem)
+    key = fingerprint(canonical_problem, params)
+    compiled = load(params.compile_cache_dir, key)
+    if compiled is not None:
+        logging.debug("compile cache hit: %s", key)
+        return bind(compiled, bindings)
+
+    logging.debug("compile cache miss: %s", key)
+    problem = compiler.compile_problem(canonical_problem, params)
+    compiled = {
+        "problem": problem.SerializeToString(),
+        "data": {location: value for location, value in
+                 problem.expression_data().iteritems()
+                 if not location.startswith(PLACEHOLDER_PREFIX)},
+    }
+
+    # Presolve computes values from the constants of this instance so the
+    # result can not be re-bound to others.
+    if not problem.fixed_values:
+        store(params.compile_cache_dir, key, compiled)
+
+    retval = bind(compiled, bindings)
+    retval.fixed_values = {bindings.ids[var_id]: value for var_id, value in
+                           problem.fixed_values.iteritems()}
+    return retval
@@ -0,0 +1,65 @@
+
+import os
+import shutil
+import tempfile
+
+import cvxpy as cp
+import numpy as np
+from nose.tools import assert_equal, assert_not_equal
+
+from epopt import cvxpy_expr
+from epopt import cvxpy_solver
+from epopt.compiler import compile_cache
+from epopt.proto.epsilon.solver_params_pb2 import SolverParams
+
+def create_lasso(m, n):
+    A = np.random.randn(m, n)
+    b = np.random.randn(m)
+    x = cp.Variable(n)
+    return cp.Problem(cp.Minimize(cp.sum_squares(A*x - b) + cp.norm1(x)))
+
+def fingerprint(cvxpy_problem, params=SolverParams()):
+    canonical_problem, _ = compile_cache.canonicalize(
+        cvxpy_expr.convert_problem(cvxpy_problem))
+    return compile_cache.fingerprint(canonical_problem, params)
+
+def test_fingerprint():
+    np.random.seed(0)
+    key = fingerprint(create_lasso(5, 10))
+    assert_equal(key, fingerprint(create_lasso(5, 10)))
+    assert_not_equal(key, fingerprint(create_lasso(5, 20)))
+    assert_not_equal(
+        key, fingerprint(create_lasso(5, 10), SolverParams(presolve=False)))
+
+def test_compile_cache():
+    cache_dir = tempfile.mkdtemp()
+    try:
+        np.random.seed(0)
+        for i in xrange(2):
+            problem = create_lasso(5, 10)
+            cvxpy_solver.solve(problem, compile_cache_dir=cache_dir)
+            x0 = problem.variables()[0].value
+            cvxpy_solver.solve(problem)
+            x1 = problem.variables()[0].value
+            np.testing.assert_allclose(x1, x0)
+            assert_equal(1, len(os.listdir(cache_dir)))
+    finally:
+        shutil.rmtree(cache_dir)
+
+def test_compiled_format_version():
+    cache_dir = tempfile.mkdtemp()
+    version = compile_cache.COMPILED_FORMAT_VERSION
+    try:
+        np.random.seed(0)
+        problem = create_lasso(5, 10)
+        key = fingerprint(problem)
+        cvxpy_solver.solve(problem, compile_cache_dir=cache_dir)
+        assert_equal(1, len(os.listdir(cache_dir)))
+
+        compile_cache.COMPILED_FORMAT_VERSION = version + 1
+        assert_not_equal(key, fingerprint(problem))
+        cvxpy_solver.solve(problem, compile_cache_dir=cache_dir)
+        assert_equal(2, len(os.listdir(cache_dir)))
+    finally:
+        compile_cache.COMPILED_FORMAT_VERSION = version
+        shutil.rmtree(cache_dir)
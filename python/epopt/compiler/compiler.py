@@ -1,8 +1,10 @@
 import logging
 
 from epopt import tree_format
+from epopt.compiler.transforms import presolve
 from epopt.compiler.transforms import prox
 from epopt.compiler.transforms import separate
+from epopt.compiler.transforms import simplify
 from epopt.compiler.transforms import split
 from epopt.proto.epsilon import solver_params_pb2
 
@@ -11,7 +13,9 @@ from epopt.proto.epsilon import solver_params_pb2
 
 TRANSFORMS = [
     prox.transform_problem,
+    simplify.transform_problem,
     separate.transform_problem,
+    presolve.transform_problem,
 ]
 
 def transform_name(transform):
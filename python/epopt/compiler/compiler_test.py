@@ -1,6 +1,9 @@
 
 from nose.tools import assert_items_equal, assert_equal
 
+import cvxpy as cp
+import numpy as np
+
 from epopt import cvxpy_expr
 from epopt.compiler import compiler
 from epopt.compiler import validate
@@ -8,7 +11,8 @@ from epopt.problems import basis_pursuit
 from epopt.problems import least_abs_dev
 from epopt.problems import tv_1d
 from epopt.problems import tv_denoise
-from epopt.proto.epsilon.expression_pb2 import Expression, ProxFunction
+from epopt.proto.epsilon.expression_pb2 import Expression, LinearMap, ProxFunction
+from epopt.proto.epsilon.solver_params_pb2 import SolverParams
 
 Prox = ProxFunction
 
@@ -55,3 +59,158 @@ def test_tv_1d():
         prox_ops(problem.objective),
         [Prox.TOTAL_VARIATION_1D] + [Prox.SUM_SQUARE])
     assert_equal(1, len(problem.constraint))
+
+def test_fuse_prox():
+    np.random.seed(0)
+    A = np.random.randn(10, 5)
+    b = np.random.randn(10)
+    x = cp.Variable(5)
+    cvxpy_problem = cp.Problem(
+        cp.Minimize(cp.sum_squares(A*x - b) + cp.norm1(x)), [x >= 0])
+
+    problem = compiler.compile_problem(cvxpy_expr.convert_problem(
+        cvxpy_problem))
+    assert_items_equal(
+        prox_ops(problem.objective),
+        [Prox.SUM_SQUARE, Prox.FUSED])
+    assert_equal(1, len(problem.constraint))
+
+    problem = compiler.compile_problem(
+        cvxpy_expr.convert_problem(cvxpy_problem),
+        SolverParams(fuse_prox=False))
+    assert_items_equal(
+        prox_ops(problem.objective),
+        [Prox.SUM_SQUARE, Prox.NORM_1, Prox.NON_NEGATIVE])
+    assert_equal(2, len(problem.constraint))
+
+def test_presolve():
+    np.random.seed(0)
+    A = np.random.randn(10, 5)
+    B = np.random.randn(3, 5)
+    b = np.random.randn(10)
+    x = cp.Variable(5)
+    y = cp.Variable(3)
+    cvxpy_problem = cp.Problem(
+        cp.Minimize(cp.sum_squares(A*x - b) + cp.norm1(y)),
+        [y == 2, B*x == y, B*x == y])
+
+    problem = compiler.compile_problem(cvxpy_expr.convert_problem(
+        cvxpy_problem))
+    assert_items_equal(
+        prox_ops(problem.objective),
+        [Prox.SUM_SQUARE])
+    assert_equal(1, len(problem.constraint))
+    assert_equal(1, len(problem.fixed_values))
+    np.testing.assert_allclose(
+        2*np.ones(3), problem.fixed_values[cvxpy_expr.variable_id(y)])
+
+    problem = compiler.compile_problem(
+        cvxpy_expr.convert_problem(cvxpy_problem),
+        SolverParams(presolve=False))
+    assert_items_equal(
+        prox_ops(problem.objective),
+        [Prox.SUM_SQUARE, Prox.NORM_1])
+    assert_equal(3, len(problem.constraint))
+
+def test_presolve_infeasible():
+    x = cp.Variable(1)
+    y = cp.Variable(1)
+    objective = cp.Minimize(cp.sum_squares(y-1) + cp.norm1(x))
+
+    # x >= 0 is violated at the fixed value and so x is left to the solver
+    problem = compiler.compile_problem(cvxpy_expr.convert_problem(
+        cp.Problem(objective, [x == -1, x >= 0, y >= x])))
+    assert_items_equal(
+        prox_ops(problem.objective),
+        [Prox.SUM_SQUARE, Prox.FUSED, Prox.NON_NEGATIVE])
+    assert_equal(0, len(problem.fixed_values))
+
+    problem = compiler.compile_problem(cvxpy_expr.convert_problem(
+        cp.Problem(objective, [x == 1, x >= 0, y >= x])))
+    assert_items_equal(
+        prox_ops(problem.objective),
+        [Prox.SUM_SQUARE, Prox.NON_NEGATIVE])
+    np.testing.assert_allclose(
+        np.ones(1), problem.fixed_values[cvxpy_expr.variable_id(x)])
+
+def linear_maps(expr):
+    retval = []
+    for arg in expr.arg:
+        retval += linear_maps(arg)
+    if expr.expression_type == Expression.LINEAR_MAP:
+        retval.append(expr.linear_map.linear_map_type)
+    return retval
+
+def problem_linear_maps(problem):
+    retval = linear_maps(problem.objective)
+    for constr in problem.constraint:
+        retval += linear_maps(constr)
+    return retval
+
+def test_simplify_linear_maps():
+    np.random.seed(0)
+    A = np.random.randn(2, 3)
+    B = np.random.randn(4, 5)
+    C = np.random.randn(2, 5)
+    D = np.random.randn(2, 4)
+    X = cp.Variable(3, 4)
+    cvxpy_problem = cp.Problem(cp.Minimize(
+        cp.sum_squares(A*X*B - C) +
+        cp.norm1(cp.diag(X[:, 0:3])) +
+        cp.sum_squares(cp.vstack(X, D)[3:5, :])))
+
+    problem = compiler.compile_problem(cvxpy_expr.convert_problem(
+        cvxpy_problem))
+    assert_items_equal(
+        problem_linear_maps(problem),
+        [LinearMap.KRONECKER_PRODUCT, LinearMap.SELECT, LinearMap.SCALAR])
+
+    problem = compiler.compile_problem(
+        cvxpy_expr.convert_problem(cvxpy_problem),
+        SolverParams(simplify_linear_maps=False))
+    assert_items_equal(
+        problem_linear_maps(problem),
+        2*[LinearMap.KRONECKER_PRODUCT] + 3*[LinearMap.SELECT] +
+        2*[LinearMap.SCATTER] + 2*[LinearMap.SCALAR])
+
+def test_prox_rule_dispatch():
+    np.random.seed(0)
+    m = 20
+    A = np.random.randn(m, 5)
+    x = cp.Variable(5)
+    y = cp.Variable(5)
+    losses = [cp.sum_entries(cp.logistic(A[i]*x)) for i in xrange(m)]
+    # The same structure with the quantile arguments differing in their data
+    quantiles = [
+        cp.sum_entries(cp.max_elemwise(0.2*(A[0]*y), -0.8*(A[i]*y)))
+        for i in xrange(2)]
+    cvxpy_problem = cp.Problem(cp.Minimize(
+        sum(losses) + sum(quantiles) + cp.norm2(x) + cp.norm1(y)))
+
+    problem = compiler.compile_problem(
+        cvxpy_expr.convert_problem(cvxpy_problem),
+        SolverParams(fuse_prox=False))
+    assert_items_equal(
+        prox_ops(problem.objective),
+        m*[Prox.SUM_LOGISTIC] + [Prox.SUM_QUANTILE, Prox.NORM_2, Prox.NORM_1] +
+        # Conic form of the second quantile term
+        [Prox.AFFINE] + 2*[Prox.CONSTANT] + 2*[Prox.NON_NEGATIVE])
+
+def test_prox_rule_dispatch_order():
+    np.random.seed(0)
+    A = np.random.randn(2, 5)
+    y = cp.Variable(5)
+    # The term not matching sum_quantile comes first and must not determine
+    # the rule for the second of the same structure
+    quantiles = [
+        cp.sum_entries(cp.max_elemwise(0.2*(A[0]*y), -0.8*(A[i]*y)))
+        for i in (1, 0)]
+    cvxpy_problem = cp.Problem(cp.Minimize(sum(quantiles) + cp.norm1(y)))
+
+    problem = compiler.compile_problem(
+        cvxpy_expr.convert_problem(cvxpy_problem),
+        SolverParams(fuse_prox=False))
+    assert_items_equal(
+        prox_ops(problem.objective),
+        [Prox.SUM_QUANTILE, Prox.NORM_1] +
+        [Prox.AFFINE, Prox.CONSTANT] + 2*[Prox.NON_NEGATIVE])
@@ -31,6 +31,7 @@ class ProblemGraph(object):
         # dict stores count for ordering purposes
         self.node_values = {}
         self.edges = defaultdict(set)
+        self.node_count = 0
 
     @property
     def problem(self):
@@ -54,12 +55,17 @@ class ProblemGraph(object):
             return self.node_values[node_id][1]
 
         if node_id is None:
-            node_id = node_type + str(len(self.node_values))
+            node_id = node_type + str(self.node_count)
         node = Node(expr, node_type, node_id)
-        self.node_values[node_id] = (len(self.node_values), node)
+        self.node_values[node_id] = (self.node_count, node)
+        self.node_count += 1
         return node
 
-    # TODO(mwytock): Add remove_node()
+    def remove_node(self, a):
+        for b_id in self.edges[a.node_id]:
+            self.edges[b_id].remove(a.node_id)
+        del self.edges[a.node_id]
+        del self.node_values[a.node_id]
 
     def nodes(self, node_type):
         return [n for idx, n in sorted(self.node_values.values())
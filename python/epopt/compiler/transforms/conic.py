@@ -3,8 +3,6 @@
 import logging
 from fractions import Fraction
 
-from cvxpy.utilities import power_tools
-
 from epopt import expression
 from epopt import linear_map
 from epopt import tree_format
@@ -81,6 +79,7 @@ def transform_quad_over_lin(expr):
         expression.leq_constraint(expression.scalar_constant(0), y)]
 
 def transform_norm_p(expr):
+    from cvxpy.utilities import power_tools
     p = expr.p
     x = only_arg(expr)
     t = epi_var(expr, "norm_p")
@@ -141,6 +140,7 @@ def transform_norm_nuc(expr):
         expression.eq_constraint(expression.index(T, 0, m, m, m+n), X)]
 
 def transform_power(expr):
+    from cvxpy.utilities import power_tools
     p = expr.p
 
     if p == 1:
@@ -182,6 +182,7 @@ def transform_huber(expr):
     return t, constr
 
 def transform_geo_mean(expr):
+    from cvxpy.utilities import power_tools
     w = [Fraction(x.a, x.b) for x in expr.geo_mean_params.w]
     w_dyad = [Fraction(x.a, x.b) for x in expr.geo_mean_params.w_dyad]
     tree = power_tools.decompose(w_dyad)
@@ -28,9 +28,8 @@ def transform_add(expr):
 
 def transform_index(expr):
     return expression.linear_map(
-        linear_map.kronecker_product(
-            linear_map.index(expr.key[1], dim(only_arg(expr),1)),
-            linear_map.index(expr.key[0], dim(only_arg(expr),0))),
+        linear_map.index_matrix(
+            expr.key[0], expr.key[1], *dims(only_arg(expr))),
         transform_expr(only_arg(expr)))
 
 def multiply_constant(expr, n):
@@ -141,8 +140,7 @@ def transform_hstack(expr):
         ni = dim(arg, 1)
         add_args.append(
             expression.linear_map(
-                linear_map.right_matrix_product(
-                    linear_map.index(slice(offset, offset+ni), n), m),
+                linear_map.hstack_placement(m, n, offset, ni),
                 transform_expr(arg)))
         offset += ni
     return expression.add(*add_args)
@@ -157,10 +155,7 @@ def transform_vstack(expr):
 
         add_args.append(
             expression.linear_map(
-                linear_map.left_matrix_product(
-                    linear_map.transpose(
-                        linear_map.index(slice(offset, offset+mi), m)),
-                    n),
+                linear_map.vstack_placement(m, n, offset, mi),
                 transform_expr(arg)))
         offset += mi
     return expression.add(*add_args)
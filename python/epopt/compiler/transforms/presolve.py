@@ -0,0 +1,349 @@
+"""Presolve the problem in prox-affine form.
+
+Eliminates variables fixed by singleton equality constraints, i.e. those
+involving a single variable with each row having a single nonzero, and removes
+duplicate and empty constraints. The values of the eliminated variables are
+kept in Problem.fixed_values so that the full solution can be recovered.
+
+Functions and constraints which become constant are removed, so variables are
+only eliminated if these are finite at the fixed values. Otherwise, e.g. for
+x == -1 and x >= 0, the variables are left to the solver.
+"""
+
+import logging
+
+import numpy as np
+import scipy.sparse as sp
+
+from epopt import constant
+from epopt import expression
+from epopt import linear_map
+from epopt.compiler.transforms.separate import replace_var, variables
+from epopt.expression_util import *
+from epopt.proto.epsilon.expression_pb2 import (
+    Cone, Constant, Expression, LinearMap, ProxFunction)
+from epopt.util import *
+
+# Tolerance for consistency of values fixed by multiple rows and for
+# constraints evaluated at these values
+FIXED_TOL = 1e-8
+
+# Functions which are finite everywhere, these can be removed once constant
+FINITE_TYPES = set([
+    ProxFunction.AFFINE,
+    ProxFunction.CONSTANT,
+    ProxFunction.SUM_SQUARE,
+    ProxFunction.NORM_1,
+    ProxFunction.SUM_DEADZONE,
+    ProxFunction.SUM_EXP,
+    ProxFunction.SUM_HINGE,
+    ProxFunction.SUM_LOGISTIC,
+    ProxFunction.SUM_QUANTILE,
+    ProxFunction.EXP,
+    ProxFunction.LOG_SUM_EXP,
+    ProxFunction.MAX,
+    ProxFunction.NORM_2,
+    ProxFunction.NORM_INF,
+    ProxFunction.SUM_LARGEST,
+    ProxFunction.TOTAL_VARIATION_1D,
+    ProxFunction.LAMBDA_MAX,
+    ProxFunction.NORM_NUCLEAR,
+    ProxFunction.SIGMA_MAX,
+])
+
+# Indicator functions of cones, as prox functions
+CONE_TYPES = {
+    Cone.ZERO: ProxFunction.ZERO,
+    Cone.NON_NEGATIVE: ProxFunction.NON_NEGATIVE,
+    Cone.SECOND_ORDER: ProxFunction.SECOND_ORDER_CONE,
+    Cone.SEMIDEFINITE: ProxFunction.SEMIDEFINITE,
+}
+
+def load_constant(c, data):
+    """Load a dense or sparse constant as a scipy sparse matrix."""
+    value = data[c.data_location]
+    if c.constant_type == Constant.DENSE_MATRIX:
+        A = np.frombuffer(value, dtype=np.float64).reshape(
+            (c.m, c.n), order="F")
+        return sp.csc_matrix(A)
+
+    if c.constant_type == Constant.SPARSE_MATRIX:
+        indptr = np.frombuffer(value, dtype=np.int32, count=c.n+1)
+        indices = np.frombuffer(
+            value, dtype=np.int32, count=c.nnz, offset=4*(c.n+1))
+        values = np.frombuffer(
+            value, dtype=np.float64, count=c.nnz, offset=4*(c.n+1+c.nnz))
+        return sp.csc_matrix((values, indices, indptr), shape=(c.m, c.n))
+
+    raise ValueError("unknown constant type " + str(c))
+
+def selection_matrix(A):
+    """Sparse form of a SELECT/PERMUTE/SCATTER linear map."""
+    index = linear_map.selection_index(A)
+    k = len(index)
+    if A.linear_map_type == LinearMap.SCATTER:
+        return sp.csc_matrix(
+            (np.ones(k), (index, np.arange(k))), shape=(A.m, A.n))
+    return sp.csc_matrix((np.ones(k), (np.arange(k), index)), shape=(A.m, A.n))
+
+def linear_map_matrix(A, data):
+    if A.linear_map_type in (LinearMap.DENSE_MATRIX, LinearMap.SPARSE_MATRIX):
+        return load_constant(A.constant, data)
+    elif A.linear_map_type == LinearMap.DIAGONAL_MATRIX:
+        return sp.diags(load_constant(A.constant, data).toarray().ravel(
+            order="F"), 0)
+    elif A.linear_map_type == LinearMap.SCALAR:
+        return A.scalar*sp.eye(A.n)
+    elif A.linear_map_type == LinearMap.KRONECKER_PRODUCT:
+        return sp.kron(linear_map_matrix(A.arg[0], data),
+                       linear_map_matrix(A.arg[1], data))
+    elif A.linear_map_type == LinearMap.TRANSPOSE:
+        return linear_map_matrix(A.arg[0], data).T
+    elif A.linear_map_type in (
+            LinearMap.SELECT, LinearMap.PERMUTE, LinearMap.SCATTER):
+        return selection_matrix(A)
+
+    raise ValueError("unknown linear map type " + str(A))
+
+def affine_operator(expr, data, L, A, b):
+    """Accumulate expr = sum_i A[i]*x_i + b, analogous to BuildAffineOperator."""
+    if expr.expression_type in (Expression.ADD, Expression.RESHAPE):
+        for arg in expr.arg:
+            affine_operator(arg, data, L, A, b)
+
+    elif expr.expression_type == Expression.VARIABLE:
+        var_id = expr.variable.variable_id
+        A[var_id] = A[var_id] + L if var_id in A else L
+
+    elif expr.expression_type == Expression.CONSTANT:
+        if not expr.constant.data_location:
+            b += L.dot(expr.constant.scalar*np.ones(L.shape[1]))
+        else:
+            b += L.dot(load_constant(expr.constant, data).toarray().ravel(
+                order="F"))
+
+    elif expr.expression_type == Expression.LINEAR_MAP:
+        affine_operator(
+            only_arg(expr), data,
+            L.dot(linear_map_matrix(expr.linear_map, data)), A, b)
+
+    else:
+        raise ValueError("unknown affine expression " + str(expr))
+
+def has_parameters(expr):
+    if (expr.expression_type == Expression.CONSTANT and
+        expr.constant.parameter_id):
+        return True
+    return any(has_parameters(arg) for arg in expr.arg)
+
+def is_singleton_constraint(expr):
+    if (expr.expression_type != Expression.INDICATOR or
+        expr.cone.cone_type != Cone.ZERO or
+        len(expr.arg) != 1 or
+        has_parameters(expr)):
+        return False
+
+    var_ids = set(x.variable.variable_id for x in variables(expr))
+    if len(var_ids) != 1:
+        return False
+
+    # Only consider maps which can have a single nonzero in each row
+    A = only_arg(expr).affine_props.linear_maps[var_ids.pop()].linear_map
+    return A.linear_map_type in (
+        LinearMap.SPARSE_MATRIX,
+        LinearMap.DIAGONAL_MATRIX,
+        LinearMap.SCALAR)
+
+def fix_values(expr, fixed):
+    """Fix the variable values determined by a singleton constraint.
+
+    Returns False if the constraint does not determine its variable
+    elementwise or is inconsistent with previously fixed values.
+    """
+    var_expr = next(variables(expr))
+    var_id = var_expr.variable.variable_id
+    arg = only_arg(expr)
+
+    A = {}
+    b = np.zeros(dim(arg))
+    affine_operator(
+        arg, expr.expression_data(), sp.eye(dim(arg)).tocsr(), A, b)
+    A = A[var_id].tocsr()
+    A.eliminate_zeros()
+    if np.any(np.diff(A.indptr) != 1):
+        return False
+
+    if var_id not in fixed:
+        fixed[var_id] = (var_expr, np.nan*np.ones(dim(var_expr)))
+    x = fixed[var_id][1]
+
+    # Each row gives A_ij*x_j + b_i = 0
+    x_new = -b/A.data
+    x_old = x[A.indices]
+    idx = ~np.isnan(x_old)
+    if np.any(np.abs(x_old[idx] - x_new[idx]) >
+              FIXED_TOL*(1 + np.abs(x_new[idx]))):
+        return False
+    x[A.indices] = x_new
+    return True
+
+def affine_value(expr, data, fixed):
+    """Value of an affine expression of fixed variables."""
+    A = {}
+    b = np.zeros(dim(expr))
+    affine_operator(expr, data, sp.eye(dim(expr)).tocsr(), A, b)
+    return b + sum(A_i.dot(fixed[var_id][1]) for var_id, A_i in A.items())
+
+def in_cone(prox_function_type, args, data, fixed):
+    """Whether the args of a cone indicator are in the cone, within tolerance.
+
+    Parameter values are not known until solve time, cones with these are
+    assumed not to contain their args.
+    """
+    if any(has_parameters(arg) for arg in args):
+        return False
+
+    values = [affine_value(arg, data, fixed) for arg in args]
+    tol = FIXED_TOL*(1 + max(np.max(np.abs(v)) for v in values))
+
+    if prox_function_type == ProxFunction.ZERO:
+        return np.all(np.abs(values[0]) <= tol)
+    elif prox_function_type == ProxFunction.NON_NEGATIVE:
+        return np.all(values[0] >= -tol)
+    elif prox_function_type == ProxFunction.SECOND_ORDER_CONE:
+        # (t, X) with ||x_i||_2 <= t_i for the rows of X
+        X = values[1].reshape(dims(args[1]), order="F")
+        return np.all(np.sqrt(np.sum(X**2, axis=1)) <= values[0] + tol)
+    elif prox_function_type == ProxFunction.SEMIDEFINITE:
+        X = values[0].reshape(dims(args[0]), order="F")
+        return np.min(np.linalg.eigvalsh((X + X.T)/2)) >= -tol
+
+    raise ValueError("unknown cone " + str(prox_function_type))
+
+def is_finite_prox(prox, args, data, fixed):
+    if prox.epigraph:
+        return False
+    if prox.prox_function_type == ProxFunction.FUSED:
+        return all(is_finite_prox(f, [arg], data, fixed)
+                   for f, arg in zip(prox.fused_function, args))
+    if prox.prox_function_type in FINITE_TYPES:
+        return True
+    if prox.prox_function_type in CONE_TYPES.values():
+        return in_cone(prox.prox_function_type, args, data, fixed)
+
+    # Other functions have a restricted domain, e.g. SUM_NEG_LOG
+    return False
+
+def is_finite(expr, fixed):
+    """Whether a function or constraint of fixed variables is finite at their
+    values and thus can be removed."""
+    data = expr.expression_data()
+    if expr.expression_type == Expression.PROX_FUNCTION:
+        return is_finite_prox(expr.prox_function, expr.arg, data, fixed)
+    if (expr.expression_type == Expression.INDICATOR and
+        expr.cone.cone_type in CONE_TYPES):
+        return in_cone(CONE_TYPES[expr.cone.cone_type], expr.arg, data, fixed)
+    return False
+
+def eliminate_fixed_variables(objective, constraints, fixed_values):
+    """Substitute variables fixed by singleton constraints."""
+    fixed = {}
+    inconsistent = set()
+    for constr in constraints:
+        if not is_singleton_constraint(constr):
+            continue
+
+        # Variables are not fixed if any of their constraints is inconsistent,
+        # leaving these to the solver
+        var_id = next(variables(constr)).variable.variable_id
+        if var_id not in inconsistent and not fix_values(constr, fixed):
+            inconsistent.add(var_id)
+
+    fixed = {var_id: (var_expr, x) for var_id, (var_expr, x) in fixed.items()
+             if var_id not in inconsistent and not np.any(np.isnan(x))}
+
+    # Proximal operators generally require each argument to depend on a
+    # variable, so variables are only eliminated from the objective along
+    # with the entire function. Those of functions and constraints which are
+    # not finite at the fixed values are not eliminated.
+    terms = [(f, set(x.variable.variable_id for x in variables(f)), is_obj)
+             for fs, is_obj in ((objective, True), (constraints, False))
+             for f in fs]
+    while True:
+        keep = set()
+        for f, f_var_ids, is_obj in terms:
+            if not f_var_ids.issubset(fixed):
+                if is_obj:
+                    keep.update(f_var_ids)
+            elif not is_finite(f, fixed):
+                keep.update(f_var_ids)
+        if not keep.intersection(fixed):
+            break
+        for var_id in keep:
+            fixed.pop(var_id, None)
+
+    if not fixed:
+        return objective, constraints
+
+    def substitute(expr):
+        for var_id, (var_expr, x) in fixed.items():
+            data = {}
+            m, n = dims(var_expr)
+            value = expression.constant(
+                m, n,
+                constant=constant.store(x.reshape((m, n), order="F"), data),
+                data=data)
+            expr = replace_var(expr, var_id, value)
+        return expr
+
+    for var_id, (var_expr, x) in fixed.items():
+        logging.debug("presolve: fixed %s", var_id)
+        fixed_values[var_id] = x
+
+    # Functions and constraints that become constant are removed, this
+    # includes the singleton constraints themselves.
+    def is_constant(expr):
+        return all(x.variable.variable_id in fixed for x in variables(expr))
+
+    return ([substitute(f) for f in objective if not is_constant(f)],
+            [substitute(f) for f in constraints if not is_constant(f)])
+
+def remove_redundant_constraints(constraints):
+    """Remove empty constraints and exact duplicates."""
+    retval = []
+    seen = set()
+    for constr in constraints:
+        if not any(True for _ in variables(constr)):
+            continue
+        key = constr.SerializeToString()
+        if key in seen:
+            continue
+        seen.add(key)
+        retval.append(constr)
+    return retval
+
+def transform_problem(problem, params):
+    if (not params.presolve or
+        problem.objective.expression_type != Expression.ADD):
+        return problem
+
+    objective = list(problem.objective.arg)
+    constraints = remove_redundant_constraints(problem.constraint)
+    fixed_values = dict(problem.fixed_values)
+
+    # Eliminating variables may create new singleton constraints
+    while True:
+        num_fixed = len(fixed_values)
+        objective, constraints = eliminate_fixed_variables(
+            objective, constraints, fixed_values)
+        if len(fixed_values) == num_fixed:
+            break
+
+    # Keep the problem as is when every variable has been fixed
+    if not objective:
+        return problem
+
+    return expression.Problem(
+        objective=expression.add(*objective),
+        constraint=remove_redundant_constraints(constraints),
+        fixed_values=fixed_values)
@@ -546,7 +546,7 @@ def prox_zero(expr):
 def epigraph(expr):
     f_expr, t_expr = get_epigraph(expr)
     if f_expr:
-        for rule in BASE_RULES:
+        for rule in BASE_RULE_INDEX.rules(f_expr):
             result = rule(f_expr)
 
             if result.match:
@@ -662,28 +662,168 @@ PROX_RULES = [
     neg_log_det_epigraph,
 ]
 
+# Rule dispatch
+
+# The (expression type, first argument type) pairs each rule can match, None
+# matches any first argument. Rules not listed here are tried on all
+# expressions.
+RULE_PATTERNS = {
+    # Operators
+    prox_add: [(Expression.ADD, None)],
+    prox_multiply: [(Expression.MULTIPLY, None)],
+    prox_negate: [(Expression.NEGATE, None)],
+
+    # Indicators
+    prox_zero: [(Expression.INDICATOR, None)],
+    prox_non_negative: [(Expression.INDICATOR, None)],
+    prox_second_order_cone: [(Expression.INDICATOR, None)],
+    prox_semidefinite: [(Expression.INDICATOR, None)],
+    epigraph: [(Expression.INDICATOR, None)],
+
+    # Matrix
+    prox_lambda_max: [(Expression.LAMBDA_MAX, None)],
+    prox_log_det: [(Expression.LOG_DET, None)],
+    prox_norm_nuclear: [(Expression.NORM_NUC, None)],
+
+    # Vector
+    prox_log_sum_exp: [(Expression.LOG_SUM_EXP, None)],
+    prox_max: [(Expression.MAX_ENTRIES, None)],
+    prox_norm_2: [(Expression.NORM_P, None)],
+    prox_sum_largest: [(Expression.SUM_LARGEST, None)],
+    prox_total_variation_1d: [(Expression.NORM_P, Expression.ADD)],
+
+    # Elementwise
+    prox_exp: [(Expression.EXP, None)],
+    prox_norm_1: [(Expression.NORM_P, None)],
+    prox_sum_exp: [(Expression.SUM, Expression.EXP)],
+    prox_sum_inv_pos: [(Expression.SUM, Expression.POWER)],
+    prox_sum_logistic: [(Expression.SUM, Expression.LOGISTIC)],
+    prox_sum_neg_entr: [(Expression.SUM, Expression.NEGATE)],
+    prox_sum_neg_log: [(Expression.SUM, Expression.NEGATE)],
+    prox_sum_kl_div: [(Expression.SUM, Expression.KL_DIV)],
+    prox_sum_deadzone: [(Expression.SUM, Expression.MAX_ELEMENTWISE)],
+    prox_sum_quantile: [(Expression.SUM, Expression.MAX_ELEMENTWISE)],
+    prox_sum_hinge: [(Expression.SUM, Expression.MAX_ELEMENTWISE)],
+    prox_sum_square: [
+        (Expression.QUAD_OVER_LIN, None),
+        (Expression.POWER, Expression.NORM_P)],
+}
+
+def pattern_key(expr):
+    return (expr.expression_type,
+            expr.arg[0].expression_type if expr.arg else None)
+
+def matches_pattern(rule, key):
+    if rule not in RULE_PATTERNS:
+        return True
+    expr_type, arg_type = key
+    return any(
+        expr_type == pattern_type and (
+            pattern_arg_type is None or arg_type == pattern_arg_type)
+        for pattern_type, pattern_arg_type in RULE_PATTERNS[rule])
+
+class RuleIndex(object):
+    """Rules indexed by pattern, keeping the order in which they are tried."""
+    def __init__(self, rules):
+        self.all_rules = rules
+        self.candidates = {}
+
+    def rules(self, expr):
+        key = pattern_key(expr)
+        if key not in self.candidates:
+            self.candidates[key] = [
+                rule for rule in self.all_rules if matches_pattern(rule, key)]
+        return self.candidates[key]
+
+BASE_RULE_INDEX = RuleIndex(BASE_RULES)
+
+# Rules which compare subexpressions including their data, e.g. the arguments
+# of sum_quantile, and so may differ between expressions of the same structure.
+DATA_DEPENDENT_RULES = set([prox_sum_quantile])
+
+def structure_proto(proto):
+    """Copy of proto without the locations of its data."""
+    structure = Expression()
+    structure.CopyFrom(proto)
+    if structure.HasField("constant"):
+        clear_data(structure.constant)
+    if structure.HasField("linear_map"):
+        clear_linear_map_data(structure.linear_map)
+    return structure
+
+def clear_data(constant):
+    # Keep whether the data is stored elsewhere, rules depend on this
+    if constant.data_location:
+        constant.data_location = "data"
+    if constant.parameter_id:
+        constant.parameter_id = "parameter"
+
+def clear_linear_map_data(A):
+    if A.HasField("constant"):
+        clear_data(A.constant)
+    for arg in A.arg:
+        clear_linear_map_data(arg)
+
+class RuleMatcher(object):
+    """Finds the first rule matching an expression.
+
+    Subexpressions are interned by their structure, excluding the values of
+    constants which no rule depends on beyond their sign and shape, and the
+    rule matching each is memoized unless the rule also depends on data. For
+    problems built from many terms of the same form, such as a loss summed over
+    examples, the remaining terms go directly to the rule that matched the
+    first.
+    """
+    def __init__(self, index):
+        self.index = index
+        self.interned = {}
+        self.structure_ids = {}
+        self.matched_rules = {}
+
+    def intern(self, expr):
+        if id(expr) in self.interned:
+            return self.interned[id(expr)][1]
+        key = (structure_proto(expr.proto).SerializeToString(),
+               tuple(self.intern(arg) for arg in expr.arg))
+        structure_id = self.structure_ids.setdefault(
+            key, len(self.structure_ids))
+        # Keep a reference to expr so its id is not reused
+        self.interned[id(expr)] = (expr, structure_id)
+        return structure_id
+
+    def match(self, expr):
+        structure_id = self.intern(expr)
+        memoized = self.matched_rules.get(structure_id)
+        for rule in self.index.rules(expr):
+            # Structural rules ranked before the memoized one are known not to
+            # match, rules depending on data must still be tried.
+            if rule is memoized:
+                memoized = None
+            elif memoized is not None and rule not in DATA_DEPENDENT_RULES:
+                continue
+            result = rule(expr)
+            if result.match:
+                if rule not in DATA_DEPENDENT_RULES:
+                    self.matched_rules[structure_id] = rule
+                return rule, result
+        raise TransformError("No rule matched")
+
 def multiply_scalar(alpha, prox_expr):
     assert prox_expr.expression_type == Expression.PROX_FUNCTION
     if not is_indicator_prox(prox_expr.prox_function):
         prox_expr.prox_function.alpha *= alpha
     return prox_expr
 
-def transform_expr(prox_rules, expr):
+def transform_expr(matcher, expr):
     log_debug_expr("prox transform_expr", expr)
-    for rule in prox_rules:
-        result = rule(expr)
+    rule, result = matcher.match(expr)
+    logging.debug("match %s", rule.__name__)
+    if result.prox_expr:
+        yield result.prox_expr
 
-        if result.match:
-            logging.debug("match %s", rule.__name__)
-            if result.prox_expr:
-                yield result.prox_expr
-
-            for raw_expr in result.raw_exprs:
-                for prox_expr in transform_expr(prox_rules, raw_expr):
-                    yield multiply_scalar(result.alpha, prox_expr)
-            break
-    else:
-        raise TransformError("No rule matched")
+    for raw_expr in result.raw_exprs:
+        for prox_expr in transform_expr(matcher, raw_expr):
+            yield multiply_scalar(result.alpha, prox_expr)
 
 def transform_problem(problem, params):
     prox_rules = PROX_RULES + BASE_RULES
@@ -694,7 +834,8 @@ def transform_problem(problem, params):
     prox_rules.append(prox_non_negative)
     prox_rules.append(transform_cone)
 
-    f_exprs = list(transform_expr(prox_rules, problem.objective))
+    matcher = RuleMatcher(RuleIndex(prox_rules))
+    f_exprs = list(transform_expr(matcher, problem.objective))
     for constr in problem.constraint:
-        f_exprs += list(transform_expr(prox_rules, constr))
+        f_exprs += list(transform_expr(matcher, constr))
     return expression.Problem(objective=expression.add(*f_exprs))
@@ -47,6 +47,63 @@ def move_equality_indicators(graph):
             f.expr = expression.indicator(Cone.ZERO, f.expr.arg[0])
             f.node_type = CONSTRAINT
 
+# Elementwise functions which can be fused with NON_NEGATIVE and SUM_SQUARE
+# terms of the same variable, see fuse_prox_terms()
+FUSED_BASE_TYPES = set([
+    ProxFunction.NORM_1,
+    ProxFunction.SUM_DEADZONE,
+    ProxFunction.SUM_EXP,
+    ProxFunction.SUM_HINGE,
+    ProxFunction.SUM_INV_POS,
+    ProxFunction.SUM_LOGISTIC,
+    ProxFunction.SUM_NEG_ENTR,
+    ProxFunction.SUM_NEG_LOG,
+    ProxFunction.SUM_QUANTILE,
+])
+
+# Absorbed by the fused prox as bounds and quadratic terms, respectively
+FUSED_ABSORBED_TYPES = set([
+    ProxFunction.NON_NEGATIVE,
+    ProxFunction.SUM_SQUARE,
+])
+
+def is_fusable_function(f, graph):
+    prox = f.expr.prox_function
+    return ((prox.prox_function_type in FUSED_BASE_TYPES or
+             prox.prox_function_type in FUSED_ABSORBED_TYPES) and
+            not prox.epigraph and
+            not prox.has_axis and
+            len(f.expr.arg) == 1 and
+            f.expr.arg[0].affine_props.diagonal and
+            len(graph.neighbors(f, VARIABLE)) == 1)
+
+def fuse_prox_terms(graph):
+    """Fuse elementwise functions of the same variable into a single prox."""
+    for var in graph.nodes(VARIABLE):
+        fs = [f for f in graph.neighbors(var, FUNCTION)
+              if is_fusable_function(f, graph)]
+        base = [f for f in fs if f.expr.prox_function.prox_function_type in
+                FUSED_BASE_TYPES]
+        absorbed = [f for f in fs if f.expr.prox_function.prox_function_type in
+                    FUSED_ABSORBED_TYPES]
+        fused = base[:1] + absorbed
+        if len(fused) < 2:
+            continue
+
+        data = {}
+        for f in fused:
+            data.update(f.expr.data)
+
+        fused[0].expr = expression.prox_function(
+            ProxFunction(
+                prox_function_type=ProxFunction.FUSED,
+                alpha=1,
+                fused_function=[f.expr.prox_function for f in fused]),
+            *[f.expr.arg[0] for f in fused],
+            data=data)
+        for f in fused[1:]:
+            graph.remove_node(f)
+
 def is_prox_friendly_constraint(expr, var_id):
     return expr.arg[0].affine_props.linear_maps[var_id].scalar
 
@@ -125,6 +182,7 @@ def build_graph(problem):
 
 GRAPH_TRANSFORMS = [
     move_equality_indicators,
+    fuse_prox_terms,
     separate_objective_terms,
     add_constant_prox,
 ]
@@ -137,6 +195,8 @@ def transform_problem(problem, params):
         return problem
 
     for f in GRAPH_TRANSFORMS:
+        if f is fuse_prox_terms and not params.fuse_prox:
+            continue
         f(graph)
         log_debug(
             lambda f, graph:
@@ -0,0 +1,346 @@
+"""Simplify chains of linear maps.
+
+linear.transform_expr() produces one LINEAR_MAP node per operator, which are
+otherwise multiplied out one at a time by the solver. This rewrites each chain
+A_1*...*A_k*x into an equivalent chain with fewer and cheaper linear maps:
+scalar factors are collected into a single factor, transposes are pushed to
+the leaves where they cancel, Kronecker products and selections are folded
+with their neighbors and selections are pushed through sums, dropping the
+terms they do not select from.
+
+Constant values are never read, so the result does not depend on the data of
+a particular instance.
+"""
+
+import numpy as np
+
+from epopt import expression
+from epopt import linear_map
+from epopt.expression_util import *
+from epopt.proto.epsilon.expression_pb2 import Expression, LinearMap
+
+SELECTION_TYPES = (LinearMap.SELECT, LinearMap.PERMUTE, LinearMap.SCATTER)
+
+# Result of a product which is identically zero
+ZERO = object()
+
+def is_selection(A):
+    return A.linear_map_type in SELECTION_TYPES
+
+def is_identity(A):
+    return A.linear_map_type == LinearMap.SCALAR and A.scalar == 1
+
+def cost(A):
+    """Estimated flops to apply A to a vector."""
+    if A.linear_map_type == LinearMap.DENSE_MATRIX:
+        return A.m*A.n
+    if A.linear_map_type == LinearMap.SPARSE_MATRIX:
+        return A.constant.nnz
+    if A.linear_map_type in (LinearMap.DIAGONAL_MATRIX, LinearMap.SCALAR):
+        return A.n
+    if A.linear_map_type == LinearMap.KRONECKER_PRODUCT:
+        KA, KB = A.arg
+        return cost(KB)*KA.n + cost(KA)*KB.m
+    if A.linear_map_type == LinearMap.TRANSPOSE:
+        return cost(A.arg[0])
+    if is_selection(A):
+        return min(A.m, A.n)
+    raise ValueError("unknown linear map type " + str(A))
+
+def selection(index, n):
+    """Linear map selecting index from an n-vector.
+
+    Returns None if the indices are not strided in at most two dimensions.
+    """
+    k = len(index)
+    if k == n and np.array_equal(index, np.arange(n)):
+        return linear_map.identity(n)
+
+    d = np.diff(index)
+    if k == 1 or np.all(d == d[0]):
+        stride = [int(d[0]) if k > 1 else 1]
+        shape = [k]
+    else:
+        rows = int(np.argmax(d != d[0])) + 1
+        if k % rows:
+            return None
+        stride = [int(d[0]), int(index[rows] - index[0])]
+        shape = [rows, k//rows]
+        S = linear_map.select(n, 0, stride, shape)
+        if not np.array_equal(index, index[0] + linear_map.selection_index(S)):
+            return None
+
+    if k == n and len(np.unique(index)) == n:
+        return linear_map.permute(n, int(index[0]), stride, shape)
+    return linear_map.select(n, int(index[0]), stride, shape)
+
+def transpose_selection(A):
+    if A.linear_map_type == LinearMap.SCATTER:
+        return linear_map.select(
+            A.m, A.offset, list(A.stride), list(A.shape.dim))
+    return linear_map.scatter(
+        A.n, A.offset, list(A.stride), list(A.shape.dim))
+
+def scatter_selection(index, m):
+    """Linear map placing a vector at index of an m-vector, or None."""
+    S = selection(index, m)
+    if S is None or is_identity(S):
+        return S
+    return transpose_selection(S)
+
+def kron_selection(A, B):
+    """Kronecker product of an identity and a one dimensional selection as a
+    single selection, or None."""
+    if is_identity(A) and is_selection(B):
+        n, S = A.n, B
+    elif is_identity(B) and is_selection(A):
+        n, S = B.n, A
+    else:
+        return None
+    if len(S.shape.dim) != 1:
+        return None
+
+    scatter = S.linear_map_type == LinearMap.SCATTER
+    p = S.m if scatter else S.n
+    k = S.shape.dim[0]
+    if S is B:
+        # kron(I, S) applies S to each column
+        offset, stride, shape = S.offset, [S.stride[0], p], [k, n]
+    else:
+        # kron(S, I) selects columns
+        offset, stride, shape = S.offset*n, [1, S.stride[0]*n], [n, k]
+
+    if scatter:
+        return linear_map.scatter(p*n, offset, stride, shape)
+    if k == p:
+        return linear_map.permute(p*n, offset, stride, shape)
+    return linear_map.select(p*n, offset, stride, shape)
+
+def identity_or(alpha_A, n):
+    alpha, A = alpha_A
+    return alpha, A if A is not None else linear_map.identity(n)
+
+def kronecker_product(alpha_A, alpha_B):
+    """Returns (alpha, K) for kron(alpha_A, alpha_B), each given as a scalar
+    and linear map, with the scalars factored out."""
+    alpha_a, A = alpha_A
+    alpha_b, B = alpha_B
+    alpha = alpha_a*alpha_b
+    if is_identity(A) and is_identity(B):
+        return alpha, None
+    K = kron_selection(A, B)
+    if K is None:
+        K = linear_map.kronecker_product(A, B)
+    return alpha, K
+
+def normalize(A):
+    """Returns (alpha, B) with A = alpha*B, B is None for the identity."""
+    if A.linear_map_type == LinearMap.SCALAR:
+        return A.scalar, None
+    if A.linear_map_type == LinearMap.TRANSPOSE:
+        return normalize_transpose(
+            linear_map.from_proto(only_arg(A), dict(A.data)))
+    if A.linear_map_type == LinearMap.KRONECKER_PRODUCT:
+        KA, KB = [linear_map.from_proto(arg, dict(A.data)) for arg in A.arg]
+        return kronecker_product(
+            identity_or(normalize(KA), KA.m),
+            identity_or(normalize(KB), KB.m))
+    return 1, A
+
+def normalize_transpose(A):
+    """Returns (alpha, B) with A' = alpha*B, B is None for the identity."""
+    if A.linear_map_type == LinearMap.SCALAR:
+        return A.scalar, None
+    if A.linear_map_type == LinearMap.DIAGONAL_MATRIX:
+        return 1, A
+    if A.linear_map_type == LinearMap.TRANSPOSE:
+        return normalize(linear_map.from_proto(only_arg(A), dict(A.data)))
+    if A.linear_map_type == LinearMap.KRONECKER_PRODUCT:
+        KA, KB = [linear_map.from_proto(arg, dict(A.data)) for arg in A.arg]
+        return kronecker_product(
+            identity_or(normalize_transpose(KA), KA.n),
+            identity_or(normalize_transpose(KB), KB.n))
+    if A.linear_map_type == LinearMap.PERMUTE:
+        P = selection(np.argsort(linear_map.selection_index(A)), A.n)
+        if P is not None:
+            return 1, P if not is_identity(P) else None
+    elif is_selection(A):
+        return 1, transpose_selection(A)
+    return 1, linear_map.transpose(A)
+
+def multiply_selection(A, B):
+    """Product of selections, None if it is not a selection."""
+    a = linear_map.selection_index(A)
+    b = linear_map.selection_index(B)
+    scatter_a = A.linear_map_type == LinearMap.SCATTER
+    scatter_b = B.linear_map_type == LinearMap.SCATTER
+    if not scatter_a and not scatter_b:
+        return [selection(b[a], B.n)]
+    if scatter_a and scatter_b:
+        return [scatter_selection(a[b], A.m)]
+    if scatter_a:
+        return None
+
+    # Selecting elements placed by a scatter, these must either all or none
+    # come from the scattered vector.
+    if len(np.unique(b)) != len(b):
+        return None
+    position = -np.ones(B.m, dtype=np.int64)
+    position[b] = np.arange(len(b))
+    index = position[a]
+    if np.all(index < 0):
+        return ZERO
+    if np.any(index < 0):
+        return None
+    return [selection(index, B.n)]
+
+def multiply_factor(A, B):
+    if is_identity(A):
+        return B
+    if is_identity(B):
+        return A
+    C = multiply(A, B)
+    if C is None or C is ZERO or len(C) > 1:
+        return None
+    return C[0] if C else linear_map.identity(A.m)
+
+def multiply(A, B):
+    """Returns the product A*B as a list of linear maps, ZERO or None if there
+    is no simpler form."""
+    if is_selection(A) and is_selection(B):
+        C = multiply_selection(A, B)
+        if C is None or C is ZERO:
+            return C
+        if C[0] is None:
+            return None
+        return [] if is_identity(C[0]) else C
+
+    if (A.linear_map_type == LinearMap.KRONECKER_PRODUCT and
+        B.linear_map_type == LinearMap.KRONECKER_PRODUCT):
+        AA, AB = [linear_map.from_proto(arg, dict(A.data)) for arg in A.arg]
+        BA, BB = [linear_map.from_proto(arg, dict(B.data)) for arg in B.arg]
+        if AA.n != BA.m or AB.n != BB.m:
+            return None
+        CA = multiply_factor(AA, BA)
+        CB = multiply_factor(AB, BB)
+        if CA is None or CB is None:
+            return None
+        alpha, C = kronecker_product(
+            identity_or(normalize(CA), CA.m),
+            identity_or(normalize(CB), CB.m))
+        if alpha != 1:
+            return None
+        return [C] if C is not None else []
+
+    return None
+
+def simplify_chain(maps):
+    """Returns (alpha, chain) with the product of maps equal to alpha times the
+    product of chain, chain is None if the product is zero."""
+    alpha = 1
+    chain = []
+    for A in maps:
+        alpha_i, A = normalize(A)
+        alpha *= alpha_i
+        if A is not None:
+            chain.append(A)
+
+    # Greedily combine adjacent maps while this does not increase the cost
+    changed = True
+    while changed:
+        changed = False
+        for i in xrange(len(chain)-1):
+            C = multiply(chain[i], chain[i+1])
+            if C is ZERO:
+                return alpha, None
+            if (C is not None and
+                sum(cost(Ci) for Ci in C) <= cost(chain[i]) + cost(chain[i+1])):
+                chain[i:i+2] = C
+                changed = True
+                break
+
+    return alpha, chain
+
+def scale_chain(alpha, chain, n):
+    """Folds the scalar alpha into the chain."""
+    for i, A in enumerate(chain):
+        if A.linear_map_type != LinearMap.KRONECKER_PRODUCT:
+            continue
+        for j, K in enumerate(A.arg):
+            if K.linear_map_type == LinearMap.SCALAR:
+                KA, KB = [linear_map.from_proto(arg, dict(A.data))
+                          for arg in A.arg]
+                if j == 0:
+                    KA = linear_map.scalar(alpha*K.scalar, K.n)
+                else:
+                    KB = linear_map.scalar(alpha*K.scalar, K.n)
+                return (chain[:i] + [linear_map.kronecker_product(KA, KB)] +
+                        chain[i+1:])
+
+    m = chain[0].m if chain else n
+    return [linear_map.scalar(alpha, m)] + chain
+
+def linear_map_chain(expr):
+    """Returns the linear maps applied to an expression, outermost first."""
+    maps = []
+    while expr.expression_type == Expression.LINEAR_MAP:
+        maps.append(linear_map.from_proto(expr.linear_map, expr.data))
+        expr = only_arg(expr)
+    return maps, expr
+
+def apply_chain(chain, x):
+    for A in reversed(chain):
+        x = expression.linear_map(A, x)
+    return x
+
+def simplify_linear_map(maps, x):
+    """Simplify the chain of maps applied to x, None if this is zero."""
+    n = maps[-1].n
+    alpha, chain = simplify_chain(maps)
+    if chain is None or alpha == 0:
+        return None
+
+    # Push selections through sums where these may combine with the maps
+    # applied to each term.
+    if (x.expression_type == Expression.ADD and chain and
+        all(is_selection(A) for A in chain) and
+        all(dim(arg) == n for arg in x.arg) and
+        any(arg.expression_type == Expression.LINEAR_MAP for arg in x.arg)):
+        terms = []
+        for arg in x.arg:
+            arg_maps, arg_x = linear_map_chain(arg)
+            term = simplify_linear_map(maps + arg_maps, arg_x)
+            if term is not None:
+                terms.append(term)
+        if not terms:
+            return None
+        return expression.add(*terms) if len(terms) > 1 else terms[0]
+
+    if alpha != 1:
+        chain = scale_chain(alpha, chain, n)
+    if not chain:
+        return expression.reshape(x, n, 1)
+    return apply_chain(chain, x)
+
+def transform_expr(expr):
+    if expr.expression_type != Expression.LINEAR_MAP:
+        return expression.from_proto(
+            expr.proto, [transform_expr(arg) for arg in expr.arg], expr.data)
+
+    maps, x = linear_map_chain(expr)
+    x = transform_expr(x)
+    simplified = simplify_linear_map(maps, x)
+
+    # Zero maps are rare, keep these as they are
+    if simplified is None:
+        return apply_chain(maps, x)
+    return simplified
+
+def transform_problem(problem, params):
+    if not params.simplify_linear_maps:
+        return problem
+
+    return expression.Problem(
+        objective=transform_expr(problem.objective),
+        constraint=[transform_expr(c) for c in problem.constraint],
+        fixed_values=problem.fixed_values)
@@ -0,0 +1,148 @@
+import numpy as np
+
+from epopt import constant
+from epopt import linear_map
+from epopt.compiler.transforms import simplify
+from epopt.proto.epsilon.expression_pb2 import LinearMap
+
+def to_dense(A):
+    """Dense matrix for a linear map, computed directly from its definition."""
+    if A.linear_map_type in (LinearMap.DENSE_MATRIX,
+                             LinearMap.DIAGONAL_MATRIX):
+        value = np.frombuffer(A.data[A.constant.data_location])
+        value = value.reshape((A.constant.m, A.constant.n), order="F")
+        if A.linear_map_type == LinearMap.DIAGONAL_MATRIX:
+            return np.diag(value.ravel(order="F"))
+        return value
+    if A.linear_map_type == LinearMap.SCALAR:
+        return A.scalar*np.eye(A.n)
+    if A.linear_map_type == LinearMap.KRONECKER_PRODUCT:
+        KA, KB = [linear_map.from_proto(arg, dict(A.data)) for arg in A.arg]
+        return np.kron(to_dense(KA), to_dense(KB))
+    if A.linear_map_type == LinearMap.TRANSPOSE:
+        return to_dense(linear_map.from_proto(A.arg[0], dict(A.data))).T
+
+    M = np.zeros((A.m, A.n))
+    index = linear_map.selection_index(A)
+    if A.linear_map_type == LinearMap.SCATTER:
+        M[index, np.arange(A.n)] = 1
+    else:
+        M[np.arange(A.m), index] = 1
+    return M
+
+def dense_product(maps, n):
+    M = np.eye(n)
+    for A in reversed(maps):
+        M = to_dense(A).dot(M)
+    return M
+
+def dense(m, n):
+    data = {}
+    return linear_map.dense_matrix(
+        constant.store(np.random.randn(m, n), data), data)
+
+def diagonal(n):
+    data = {}
+    return linear_map.diagonal_matrix(
+        constant.store(np.random.randn(n), data), data)
+
+def kron(A, B):
+    return linear_map.kronecker_product(A, B)
+
+def T(A):
+    return linear_map.transpose(A)
+
+def scalar(alpha, n):
+    return linear_map.scalar(alpha, n)
+
+def identity(n):
+    return linear_map.identity(n)
+
+def select(n, offset, stride, shape):
+    return linear_map.select(n, offset, stride, shape)
+
+def scatter(m, offset, stride, shape):
+    return linear_map.scatter(m, offset, stride, shape)
+
+def permute(n, offset, stride, shape):
+    return linear_map.permute(n, offset, stride, shape)
+
+def chains():
+    np.random.seed(0)
+    return [
+        # Scalars and transposes
+        [scalar(2, 6), T(T(dense(6, 4))), scalar(-0.5, 4)],
+        [T(dense(4, 3)), T(diagonal(4)), scalar(3, 4)],
+        [T(scalar(2, 5)), T(T(T(dense(3, 5))))],
+
+        # Kronecker products with scalars, transposes and each other
+        [scalar(2, 6), kron(dense(3, 2), scalar(0.5, 2))],
+        [T(kron(dense(3, 2), scalar(0.5, 2))), scalar(3, 6)],
+        [kron(T(dense(3, 2)), T(dense(4, 2)))],
+        [kron(identity(2), dense(3, 4)), kron(identity(2), T(dense(3, 4)))],
+        [kron(dense(2, 3), identity(4)), kron(identity(3), scalar(2, 4))],
+        [kron(identity(3), dense(2, 4)), kron(dense(3, 2), identity(4))],
+        [scalar(3, 12), kron(scalar(-1, 3), T(dense(2, 4))), scalar(2, 6)],
+
+        # Kronecker products of selections
+        [kron(select(3, 0, [2], [2]), identity(2)),
+         kron(identity(3), select(4, 1, [1], [2]))],
+        [kron(identity(2), select(5, 1, [2], [2])),
+         kron(identity(2), scatter(5, 0, [1], [5]))],
+        [T(kron(identity(2), select(5, 1, [2], [2]))), scalar(2, 4)],
+        [kron(dense(2, 3), scalar(2, 4)),
+         kron(identity(3), select(6, 1, [1], [4]))],
+
+        # Selections, permutations and scatters
+        [select(10, 1, [2], [4]), permute(10, 0, [2, 1], [2, 5])],
+        [select(8, 2, [1], [3]), scatter(8, 0, [2], [4])],
+        [select(8, 1, [2], [3]), scatter(8, 1, [2], [4])],
+        [select(8, 0, [1], [2]), scatter(8, 4, [1], [4])],
+        [scatter(10, 1, [1], [6]), select(8, 2, [1], [6])],
+        [scatter(12, 0, [2], [6]), scatter(6, 1, [1], [3])],
+        [T(permute(6, 0, [3, 1], [2, 3])), dense(6, 2)],
+        [select(6, 0, [2, 1], [2, 2]), T(select(6, 1, [1], [3]))],
+        [dense(3, 4), T(scatter(6, 2, [1], [4])), scalar(2, 6)],
+    ]
+
+def check_simplify_chain(maps):
+    n = maps[-1].n
+    alpha, chain = simplify.simplify_chain(maps)
+    expected = dense_product(maps, n)
+    if chain is None:
+        np.testing.assert_allclose(expected, 0)
+        return
+    np.testing.assert_allclose(
+        expected, alpha*dense_product(chain, n), atol=1e-12)
+    np.testing.assert_allclose(
+        expected, dense_product(simplify.scale_chain(alpha, chain, n), n),
+        atol=1e-12)
+
+def test_simplify_chain():
+    for maps in chains():
+        yield check_simplify_chain, maps
+
+def selections(n):
+    return [
+        select(n, 1, [2], [3]),
+        select(n, 0, [1, 4], [2, 2]),
+        permute(n, 0, [2, 1], [n//2, 2]),
+        scatter(n, 2, [1], [4]),
+        scatter(n, 0, [3], [3]),
+        select(n, 7, [-1], [n]),
+        scatter(4, 1, [2], [2]),
+    ]
+
+def check_multiply_selection(A, B):
+    C = simplify.multiply_selection(A, B)
+    expected = to_dense(A).dot(to_dense(B))
+    if C is simplify.ZERO:
+        np.testing.assert_allclose(expected, 0)
+    elif C is not None and C[0] is not None:
+        np.testing.assert_allclose(expected, to_dense(C[0]))
+
+def test_multiply_selection():
+    for A in selections(8):
+        for B in selections(8):
+            if A.n == B.m:
+                yield check_multiply_selection, A, B
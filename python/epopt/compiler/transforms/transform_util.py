@@ -3,8 +3,6 @@ from collections import defaultdict
 import struct
 import random
 
-from cvxpy.utilities import power_tools
-
 from epopt import error
 from epopt import expression
 from epopt.expression_util import *
@@ -44,7 +42,9 @@ def epi_transform(f_expr, name):
     epi_f_expr = epi(f_expr, t_expr)
     return t_expr, [epi_f_expr]
 
-# gm()/gm_constrs() translated from cvxpy.utilities.power_tools.gm_constrs()
+# gm()/gm_constrs() translated from cvxpy.utilities.power_tools.gm_constrs(),
+# which is imported where used so that compiling problems without powers, e.g.
+# those built with epopt.model, does not depend on CVXPY.
 def gm(t, x, y):
     return expression.soc_elemwise_constraint(
         expression.add(x, y),
@@ -52,6 +52,7 @@ def gm(t, x, y):
         expression.multiply(expression.scalar_constant(2), t))
 
 def gm_constrs(t_expr, x_exprs, p):
+    from cvxpy.utilities import power_tools
     assert power_tools.is_weight(p)
     w = power_tools.dyad_completion(p)
     tree = power_tools.decompose(w)
@@ -59,18 +59,20 @@ def convert_parameter(expr):
 
 def convert_constant(expr):
     m, n = expr.size
-    if isinstance(expr.value, (int, long, float)):
-        return expression.constant(m, n, scalar=expr.value)
+    # Evaluates the entire subtree for constant expressions
+    value = expr.value
+    if isinstance(value, (int, long, float)):
+        return expression.constant(m, n, scalar=value)
     else:
         data = {}
         return expression.constant(
             m, n,
             data=data,
-            constant=constant.store(expr.value, data),
+            constant=constant.store(value, data),
             sign=expression_pb2.Sign(
                 sign_type=expression_pb2.Sign.Type.Value(expr.sign)))
 
-def convert_generic(expression_type, expr):
+def convert_generic(expression_type, expr, memo):
     proto = expression.Expression(
         expression_type=expression_type,
         size=expression_pb2.Size(dim=expr.size),
@@ -83,7 +85,7 @@ def convert_generic(expression_type, expr):
             expression_pb2.Monotonicity(
                 monotonicity_type=expression_pb2.Monotonicity.Type.Value(m))
             for m in expr.monotonicity()],
-        arg=(convert_expression(arg) for arg in expr.args))
+        arg=(convert_expression(arg, memo) for arg in expr.args))
 
     if isinstance(expr, AxisAtom) and expr.axis is not None:
         proto.proto.has_axis = True
@@ -91,14 +93,14 @@ def convert_generic(expression_type, expr):
 
     return proto
 
-def convert_binary(f, expr):
-    return f(*[convert_expression(arg) for arg in expr.args])
+def convert_binary(f, expr, memo):
+    return f(*[convert_expression(arg, memo) for arg in expr.args])
 
-def convert_unary(f, expr):
+def convert_unary(f, expr, memo):
     assert len(expr.args) == 1
-    return f(convert_expression(expr.args[0]))
+    return f(convert_expression(expr.args[0], memo))
 
-def convert_index(expr):
+def convert_index(expr, memo):
     starts = []
     stops = []
     assert len(expr.key) == 2
@@ -108,17 +110,17 @@ def convert_index(expr):
         stops.append(index_value(key.stop, size) if key.stop else size)
 
     assert len(expr.args) == 1
-    return expression.index(convert_expression(expr.args[0]),
+    return expression.index(convert_expression(expr.args[0], memo),
                             starts[0], stops[0],
                             starts[1], stops[1])
 
-def convert_huber(expr):
-    proto = convert_generic(Expression.HUBER, expr)
+def convert_huber(expr, memo):
+    proto = convert_generic(Expression.HUBER, expr, memo)
     proto.proto.M = expr.M.value
     return proto
 
-def convert_p(expression_type, expr):
-    proto = convert_generic(expression_type, expr)
+def convert_p(expression_type, expr, memo):
+    proto = convert_generic(expression_type, expr, memo)
     proto.proto.p = float(expr.p)
     return proto
 
@@ -127,59 +129,74 @@ def convert_fraction(fraction):
         a=fraction.numerator,
         b=fraction.denominator)
 
-def convert_geo_mean(expr):
-    proto = convert_generic(Expression.GEO_MEAN, expr)
+def convert_geo_mean(expr, memo):
+    proto = convert_generic(Expression.GEO_MEAN, expr, memo)
     proto.proto.geo_mean_params.w.extend(convert_fraction(x) for x in expr.w)
     proto.proto.geo_mean_params.w_dyad.extend(convert_fraction(x) for x in expr.w_dyad)
     return proto
 
-def convert_sum_largest(expr):
-    proto = convert_generic(Expression.SUM_LARGEST, expr)
+def convert_sum_largest(expr, memo):
+    proto = convert_generic(Expression.SUM_LARGEST, expr, memo)
     proto.proto.k = expr.k
     return proto
 
+def generic_converter(expression_type):
+    return lambda expr, memo: convert_generic(expression_type, expr, memo)
+
+def p_converter(expression_type):
+    return lambda expr, memo: convert_p(expression_type, expr, memo)
+
+def binary_converter(f):
+    return lambda expr, memo: convert_binary(f, expr, memo)
+
+def unary_converter(f):
+    return lambda expr, memo: convert_unary(f, expr, memo)
+
+def leaf_converter(convert):
+    return lambda expr, memo: convert(expr)
+
 EXPRESSION_TYPES = (
-    (AddExpression, lambda e: convert_binary(expression.add, e)),
-    (Constant, convert_constant),
-    (MulExpression, lambda e: convert_binary(expression.multiply, e)),
-    (RMulExpression, lambda e: convert_binary(expression.multiply, e)),
-    (NegExpression, lambda e: convert_unary(expression.negate, e)),
-    (Parameter, convert_parameter),
-    (Variable, convert_variable),
-    (abs, lambda e: convert_generic(Expression.ABS, e)),
-    (diag_mat, lambda e: convert_generic(Expression.DIAG_MAT, e)),
-    (diag_vec, lambda e: convert_generic(Expression.DIAG_VEC, e)),
-    (entr, lambda e: convert_generic(Expression.ENTR, e)),
-    (exp, lambda e: convert_generic(Expression.EXP, e)),
+    (AddExpression, binary_converter(expression.add)),
+    (Constant, leaf_converter(convert_constant)),
+    (MulExpression, binary_converter(expression.multiply)),
+    (RMulExpression, binary_converter(expression.multiply)),
+    (NegExpression, unary_converter(expression.negate)),
+    (Parameter, leaf_converter(convert_parameter)),
+    (Variable, leaf_converter(convert_variable)),
+    (abs, generic_converter(Expression.ABS)),
+    (diag_mat, generic_converter(Expression.DIAG_MAT)),
+    (diag_vec, generic_converter(Expression.DIAG_VEC)),
+    (entr, generic_converter(Expression.ENTR)),
+    (exp, generic_converter(Expression.EXP)),
     (geo_mean, convert_geo_mean),
-    (hstack, lambda e: convert_generic(Expression.HSTACK, e)),
+    (hstack, generic_converter(Expression.HSTACK)),
     (huber, convert_huber),
     (index, convert_index),
-    (kl_div, lambda e: convert_generic(Expression.KL_DIV, e)),
-    (kron, lambda e: convert_generic(Expression.KRON, e)),
-    (lambda_max, lambda e: convert_generic(Expression.LAMBDA_MAX, e)),
-    (log, lambda e: convert_generic(Expression.LOG, e)),
-    (log_det, lambda e: convert_generic(Expression.LOG_DET, e)),
-    (log_sum_exp, lambda e: convert_generic(Expression.LOG_SUM_EXP, e)),
-    (logistic, lambda e: convert_generic(Expression.LOGISTIC, e)),
-    (matrix_frac, lambda e: convert_generic(Expression.MATRIX_FRAC, e)),
-    (max_elemwise, lambda e: convert_generic(Expression.MAX_ELEMENTWISE, e)),
-    (max_entries, lambda e: convert_generic(Expression.MAX_ENTRIES, e)),
-    (min_elemwise, lambda e: convert_generic(Expression.MIN_ELEMENTWISE, e)),
-    (mul_elemwise, lambda e: convert_binary(expression.multiply_elemwise, e)),
-    (norm2_elemwise, lambda e: convert_generic(Expression.NORM_2_ELEMENTWISE, e)),
-    (normNuc, lambda e: convert_generic(Expression.NORM_NUC, e)),
-    (pnorm, lambda e: convert_p(Expression.NORM_P, e)),
-    (power, lambda e: convert_p(Expression.POWER, e)),
-    (quad_over_lin, lambda e: convert_generic(Expression.QUAD_OVER_LIN, e)),
-    (reshape, lambda e: convert_generic(Expression.RESHAPE, e)),
-    (sigma_max, lambda e: convert_generic(Expression.SIGMA_MAX, e)),
-    (sum_entries, lambda e: convert_generic(Expression.SUM, e)),
-    (sum_largest, lambda e: convert_sum_largest(e)),
-    (trace, lambda e: convert_generic(Expression.TRACE, e)),
-    (transpose, lambda e: convert_unary(expression.transpose, e)),
-    (upper_tri, lambda e: convert_generic(Expression.UPPER_TRI, e)),
-    (vstack, lambda e: convert_generic(Expression.VSTACK, e)),
+    (kl_div, generic_converter(Expression.KL_DIV)),
+    (kron, generic_converter(Expression.KRON)),
+    (lambda_max, generic_converter(Expression.LAMBDA_MAX)),
+    (log, generic_converter(Expression.LOG)),
+    (log_det, generic_converter(Expression.LOG_DET)),
+    (log_sum_exp, generic_converter(Expression.LOG_SUM_EXP)),
+    (logistic, generic_converter(Expression.LOGISTIC)),
+    (matrix_frac, generic_converter(Expression.MATRIX_FRAC)),
+    (max_elemwise, generic_converter(Expression.MAX_ELEMENTWISE)),
+    (max_entries, generic_converter(Expression.MAX_ENTRIES)),
+    (min_elemwise, generic_converter(Expression.MIN_ELEMENTWISE)),
+    (mul_elemwise, binary_converter(expression.multiply_elemwise)),
+    (norm2_elemwise, generic_converter(Expression.NORM_2_ELEMENTWISE)),
+    (normNuc, generic_converter(Expression.NORM_NUC)),
+    (pnorm, p_converter(Expression.NORM_P)),
+    (power, p_converter(Expression.POWER)),
+    (quad_over_lin, generic_converter(Expression.QUAD_OVER_LIN)),
+    (reshape, generic_converter(Expression.RESHAPE)),
+    (sigma_max, generic_converter(Expression.SIGMA_MAX)),
+    (sum_entries, generic_converter(Expression.SUM)),
+    (sum_largest, convert_sum_largest),
+    (trace, generic_converter(Expression.TRACE)),
+    (transpose, unary_converter(expression.transpose)),
+    (upper_tri, generic_converter(Expression.UPPER_TRI)),
+    (vstack, generic_converter(Expression.VSTACK)),
 )
 
 # Sanity check to make sure the CVXPY atoms are all classes. This can change
@@ -188,37 +205,56 @@ import inspect
 for expr_cls, expr_type in EXPRESSION_TYPES:
     assert inspect.isclass(expr_cls), expr_cls
 
-def convert_expression(expr):
+EXPRESSION_CONVERTERS = dict(EXPRESSION_TYPES)
+
+def convert_expression(expr, memo=None):
+    """Convert a CVXPY expression.
+
+    Conversions are memoized by the id of the CVXPY object in memo, so
+    subexpressions shared by several expressions converted with the same memo
+    are converted, and constants folded, only once and remain shared.
+    """
+    if memo is None:
+        memo = {}
+    if id(expr) in memo:
+        return memo[id(expr)][1]
+
     if expr.is_constant():
-        return convert_constant(expr)
+        retval = convert_constant(expr)
     else:
-        for expr_cls, convert in EXPRESSION_TYPES:
-            if type(expr) is expr_cls:
-                return convert(expr)
-    raise RuntimeError("Unknown type: %s" % type(expr))
+        convert = EXPRESSION_CONVERTERS.get(type(expr))
+        if convert is None:
+            raise RuntimeError("Unknown type: %s" % type(expr))
+        retval = convert(expr, memo)
+
+    # Keep a reference to expr so its id is not reused
+    memo[id(expr)] = (expr, retval)
+    return retval
 
-def convert_constraint(constraint):
+def convert_constraint(constraint, memo=None):
+    if memo is None:
+        memo = {}
     if isinstance(constraint, EqConstraint):
         return expression.eq_constraint(
-            convert_expression(constraint.args[0]),
-            convert_expression(constraint.args[1]))
+            convert_expression(constraint.args[0], memo),
+            convert_expression(constraint.args[1], memo))
     elif isinstance(constraint, PSDConstraint):
         return expression.psd_constraint(
-            convert_expression(constraint.args[0]),
-            convert_expression(constraint.args[1]))
+            convert_expression(constraint.args[0], memo),
+            convert_expression(constraint.args[1], memo))
     elif isinstance(constraint, LeqConstraint):
         return expression.leq_constraint(
-            convert_expression(constraint.args[0]),
-            convert_expression(constraint.args[1]))
+            convert_expression(constraint.args[0], memo),
+            convert_expression(constraint.args[1], memo))
     elif isinstance(constraint, SOC_Elemwise):
         return expression.soc_elemwise_constraint(
-            convert_expression(constraint.t),
-            *[convert_expression(x) for x in constraint.x_elems])
+            convert_expression(constraint.t, memo),
+            *[convert_expression(x, memo) for x in constraint.x_elems])
     elif isinstance(constraint, SOC):
         return expression.soc_contraint(
-            convert_expression(constraint.t),
+            convert_expression(constraint.t, memo),
             expression.vstack(
-                *[convert_expression(x) for x in constraint.x_elems]))
+                *[convert_expression(x, memo) for x in constraint.x_elems]))
 
     raise RuntimeError("Unknown constraint: %s" % type(constraint))
 
@@ -231,6 +267,7 @@ def convert_problem(problem):
     else:
         raise RuntimeError("Unknown objective: %s" % type(problem.objective))
 
+    memo = {}
     return expression.Problem(
-        objective=convert_expression(obj_expr),
-        constraint=[convert_constraint(c) for c in problem.constraints])
+        objective=convert_expression(obj_expr, memo),
+        constraint=[convert_constraint(c, memo) for c in problem.constraints])
@@ -0,0 +1,45 @@
+from nose.tools import assert_equal, assert_is
+
+import cvxpy as cp
+import numpy as np
+
+from epopt import cvxpy_expr
+from epopt.proto.epsilon.expression_pb2 import Expression
+
+def find(expr, expression_type):
+    retval = []
+    for arg in expr.arg:
+        retval += find(arg, expression_type)
+    if expr.expression_type == expression_type:
+        retval.append(expr)
+    return retval
+
+def test_shared_subexpressions():
+    np.random.seed(0)
+    A = np.random.randn(10, 5)
+    b = np.random.randn(10)
+    x = cp.Variable(5)
+    r = A*x - b
+    cvxpy_problem = cp.Problem(
+        cp.Minimize(cp.norm1(r)), [r[i] <= 1 for i in xrange(10)])
+
+    problem = cvxpy_expr.convert_problem(cvxpy_problem)
+    r_expr = problem.objective.arg[0]
+    for constr in problem.constraint:
+        index_expr, = find(constr, Expression.INDEX)
+        assert_is(r_expr, index_expr.arg[0])
+    assert_equal(2, len(problem.expression_data()))
+
+def test_shared_constants():
+    np.random.seed(0)
+    A = cp.Constant(np.random.randn(3, 3))
+    B = A*A + A
+    x = cp.Variable(3)
+    cvxpy_problem = cp.Problem(
+        cp.Minimize(cp.norm1(B*x)), [B*x >= 0])
+
+    problem = cvxpy_expr.convert_problem(cvxpy_problem)
+    constants = [expr for expr in find(problem.objective, Expression.CONSTANT)
+                 if expr.constant.data_location]
+    assert_equal(1, len(constants))
+    assert_equal(1, len(problem.expression_data()))
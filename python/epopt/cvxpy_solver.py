@@ -1,24 +1,29 @@
 """CVXPY-like interfaces for solver."""
 
 import logging
-import numpy
 import time
 
+from collections import namedtuple
+
 from cvxpy.settings import OPTIMAL, OPTIMAL_INACCURATE, SOLVER_ERROR
 
 from epopt import __version__
-from epopt import _solve
-from epopt import constant
 from epopt import cvxpy_expr
+from epopt import solver
 from epopt import text_format
 from epopt import util
-from epopt.compiler import compiler
 from epopt.proto.epsilon import solver_params_pb2
 from epopt.proto.epsilon import solver_pb2
 from epopt.proto.epsilon.solver_pb2 import SolverStatus
 
 problem_cache = {}
 
+# Timing and status for the most recent call to solve(), used by benchmarks.
+# The data size is the number of bytes of constant data in the compiled problem.
+SolveInfo = namedtuple(
+    "SolveInfo", ["compile_time", "solve_time", "status", "data_size"])
+last_solve_info = None
+
 EPSILON = "epsilon"
 
 class SolverError(Exception):
@@ -28,8 +33,8 @@ def set_solution(prob, values):
     for var in prob.variables():
         var_id = cvxpy_expr.variable_id(var)
         assert var_id in values
-        x = numpy.fromstring(values[var_id], dtype=numpy.double)
-        var.value = x.reshape(var.size[1], var.size[0]).transpose()
+        # Native arrays are column-major so this reshape does not copy
+        var.value = values[var_id].reshape(var.size, order="F")
 
 def cvxpy_status(solver_status):
     if solver_status.state == SolverStatus.OPTIMAL:
@@ -38,15 +43,14 @@ def cvxpy_status(solver_status):
         return OPTIMAL_INACCURATE
     return SOLVER_ERROR
 
-def parameter_values(cvxpy_prob, data):
-    return [(cvxpy_expr.parameter_id(param),
-             constant.store(param.value, data).SerializeToString())
-            for param in cvxpy_prob.parameters()]
+def parameter_values(cvxpy_prob):
+    return dict((cvxpy_expr.parameter_id(param), param.value)
+                for param in cvxpy_prob.parameters())
 
 def compile_problem(cvxpy_prob, solver_params):
     t0 = time.time()
-    problem = cvxpy_expr.convert_problem(cvxpy_prob)
-    problem = compiler.compile_problem(problem, solver_params)
+    problem = solver.compile_expression(
+        cvxpy_expr.convert_problem(cvxpy_prob), solver_params)
     t1 = time.time()
 
     if solver_params.verbose:
@@ -66,7 +70,10 @@ def solve(cvxpy_prob, **kwargs):
     if not cvxpy_prob.variables():
         return OPTIMAL, cvxpy_prob.objective.value
 
+    global last_solve_info
+
     solver_params = solver_params_pb2.SolverParams(**kwargs)
+    t0 = time.time()
     if solver_params.warm_start:
         problem = problem_cache.get(id(cvxpy_prob))
         if not problem:
@@ -74,27 +81,16 @@ def solve(cvxpy_prob, **kwargs):
             problem_cache[id(cvxpy_prob)] = problem
     else:
         problem = compile_problem(cvxpy_prob, solver_params)
+    compile_time = time.time() - t0
 
     t0 = time.time()
-    if len(problem.objective.arg) == 1 and not problem.constraint:
-        # TODO(mwytock): Should probably parameterize the proximal operators so
-        # they can take A=0 instead of just using a large lambda here
-        lam = 1e12
-        values = _solve.eval_prox(
-            problem.objective.arg[0].SerializeToString(),
-            lam,
-            problem.expression_data(),
-            {})
-        status = OPTIMAL
-    else:
-        data = problem.expression_data()
-        status_str, values = _solve.solve(
-            problem.SerializeToString(),
-            parameter_values(cvxpy_prob, data),
-            solver_params.SerializeToString(),
-            data)
-        status = cvxpy_status(SolverStatus.FromString(status_str))
+    solver_status, values = solver.solve_compiled(
+        problem, parameter_values(cvxpy_prob), solver_params)
+    status = cvxpy_status(solver_status)
     t1 = time.time()
+    last_solve_info = SolveInfo(
+        compile_time, t1-t0, solver_status,
+        sum(len(value) for value in problem.expression_data().itervalues()))
 
     logging.info("Epsilon solve time: %.4f seconds", t1-t0)
     if solver_params.verbose:
@@ -1,73 +1,145 @@
 """Compute DCP attributes of expressions.
 
-This translates some of the functionality from cvxpy.atoms.atom.py and
-cvxpy.expresison.expression.py to work on Epsilon's expression trees with the
-help of cvxpy.utilities.
+This implements the DCP rules from cvxpy.atoms.atom.py and
+cvxpy.utilities.monotonicity.py directly on the sign, curvature and
+monotonicity enums of Epsilon's expression trees, with the rules for adding
+curvatures and for composing a function with each argument tabulated over all
+combinations of these.
 """
 
-import cvxpy.utilities
-
 from epopt.proto.epsilon import expression_pb2
 
+Curvature = expression_pb2.Curvature
+Monotonicity = expression_pb2.Monotonicity
+Sign = expression_pb2.Sign
+
 class DCPProperties(object):
-    def __init__(self, dcp_attr):
-        self.dcp_attr = dcp_attr
-        self.curvature = expression_pb2.Curvature(
-            curvature_type=expression_pb2.Curvature.Type.Value(
-                dcp_attr.curvature.curvature_str))
+    def __init__(self, sign_type, curvature_type):
+        self.sign_type = sign_type
+        self.curvature = Curvature(curvature_type=curvature_type)
 
     @property
     def affine(self):
-        return (self.dcp_attr.curvature == cvxpy.utilities.Curvature.AFFINE or
-                self.dcp_attr.curvature == cvxpy.utilities.Curvature.CONSTANT)
+        return is_affine(self.curvature.curvature_type)
 
     @property
     def constant(self):
-        return self.dcp_attr.curvature == cvxpy.utilities.Curvature.CONSTANT
+        return self.curvature.curvature_type == Curvature.CONSTANT
 
-from epopt import tree_format
+def is_affine(c):
+    return c in (Curvature.AFFINE, Curvature.CONSTANT)
 
-def compute_dcp_properties(expr):
-    # TODO(mwytock): Handle all unary/binary operators in this fashion.
-    if expr.expression_type == expression_pb2.Expression.NEGATE:
-        dcp_attr = -expr.arg[0].dcp_props.dcp_attr
-    else:
-        dcp_attr = cvxpy.utilities.DCPAttr(
-            compute_sign(expr), compute_curvature(expr), compute_shape(expr))
+def is_convex(c):
+    return is_affine(c) or c == Curvature.CONVEX
+
+def is_concave(c):
+    return is_affine(c) or c == Curvature.CONCAVE
+
+def is_positive(s):
+    return s in (Sign.POSITIVE, Sign.ZERO)
+
+def is_negative(s):
+    return s in (Sign.NEGATIVE, Sign.ZERO)
+
+def add_curvature(a, b):
+    if a == Curvature.CONSTANT:
+        return b
+    if is_affine(a) and is_affine(b):
+        return Curvature.AFFINE
+    if is_convex(a) and is_convex(b):
+        return Curvature.CONVEX
+    if is_concave(a) and is_concave(b):
+        return Curvature.CONCAVE
+    return Curvature.UNKNOWN
+
+NEGATE_CURVATURE = {
+    Curvature.UNKNOWN: Curvature.UNKNOWN,
+    Curvature.AFFINE: Curvature.AFFINE,
+    Curvature.CONVEX: Curvature.CONCAVE,
+    Curvature.CONCAVE: Curvature.CONVEX,
+    Curvature.CONSTANT: Curvature.CONSTANT,
+}
 
-    props = DCPProperties(dcp_attr)
-    # print "compute_dcp_properties"
-    # print tree_format.format_expr(expr)
-    # print props.dcp_attr.curvature
-    return props
+NEGATE_SIGN = {
+    Sign.UNKNOWN: Sign.UNKNOWN,
+    Sign.NEGATIVE: Sign.POSITIVE,
+    Sign.POSITIVE: Sign.NEGATIVE,
+    Sign.ZERO: Sign.ZERO,
+}
 
-def compute_sign(expr):
-    return cvxpy.utilities.Sign(
-        expression_pb2.Sign.Type.Name(expr.sign.sign_type))
+def add_sign(a, b):
+    if a == Sign.ZERO:
+        return b
+    if a == Sign.POSITIVE and is_positive(b):
+        return a
+    if a == Sign.NEGATIVE and is_negative(b):
+        return a
+    return Sign.UNKNOWN
 
-def compute_shape(expr):
-    return cvxpy.utilities.Shape(expr.size.dim[0], expr.size.dim[1])
+def multiply_sign(a, b):
+    if a == Sign.ZERO or b == Sign.ZERO:
+        return Sign.ZERO
+    if a == Sign.UNKNOWN or b == Sign.UNKNOWN:
+        return Sign.UNKNOWN
+    return Sign.POSITIVE if a == b else Sign.NEGATIVE
+
+def compose_curvature(monotonicity, f, arg_sign, arg):
+    """Curvature of f in an argument, from cvxpy's dcp_curvature()."""
+    if arg == Curvature.CONSTANT:
+        return Curvature.CONSTANT
+    if is_affine(arg):
+        return f
+    if monotonicity == Monotonicity.INCREASING:
+        return add_curvature(f, arg)
+    if monotonicity == Monotonicity.DECREASING:
+        return add_curvature(f, NEGATE_CURVATURE[arg])
+    if monotonicity == Monotonicity.SIGNED and is_convex(f):
+        if ((is_convex(arg) and is_positive(arg_sign)) or
+            (is_concave(arg) and is_negative(arg_sign))):
+            return f
+        return Curvature.UNKNOWN
+    return add_curvature(add_curvature(f, arg), NEGATE_CURVATURE[arg])
+
+CURVATURES = Curvature.Type.values()
+MONOTONICITIES = Monotonicity.Type.values()
+SIGNS = Sign.Type.values()
+
+ADD_CURVATURE = {
+    (a, b): add_curvature(a, b) for a in CURVATURES for b in CURVATURES}
+
+COMPOSE_CURVATURE = {
+    (m, f, s, c): compose_curvature(m, f, s, c)
+    for m in MONOTONICITIES
+    for f in CURVATURES
+    for s in SIGNS
+    for c in CURVATURES}
+
+def compute_dcp_properties(expr):
+    """DCP properties of expr, given those of its arguments."""
+    if expr.expression_type == expression_pb2.Expression.NEGATE:
+        arg_props = expr.arg[0].dcp_props
+        return DCPProperties(
+            NEGATE_SIGN[arg_props.sign_type],
+            NEGATE_CURVATURE[arg_props.curvature.curvature_type])
+
+    return DCPProperties(expr.sign.sign_type, compute_curvature(expr))
 
 def compute_curvature(expr):
     """Compute curvature based on DCP rules, from cvxpy.atoms.atom"""
-    func_curvature = cvxpy.utilities.Curvature(
-        expression_pb2.Curvature.Type.Name(expr.func_curvature.curvature_type))
+    f = expr.func_curvature.curvature_type
     if not expr.arg:
-        return func_curvature
+        return f
 
     if expr.arg_monotonicity:
-        ms = [expression_pb2.Monotonicity.Type.Name(m.monotonicity_type)
-              for m in expr.arg_monotonicity]
+        ms = [m.monotonicity_type for m in expr.arg_monotonicity]
         assert len(ms) == len(expr.arg)
     else:
-        # Default
-        ms = [cvxpy.utilities.monotonicity.NONMONOTONIC]*len(expr.arg)
-
-    return reduce(
-        lambda a, b: a+b,
-        (cvxpy.utilities.monotonicity.dcp_curvature(
-            monotonicity,
-            func_curvature,
-            arg.dcp_props.dcp_attr.sign,
-            arg.dcp_props.dcp_attr.curvature)
-         for arg, monotonicity in zip(expr.arg, ms)))
+        ms = [Monotonicity.NONMONOTONIC]*len(expr.arg)
+
+    curvature = None
+    for arg, m in zip(expr.arg, ms):
+        arg_props = arg.dcp_props
+        c = COMPOSE_CURVATURE[
+            m, f, arg_props.sign_type, arg_props.curvature.curvature_type]
+        curvature = c if curvature is None else ADD_CURVATURE[curvature, c]
+    return curvature
@@ -0,0 +1,54 @@
+from nose.tools import assert_equal
+
+import cvxpy as cp
+import numpy as np
+
+from epopt import cvxpy_expr
+from epopt import expression
+from epopt.proto.epsilon.expression_pb2 import Curvature, Sign
+
+def expressions():
+    np.random.seed(0)
+    A = np.random.randn(3, 4)
+    x = cp.Variable(4)
+    y = cp.Variable(3)
+    return [
+        A*x,
+        cp.norm1(A*x - y),
+        -cp.norm2(x),
+        cp.log_sum_exp(x) - cp.sum_entries(cp.log(y)),
+        cp.sqrt(cp.norm2(x)),
+        cp.square(cp.norm1(x)),
+        cp.abs(cp.exp(x)),
+        cp.abs(-cp.exp(x)),
+        cp.abs(cp.log(x)),
+        cp.max_elemwise(cp.exp(y), -cp.log(y)),
+        cp.max_elemwise(cp.exp(y), cp.log(y)),
+        cp.min_elemwise(cp.log(y), -cp.exp(y)),
+        cp.inv_pos(cp.sqrt(x)),
+        cp.log(cp.exp(x)),
+        -(-cp.entr(x)),
+        cp.sum_squares(A*x) - cp.sum_entries(cp.entr(x)),
+        cp.kl_div(x[0], y[0]),
+        cp.log_det(cp.Variable(3, 3)),
+        cp.lambda_max(cp.Variable(3, 3)) + cp.norm(cp.Variable(3, 3), "nuc"),
+    ]
+
+def check_dcp_properties(cvxpy_expr_):
+    dcp_props = cvxpy_expr.convert_expression(cvxpy_expr_).dcp_props
+    assert_equal(cvxpy_expr_.curvature,
+                 Curvature.Type.Name(dcp_props.curvature.curvature_type))
+    assert_equal(cvxpy_expr_.sign, Sign.Type.Name(dcp_props.sign_type))
+    assert_equal(cvxpy_expr_.is_affine(), dcp_props.affine)
+    assert_equal(cvxpy_expr_.is_constant(), dcp_props.constant)
+
+def test_dcp_properties():
+    for expr in expressions():
+        yield check_dcp_properties, expr
+
+def test_deep_expression():
+    x = cp.Variable(1)
+    expr = cvxpy_expr.convert_expression(cp.exp(x))
+    for i in xrange(5000):
+        expr = expression.negate(expression.exp(expr))
+    assert_equal(Curvature.UNKNOWN, expr.dcp_props.curvature.curvature_type)
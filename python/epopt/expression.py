@@ -20,7 +20,7 @@ CONSTANT = Curvature(curvature_type=Curvature.CONSTANT)
 # Thin wrappers around Expression/Problem protobuf, making them immutable and
 # with reference semantics for args.
 class Problem(object):
-    def __init__(self, objective, constraint=[], data={}):
+    def __init__(self, objective, constraint=[], data={}, fixed_values={}):
         assert type(objective) is Expression
         for constr in constraint:
             assert type(constr) is Expression
@@ -29,6 +29,9 @@ class Problem(object):
         self.constraint = constraint
         self.data = data
 
+        # Values of variables eliminated by presolve, keyed by variable id
+        self.fixed_values = fixed_values
+
     def SerializeToString(self):
         proto = expression_pb2.Problem(
             objective=self.objective.proto_with_args,
@@ -68,7 +71,10 @@ class Expression(object):
     @property
     def dcp_props(self):
         if self._dcp_props is None:
-            self._dcp_props = dcp.compute_dcp_properties(self)
+            # Single bottom-up pass over the subexpressions not yet computed,
+            # avoiding deep recursion
+            for expr in postorder(self, lambda expr: expr._dcp_props is None):
+                expr._dcp_props = dcp.compute_dcp_properties(expr)
         return self._dcp_props
 
     @property
@@ -91,11 +97,28 @@ class Expression(object):
         return getattr(self.proto, name)
 
     def expression_data(self):
-        retval = dict(self.data)
-        for arg in self.arg:
-            retval.update(arg.expression_data())
+        retval = {}
+        # Visit subexpressions shared by several arguments once
+        for expr in postorder(self, lambda expr: True):
+            retval.update(expr.data)
         return retval
 
+def postorder(expr, visit):
+    """Returns expr and its subexpressions for which visit() is true, each
+    after its arguments, not descending into those for which it is false."""
+    retval = []
+    seen = set()
+    stack = [(expr, False)]
+    while stack:
+        expr, expanded = stack.pop()
+        if expanded:
+            retval.append(expr)
+        elif id(expr) not in seen:
+            seen.add(id(expr))
+            stack.append((expr, True))
+            stack.extend((arg, False) for arg in expr.arg if visit(arg))
+    return retval
+
 def from_proto(proto, arg, data):
     assert not proto.arg
     expr = Expression()
@@ -18,6 +18,11 @@ class LinearMap(object):
     def __getattr__(self, name):
         return getattr(self.proto, name)
 
+def from_proto(proto, data):
+    A = LinearMap(data=data)
+    A.proto.CopyFrom(proto)
+    return A
+
 # Atomic linear maps
 def kronecker_product(A, B):
     if A.m*A.n == 1:
@@ -68,6 +73,46 @@ def scalar(alpha, n):
         n=n,
         scalar=alpha)
 
+def select(n, offset, stride, shape):
+    """Selects x[offset + i*stride[0] + j*stride[1]] from an n-vector, with
+    (i,j) ranging over shape in column-major order."""
+    return LinearMap(
+        linear_map_type=expression_pb2.LinearMap.SELECT,
+        m=int(np.prod(shape)),
+        n=n,
+        offset=offset,
+        stride=stride,
+        shape=expression_pb2.Size(dim=shape))
+
+def permute(n, offset, stride, shape):
+    assert np.prod(shape) == n
+    return LinearMap(
+        linear_map_type=expression_pb2.LinearMap.PERMUTE,
+        m=n,
+        n=n,
+        offset=offset,
+        stride=stride,
+        shape=expression_pb2.Size(dim=shape))
+
+def scatter(m, offset, stride, shape):
+    """Transpose of select(m, offset, stride, shape)."""
+    return LinearMap(
+        linear_map_type=expression_pb2.LinearMap.SCATTER,
+        m=m,
+        n=int(np.prod(shape)),
+        offset=offset,
+        stride=stride,
+        shape=expression_pb2.Size(dim=shape))
+
+def selection_index(A):
+    """Indices selected by a SELECT/PERMUTE/SCATTER linear map."""
+    rows = A.shape.dim[0]
+    cols = A.shape.dim[1] if len(A.shape.dim) == 2 else 1
+    stride1 = A.stride[1] if len(A.stride) == 2 else 0
+    return (A.offset +
+            np.tile(np.arange(rows)*A.stride[0], cols) +
+            np.repeat(np.arange(cols)*stride1, rows))
+
 # Operations on linear maps
 def transpose(A):
     return LinearMap(
@@ -80,16 +125,36 @@ def identity(n):
     return scalar(1, n)
 
 def index(slice, n):
-    m = slice.stop - slice.start
-    if m == n:
+    step = slice.step or 1
+    m = len(xrange(slice.start, slice.stop, step))
+    if m == n and slice.start == 0 and step == 1:
         return identity(n)
-
-    A = sp.coo_matrix(
-        (np.ones(m),
-         (np.arange(m), np.arange(slice.start, slice.stop, slice.step))),
-        shape=(m, n))
-    data = {}
-    return sparse_matrix(constant.store(A, data), data)
+    return select(n, slice.start, [step], [m])
+
+def index_matrix(row_slice, col_slice, m, n):
+    """Selects the rows and columns of an m x n matrix."""
+    row_step = row_slice.step or 1
+    col_step = col_slice.step or 1
+    rows = len(xrange(row_slice.start, row_slice.stop, row_step))
+    cols = len(xrange(col_slice.start, col_slice.stop, col_step))
+    if (rows == m and row_slice.start == 0 and row_step == 1 and
+        cols == n and col_slice.start == 0 and col_step == 1):
+        return identity(m*n)
+    return select(
+        m*n, row_slice.start + col_slice.start*m, [row_step, col_step*m],
+        [rows, cols])
+
+def hstack_placement(m, n, offset, ni):
+    """Places an m x ni matrix in columns offset to offset+ni of m x n."""
+    if ni == n:
+        return identity(m*n)
+    return scatter(m*n, offset*m, [1], [m*ni])
+
+def vstack_placement(m, n, offset, mi):
+    """Places an mi x n matrix in rows offset to offset+mi of m x n."""
+    if mi == m:
+        return identity(m*n)
+    return scatter(m*n, offset, [1, m], [mi, n])
 
 def one_hot(i, n):
     return sparse_matrix(
@@ -125,30 +190,19 @@ def right_matrix_product(B, m):
     return kronecker_product(transpose(B), identity(m))
 
 def transpose_matrix(m, n):
-    A = sp.coo_matrix(
-        (np.ones(m*n),
-         (np.arange(m*n),
-          np.tile(np.arange(n)*m, m) + np.repeat(np.arange(m), n))),
-        shape=(m*n, m*n))
-    data = {}
-    return sparse_matrix(constant.store(A, data), data)
+    if m == 1 or n == 1:
+        return identity(m*n)
+    return permute(m*n, 0, [m, 1], [n, m])
 
-# NOTE(mwytock): Represent the following functions as sparse matrices. This is
-# not very efficient, but we expect these to be relatively rare so the sparse
-# matrix form should be fine.
 def diag_mat(n):
-    data = {}
-    rows = np.arange(n)
-    cols = np.arange(n)*(n+1)
-    A = sp.coo_matrix((np.ones(n), (rows, cols)), shape=(n, n*n))
-    return sparse_matrix(constant.store(A, data), data)
+    return select(n*n, 0, [n+1], [n])
 
 def diag_vec(n):
-    data = {}
-    rows = np.arange(n)*(n+1)
-    cols = np.arange(n)
-    A = sp.coo_matrix((np.ones(n), (rows, cols)), shape=(n*n, n))
-    return sparse_matrix(constant.store(A, data), data)
+    return scatter(n*n, 0, [n+1], [n])
+
+# NOTE(mwytock): Represent the following functions as sparse matrices. This is
+# not very efficient, but we expect these to be relatively rare so the sparse
+# matrix form should be fine.
 
 def trace(n):
     data = {}
@@ -0,0 +1,463 @@
+"""Build problems directly as Epsilon expression trees.
+
+This is a thin modeling layer which produces the same expression trees as
+converting the equivalent CVXPY problem with cvxpy_expr, including the DCP
+attributes of each atom, without constructing any CVXPY objects. Constants are
+given as numbers, NumPy arrays or SciPy sparse matrices and the losses over
+data sets are built from a single constant for all examples.
+
+    x = model.variable(n)
+    problem = model.minimize(
+        model.add(model.sum_squares(model.subtract(model.multiply(A, x), b)),
+                  model.multiply(lam, model.norm1(x))))
+    status, values = model.solve(problem)
+    x_value = model.value(values, x)
+"""
+
+import itertools
+import logging
+import numbers
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from epopt import constant as _constant
+from epopt import dcp
+from epopt import expression
+from epopt import solver
+from epopt.expression_util import *
+from epopt.proto.epsilon import solver_params_pb2
+from epopt.proto.epsilon.expression_pb2 import (
+    Constant, Curvature, Expression, Monotonicity, Sign, Size)
+
+VARIABLE_PREFIX = "model:var:"
+PARAMETER_PREFIX = "model:param:"
+
+ids = itertools.count()
+
+# Leaves
+
+def variable(m, n=1):
+    return expression.variable(m, n, VARIABLE_PREFIX + str(next(ids)))
+
+def parameter(m, n=1, sign="UNKNOWN"):
+    constant_type = Constant.SCALAR if m*n == 1 else Constant.DENSE_MATRIX
+    return expression.parameter(
+        m, n, PARAMETER_PREFIX + str(next(ids)), constant_type,
+        Sign(sign_type=Sign.Type.Value(sign)))
+
+def value_sign(value):
+    if sp.issparse(value):
+        max_value, min_value = value.max(), value.min()
+    else:
+        max_value, min_value = np.max(value), np.min(value)
+    return dcp.add_sign(scalar_sign(max_value), scalar_sign(min_value))
+
+def scalar_sign(value):
+    if value > 0:
+        return Sign.POSITIVE
+    elif value == 0:
+        return Sign.ZERO
+    return Sign.NEGATIVE
+
+def constant(value):
+    if isinstance(value, numbers.Number):
+        return expression.constant(1, 1, scalar=value)
+
+    if not sp.issparse(value):
+        value = np.asarray(value, dtype=np.double)
+        if value.ndim == 1:
+            value = value.reshape(value.shape[0], 1)
+    m, n = value.shape
+    data = {}
+    return expression.constant(
+        m, n,
+        data=data,
+        constant=_constant.store(value, data),
+        sign=Sign(sign_type=value_sign(value)))
+
+def as_expression(x):
+    if isinstance(x, expression.Expression):
+        return x
+    return constant(x)
+
+def sign(x):
+    """Sign of x as determined by CVXPY, some operators do not store this."""
+    if x.expression_type == Expression.NEGATE:
+        return dcp.NEGATE_SIGN[sign(x.arg[0])]
+    if x.expression_type == Expression.ADD:
+        return reduce(dcp.add_sign, (sign(arg) for arg in x.arg))
+    if x.expression_type in (Expression.MULTIPLY,
+                             Expression.MULTIPLY_ELEMENTWISE):
+        return reduce(dcp.multiply_sign, (sign(arg) for arg in x.arg))
+    if x.expression_type in (Expression.INDEX, Expression.TRANSPOSE):
+        return sign(x.arg[0])
+    return x.sign.sign_type
+
+def atom(expression_type, args, size, curvature, sign, monotonicity,
+         **kwargs):
+    return expression.Expression(
+        expression_type=expression_type,
+        size=Size(dim=size),
+        func_curvature=Curvature(curvature_type=curvature),
+        sign=Sign(sign_type=sign),
+        arg_monotonicity=[
+            Monotonicity(monotonicity_type=m) for m in monotonicity],
+        arg=args,
+        **kwargs)
+
+def elementwise(expression_type, x, curvature, sign, monotonicity):
+    x = as_expression(x)
+    return atom(expression_type, [x], dims(x), curvature, sign, [monotonicity])
+
+def reduction(expression_type, x, axis, curvature, sign, **kwargs):
+    x = as_expression(x)
+    if axis is None:
+        size = (1, 1)
+    else:
+        size = (1, dim(x, 1)) if axis == 0 else (dim(x, 0), 1)
+        kwargs.update(has_axis=True, axis=axis)
+    return atom(expression_type, [x], size, curvature, sign,
+                [Monotonicity.INCREASING], **kwargs)
+
+# Affine
+
+def add(*args):
+    # Nested sums are flattened, as CVXPY
+    terms = []
+    for arg in map(as_expression, args):
+        if arg.expression_type == Expression.ADD:
+            terms += arg.arg
+        else:
+            terms.append(arg)
+    return expression.add(*terms)
+
+def negate(x):
+    if not isinstance(x, expression.Expression):
+        return constant(-x)
+    return expression.negate(x)
+
+def subtract(x, y):
+    return add(x, negate(y))
+
+def multiply(A, x):
+    return expression.multiply(as_expression(A), as_expression(x))
+
+def multiply_elemwise(c, x):
+    return expression.multiply_elemwise(as_expression(c), as_expression(x))
+
+def transpose(x):
+    return expression.transpose(as_expression(x))
+
+def index(x, start_i, stop_i, start_j=None, stop_j=None):
+    return expression.index(as_expression(x), start_i, stop_i, start_j, stop_j)
+
+def affine(expression_type, args, size):
+    return atom(expression_type, args, size, Curvature.AFFINE,
+                reduce(dcp.add_sign, (sign(arg) for arg in args)),
+                [Monotonicity.INCREASING]*len(args))
+
+def sum_entries(x, axis=None):
+    x = as_expression(x)
+    return reduction(Expression.SUM, x, axis, Curvature.AFFINE, sign(x))
+
+def reshape(x, m, n):
+    x = as_expression(x)
+    if m*n != dim(x):
+        raise ValueError("Cannot reshape %s to %d x %d" % (dims(x), m, n))
+    return affine(Expression.RESHAPE, [x], (m, n))
+
+def hstack(*args):
+    args = [as_expression(arg) for arg in args]
+    return affine(
+        Expression.HSTACK, args,
+        reduce(lambda a, b: expression.stack_dims(a, b, 1), map(dims, args)))
+
+def vstack(*args):
+    args = [as_expression(arg) for arg in args]
+    return affine(
+        Expression.VSTACK, args,
+        reduce(lambda a, b: expression.stack_dims(a, b, 0), map(dims, args)))
+
+def diag(x):
+    """Diagonal matrix from a vector or diagonal of a matrix, as CVXPY."""
+    x = as_expression(x)
+    if dim(x, 1) == 1:
+        return affine(Expression.DIAG_VEC, [x], (dim(x), dim(x)))
+    return affine(Expression.DIAG_MAT, [x], (dim(x, 0), 1))
+
+def trace(X):
+    return affine(Expression.TRACE, [as_expression(X)], (1, 1))
+
+def kron(A, X):
+    A, X = as_expression(A), as_expression(X)
+    return atom(Expression.KRON, [A, X],
+                (dim(A, 0)*dim(X, 0), dim(A, 1)*dim(X, 1)),
+                Curvature.AFFINE, dcp.multiply_sign(sign(A), sign(X)),
+                [Monotonicity.INCREASING]*2)
+
+# Elementwise
+
+def abs_val(x):
+    return elementwise(Expression.ABS, x, Curvature.CONVEX, Sign.POSITIVE,
+                       Monotonicity.SIGNED)
+
+def exp(x):
+    return elementwise(Expression.EXP, x, Curvature.CONVEX, Sign.POSITIVE,
+                       Monotonicity.INCREASING)
+
+def log(x):
+    return elementwise(Expression.LOG, x, Curvature.CONCAVE, Sign.UNKNOWN,
+                       Monotonicity.INCREASING)
+
+def entr(x):
+    return elementwise(Expression.ENTR, x, Curvature.CONCAVE, Sign.UNKNOWN,
+                       Monotonicity.NONMONOTONIC)
+
+def logistic(x):
+    return elementwise(Expression.LOGISTIC, x, Curvature.CONVEX,
+                       Sign.POSITIVE, Monotonicity.INCREASING)
+
+def huber(x, M=1):
+    x = as_expression(x)
+    return atom(Expression.HUBER, [x], dims(x), Curvature.CONVEX,
+                Sign.POSITIVE, [Monotonicity.SIGNED], M=M)
+
+def is_power2(p):
+    return p == int(p) and p > 0 and (int(p) & (int(p) - 1)) == 0
+
+def power(x, p):
+    x = as_expression(x)
+    if p == 0:
+        raise ValueError("power with p = 0 is constant")
+    if p == 1:
+        curvature, monotonicity = Curvature.AFFINE, Monotonicity.INCREASING
+    elif p < 0:
+        curvature, monotonicity = Curvature.CONVEX, Monotonicity.DECREASING
+    elif p < 1:
+        curvature, monotonicity = Curvature.CONCAVE, Monotonicity.INCREASING
+    elif is_power2(p):
+        curvature, monotonicity = Curvature.CONVEX, Monotonicity.SIGNED
+    else:
+        curvature, monotonicity = Curvature.CONVEX, Monotonicity.INCREASING
+    return atom(Expression.POWER, [x], dims(x), curvature,
+                sign(x) if p == 1 else Sign.POSITIVE, [monotonicity],
+                p=float(p))
+
+def square(x):
+    return power(x, 2)
+
+def sqrt(x):
+    return power(x, 0.5)
+
+def inv_pos(x):
+    return power(x, -1)
+
+def max_elemwise(*args):
+    args = [as_expression(arg) for arg in args]
+    signs = [sign(arg) for arg in args]
+    if Sign.POSITIVE in signs:
+        max_sign = Sign.POSITIVE
+    elif Sign.ZERO in signs:
+        max_sign = Sign.POSITIVE if Sign.UNKNOWN in signs else Sign.ZERO
+    elif Sign.UNKNOWN in signs:
+        max_sign = Sign.UNKNOWN
+    else:
+        max_sign = Sign.NEGATIVE
+    return atom(Expression.MAX_ELEMENTWISE, args,
+                reduce(expression.elementwise_dims, map(dims, args)),
+                Curvature.CONVEX, max_sign,
+                [Monotonicity.INCREASING]*len(args))
+
+def min_elemwise(*args):
+    args = [as_expression(arg) for arg in args]
+    signs = [sign(arg) for arg in args]
+    if Sign.NEGATIVE in signs:
+        min_sign = Sign.NEGATIVE
+    elif Sign.ZERO in signs:
+        min_sign = Sign.NEGATIVE if Sign.UNKNOWN in signs else Sign.ZERO
+    elif Sign.UNKNOWN in signs:
+        min_sign = Sign.UNKNOWN
+    else:
+        min_sign = Sign.POSITIVE
+    return atom(Expression.MIN_ELEMENTWISE, args,
+                reduce(expression.elementwise_dims, map(dims, args)),
+                Curvature.CONCAVE, min_sign,
+                [Monotonicity.INCREASING]*len(args))
+
+def pos(x):
+    return max_elemwise(x, 0)
+
+def neg(x):
+    return negate(min_elemwise(x, 0))
+
+def kl_div(x, y):
+    x, y = as_expression(x), as_expression(y)
+    return atom(Expression.KL_DIV, [x, y],
+                expression.elementwise_dims(dims(x), dims(y)),
+                Curvature.CONVEX, Sign.POSITIVE,
+                [Monotonicity.NONMONOTONIC]*2)
+
+# Vector and matrix
+
+def pnorm(x, p):
+    x = as_expression(x)
+    if p >= 1:
+        curvature, monotonicity = Curvature.CONVEX, Monotonicity.SIGNED
+    else:
+        curvature, monotonicity = Curvature.CONCAVE, Monotonicity.INCREASING
+    return atom(Expression.NORM_P, [x], (1, 1), curvature, Sign.POSITIVE,
+                [monotonicity], p=float(p))
+
+def norm1(x):
+    return pnorm(x, 1)
+
+def norm2(x):
+    return pnorm(x, 2)
+
+def norm(x, p=2):
+    if p == "nuc":
+        return norm_nuc(x)
+    return pnorm(x, p)
+
+def quad_over_lin(x, y):
+    x, y = as_expression(x), as_expression(y)
+    return atom(Expression.QUAD_OVER_LIN, [x, y], (1, 1), Curvature.CONVEX,
+                Sign.POSITIVE, [Monotonicity.SIGNED, Monotonicity.DECREASING])
+
+def sum_squares(x):
+    return quad_over_lin(x, 1)
+
+def log_sum_exp(x, axis=None):
+    return reduction(Expression.LOG_SUM_EXP, x, axis, Curvature.CONVEX,
+                     Sign.UNKNOWN)
+
+def max_entries(x, axis=None):
+    x = as_expression(x)
+    return reduction(Expression.MAX_ENTRIES, x, axis, Curvature.CONVEX,
+                     sign(x))
+
+def sum_largest(x, k):
+    x = as_expression(x)
+    return reduction(Expression.SUM_LARGEST, x, None, Curvature.CONVEX,
+                     sign(x), k=k)
+
+def matrix_atom(expression_type, X, curvature, sign):
+    return atom(expression_type, [as_expression(X)], (1, 1), curvature, sign,
+                [Monotonicity.NONMONOTONIC])
+
+def lambda_max(X):
+    return matrix_atom(
+        Expression.LAMBDA_MAX, X, Curvature.CONVEX, Sign.UNKNOWN)
+
+def log_det(X):
+    return matrix_atom(Expression.LOG_DET, X, Curvature.CONCAVE, Sign.UNKNOWN)
+
+def norm_nuc(X):
+    return matrix_atom(Expression.NORM_NUC, X, Curvature.CONVEX, Sign.POSITIVE)
+
+def sigma_max(X):
+    return matrix_atom(
+        Expression.SIGMA_MAX, X, Curvature.CONVEX, Sign.POSITIVE)
+
+def matrix_frac(x, P):
+    x, P = as_expression(x), as_expression(P)
+    return atom(Expression.MATRIX_FRAC, [x, P], (1, 1), Curvature.CONVEX,
+                Sign.POSITIVE, [Monotonicity.NONMONOTONIC]*2)
+
+# Losses summed over examples, the rows of X, as epopt.functions
+
+def check_binary_labels(y):
+    if not all(np.unique(y) == [-1, 1]):
+        raise ValueError("y must have binary labels in {-1,1}")
+
+def hinge_loss(theta, X, y):
+    check_binary_labels(y)
+    return sum_entries(pos(subtract(1, multiply(sp.diags([y],[0])*X, theta))))
+
+def logistic_loss(theta, X, y):
+    check_binary_labels(y)
+    return sum_entries(logistic(multiply(-sp.diags([y],[0])*X, theta)))
+
+def one_hot(y, k):
+    m = len(y)
+    return sp.coo_matrix(
+        (np.ones(m), (np.arange(m), y)), shape=(m, k)).todense()
+
+def softmax_loss(Theta, X, y):
+    k = dim(Theta, 1)
+    Y = one_hot(y, k)
+    return subtract(
+        sum_entries(log_sum_exp(multiply(X, Theta), axis=1)),
+        sum_entries(multiply_elemwise(X.T.dot(Y), Theta)))
+
+def multiclass_hinge_loss(Theta, X, y):
+    k = dim(Theta, 1)
+    Y = one_hot(y, k)
+    return subtract(
+        sum_entries(max_entries(add(multiply(X, Theta), 1 - Y), axis=1)),
+        sum_entries(multiply_elemwise(X.T.dot(Y), Theta)))
+
+def quantile_loss(alphas, Theta, X, y):
+    m, n = X.shape
+    k = len(alphas)
+    Y = np.tile(y.flatten(), (k, 1)).T
+    A = np.tile(alphas, (m, 1))
+    Z = subtract(multiply(X, Theta), Y)
+    return sum_entries(
+        max_elemwise(
+            multiply_elemwise(-A, Z),
+            multiply_elemwise(1-A, Z)))
+
+def poisson_loss(theta, X, y):
+    return subtract(
+        sum_entries(exp(multiply(X, theta))),
+        sum_entries(multiply(sp.diags([y],[0])*X, theta)))
+
+# Constraints
+
+def eq(x, y):
+    return expression.eq_constraint(as_expression(x), as_expression(y))
+
+def leq(x, y):
+    return expression.leq_constraint(as_expression(x), as_expression(y))
+
+def geq(x, y):
+    return leq(y, x)
+
+def psd(X, Y=0):
+    return expression.psd_constraint(as_expression(X), as_expression(Y))
+
+# Problems
+
+def minimize(f, constraints=[]):
+    return expression.Problem(
+        objective=as_expression(f), constraint=list(constraints))
+
+def maximize(f, constraints=[]):
+    return minimize(negate(f), constraints)
+
+def solve(problem, parameter_values={}, **kwargs):
+    """Solves a problem given the values of its parameters.
+
+    Returns the solver status and the values of the variables by variable id,
+    see value().
+    """
+    solver_params = solver_params_pb2.SolverParams(**kwargs)
+    t0 = time.time()
+    compiled_problem = solver.compile_expression(problem, solver_params)
+    t1 = time.time()
+    logging.info("Epsilon compile time: %.4f seconds", t1-t0)
+
+    solver_status, values = solver.solve_compiled(
+        compiled_problem,
+        dict((param.constant.parameter_id, value)
+             for param, value in parameter_values.iteritems()),
+        solver_params)
+    logging.info("Epsilon solve time: %.4f seconds", time.time()-t1)
+    return solver_status, values
+
+def value(values, x):
+    # Native arrays are column-major so this reshape does not copy
+    return values[x.variable.variable_id].reshape(dims(x), order="F")
@@ -0,0 +1,136 @@
+import subprocess
+import sys
+
+from nose.tools import assert_equal
+
+import cvxpy as cp
+import numpy as np
+import scipy.sparse as sp
+
+from epopt import cvxpy_expr
+from epopt import functions
+from epopt import model
+from epopt.compiler import compile_cache
+from epopt.proto.epsilon.solver_pb2 import SolverStatus
+
+def canonical(problem):
+    canonical_problem, bindings = compile_cache.canonicalize(problem)
+    return canonical_problem.SerializeToString(), bindings.data
+
+def assert_same_problem(cvxpy_problem, problem):
+    assert_equal(
+        canonical(cvxpy_expr.convert_problem(cvxpy_problem)),
+        canonical(problem))
+
+def test_lasso():
+    np.random.seed(0)
+    A = np.random.randn(5, 10)
+    b = np.random.randn(5)
+    x = cp.Variable(10)
+    cvxpy_problem = cp.Problem(cp.Minimize(
+        cp.sum_squares(A*x - b) + 0.1*cp.norm1(x)), [x >= -1])
+
+    x = model.variable(10)
+    problem = model.minimize(
+        model.add(
+            model.sum_squares(model.subtract(model.multiply(A, x), b)),
+            model.multiply(0.1, model.norm1(x))),
+        [model.geq(x, -1)])
+    assert_same_problem(cvxpy_problem, problem)
+
+    status, values = model.solve(problem)
+    assert_equal(SolverStatus.OPTIMAL, status.state)
+    cvxpy_problem.solve()
+    np.testing.assert_allclose(
+        cvxpy_problem.variables()[0].value, model.value(values, x),
+        rtol=1e-2, atol=1e-2)
+
+def test_losses():
+    np.random.seed(0)
+    m, n, k = 20, 5, 3
+    X = np.random.randn(m, n)
+    y = np.sign(np.random.randn(m))
+    labels = np.random.randint(k, size=m)
+    alphas = np.array([0.2, 0.5, 0.8])
+
+    theta, Theta = cp.Variable(n), cp.Variable(n, k)
+    cvxpy_problem = cp.Problem(cp.Minimize(
+        functions.hinge_loss(theta, X, y) +
+        functions.logistic_loss(theta, X, y) +
+        functions.softmax_loss(Theta, X, labels) +
+        functions.quantile_loss(alphas, Theta, X, X[:,0]) +
+        functions.poisson_loss(theta, X, np.abs(y))))
+
+    theta, Theta = model.variable(n), model.variable(n, k)
+    problem = model.minimize(model.add(
+        model.hinge_loss(theta, X, y),
+        model.logistic_loss(theta, X, y),
+        model.softmax_loss(Theta, X, labels),
+        model.quantile_loss(alphas, Theta, X, X[:,0]),
+        model.poisson_loss(theta, X, np.abs(y))))
+    assert_same_problem(cvxpy_problem, problem)
+
+def test_atoms():
+    np.random.seed(0)
+    A = np.random.randn(3, 3)
+    B = sp.rand(3, 3, density=0.5)
+    x, y, X = cp.Variable(3), cp.Variable(3), cp.Variable(3, 3)
+    cvxpy_problem = cp.Problem(cp.Minimize(
+        cp.abs(x[0]) + cp.sum_entries(cp.exp(x) - cp.log(y) - cp.entr(y)) +
+        cp.log_sum_exp(X, axis=1)[0] + cp.max_entries(X, axis=0)[0, 1] +
+        cp.sum_entries(cp.huber(x, 2) + cp.square(x) + cp.inv_pos(y) -
+                       cp.sqrt(y) + cp.power(x, 3) + cp.neg(y)) +
+        cp.norm2(B*x) + cp.norm(X, "nuc") + cp.kl_div(x[0], y[1]) +
+        cp.sum_largest(cp.vstack(x, y), 2) + cp.lambda_max(X) -
+        cp.log_det(X) + cp.trace(cp.diag(x)) + cp.sum_entries(cp.diag(X)) +
+        cp.quad_over_lin(x, y[2]) + cp.sigma_max(cp.reshape(X, 1, 9)) +
+        cp.max_entries(cp.hstack(x, y)) + cp.sum_entries(cp.kron(A, X)) +
+        cp.sum_entries(cp.min_elemwise(x.T, -y.T))),
+        [X == X.T, X >> 0, cp.mul_elemwise(A[:,0], x) <= 1])
+
+    x, y, X = model.variable(3), model.variable(3), model.variable(3, 3)
+    problem = model.minimize(
+        model.add(
+            model.abs_val(model.index(x, 0, 1)),
+            model.sum_entries(model.add(
+                model.exp(x), model.negate(model.log(y)),
+                model.negate(model.entr(y)))),
+            model.index(model.log_sum_exp(X, axis=1), 0, 1),
+            model.index(model.max_entries(X, axis=0), 0, 1, 1, 2),
+            model.sum_entries(model.add(
+                model.huber(x, 2), model.square(x), model.inv_pos(y),
+                model.negate(model.sqrt(y)), model.power(x, 3),
+                model.neg(y))),
+            model.norm2(model.multiply(B, x)),
+            model.norm(X, "nuc"),
+            model.kl_div(model.index(x, 0, 1), model.index(y, 1, 2)),
+            model.sum_largest(model.vstack(x, y), 2),
+            model.lambda_max(X),
+            model.negate(model.log_det(X)),
+            model.trace(model.diag(x)),
+            model.sum_entries(model.diag(X)),
+            model.quad_over_lin(x, model.index(y, 2, 3)),
+            model.sigma_max(model.reshape(X, 1, 9)),
+            model.max_entries(model.hstack(x, y)),
+            model.sum_entries(model.kron(A, X)),
+            model.sum_entries(model.min_elemwise(
+                model.transpose(x), model.negate(model.transpose(y))))),
+        [model.eq(X, model.transpose(X)),
+         model.psd(X),
+         model.leq(model.multiply_elemwise(A[:,0], x), 1)])
+    assert_same_problem(cvxpy_problem, problem)
+
+def test_without_cvxpy():
+    # Run in a new interpreter with cvxpy blocked, as it is already imported
+    # here
+    script = "\n".join([
+        "import sys",
+        "sys.modules['cvxpy'] = None",
+        "import numpy as np",
+        "from epopt import model",
+        "x = model.variable(3)",
+        "status, values = model.solve(model.minimize(",
+        "    model.sum_squares(model.subtract(x, np.ones(3)))))",
+        "assert np.allclose(model.value(values, x).ravel(), 1, atol=1e-3)",
+    ])
+    subprocess.check_call([sys.executable, "-c", script])
@@ -2,7 +2,12 @@
 
 import argparse
 import logging
+import os
+import resource
+import signal
+import subprocess
 import sys
+import tempfile
 import time
 
 import cvxpy as cp
@@ -12,6 +17,8 @@ from epopt import cvxpy_expr
 from epopt import cvxpy_solver
 from epopt.compiler import compiler
 from epopt.problems import *
+from epopt.problems import benchmark_results
+from epopt.problems import benchmark_scaling
 from epopt.problems import benchmark_util
 
 from epopt.problems.problem_instance import ProblemInstance
@@ -165,8 +172,6 @@ def benchmark_cvxpy(solver, cvxpy_prob):
             kwargs["feastol"] = 1e-6*kwargs["abstol"]
 
     try:
-        # TODO(mwytock): ProblemInstanceably need to run this in a separate thread/process
-        # and kill after one hour?
         cvxpy_prob.solve(**kwargs)
         if args.debug:
             print_constraints(cvxpy_prob)
@@ -182,34 +187,202 @@ BENCHMARKS = {
     "ecos": lambda p: benchmark_cvxpy(cp.ECOS, p),
 }
 
-def run_benchmarks(benchmarks, problems):
+def epsilon_metrics():
+    """Per-phase timings and residuals from the last epsilon solve."""
+    info = cvxpy_solver.last_solve_info
+    if info is None:
+        return {}
+
+    timing = info.status.timing
+    residuals = info.status.residuals
+    num_iterations = info.status.num_iterations
+    return {
+        "compile_time": info.compile_time,
+        "init_time": timing.init_time,
+        "iteration_time": (
+            (timing.total_time - timing.init_time) / max(num_iterations, 1)),
+        "num_iterations": num_iterations,
+        "r_norm": residuals.r_norm,
+        "s_norm": residuals.s_norm,
+        "data_size": info.data_size,
+    }
+
+def run_benchmarks(benchmarks, problems, trials=1, measure_rss=False):
+    """Yields a dictionary of results for each trial of each benchmark.
+
+    The peak resident set size is only reported with measure_rss, for worker
+    processes running a single problem, as otherwise it includes earlier
+    problems.
+    """
     for problem in problems:
         logging.debug("problem %s", problem.name)
 
-        t0 = time.time()
-        np.random.seed(0)
-        cvxpy_prob = problem.create()
-        f_eval = None
-        if isinstance(cvxpy_prob, tuple):
-            cvxpy_prob, f_eval = cvxpy_prob
-        t1 = time.time()
-        logging.debug("creation time %f seconds", t1-t0)
-
-        data = [problem.name]
         for benchmark in benchmarks:
-            logging.debug("running %s", benchmark)
-
-            t0 = time.time()
-            value = BENCHMARKS[benchmark](cvxpy_prob)
-            t1 = time.time()
-
-            if f_eval:
-                if args.debug:
-                    print "Use corrected objective"
-                value = f_eval()
+            for trial in xrange(trials):
+                logging.debug("running %s, trial %d", benchmark, trial)
+
+                t0 = time.time()
+                np.random.seed(0)
+                cvxpy_prob = problem.create()
+                f_eval = None
+                if isinstance(cvxpy_prob, tuple):
+                    cvxpy_prob, f_eval = cvxpy_prob
+                t1 = time.time()
+                create_time = t1-t0
+                logging.debug("creation time %f seconds", create_time)
+
+                cvxpy_solver.last_solve_info = None
+                t0 = time.time()
+                value = BENCHMARKS[benchmark](cvxpy_prob)
+                t1 = time.time()
+
+                if f_eval:
+                    if args.debug:
+                        print "Use corrected objective"
+                    value = f_eval()
+
+                logging.debug("done %f seconds", t1-t0)
+                result = dict((metric, None)
+                              for metric in benchmark_results.METRICS)
+                result.update(epsilon_metrics())
+                result.update({
+                    "benchmark": benchmark,
+                    "problem": problem.name,
+                    "trial": trial,
+                    "status": "ok",
+                    "create_time": create_time,
+                    "total_time": t1-t0,
+                    "objective": value,
+                })
+                if measure_rss:
+                    result["peak_rss"] = benchmark_util.peak_rss()
+                yield result
+
+# Environment variables controlling the number of threads used by BLAS
+# implementations backing numpy, these must be set before numpy is imported.
+BLAS_THREAD_VARS = [
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OMP_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+]
 
-            logging.debug("done %f seconds", t1-t0)
-            yield benchmark, "%-15s" % problem.name, t1-t0, value
+class Worker(object):
+    """A benchmark running in a separate process with resource limits."""
+
+    def __init__(self, benchmark, problem, trials, timeout, memory_limit,
+                 blas_threads):
+        self.benchmark = benchmark
+        self.problem = problem
+        self.trials = trials
+        self.timeout = timeout
+
+        fd, self.results_file = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.log = tempfile.TemporaryFile()
+
+        cmd = [sys.executable, "-m", "epopt.problems.benchmark",
+               "--benchmark", benchmark,
+               "--problem-set", args.problem_set,
+               "--problem", problem.name,
+               "--trials", str(trials),
+               "--results", self.results_file,
+               "--worker"]
+        if args.iterations:
+            cmd += ["--iterations", str(args.iterations)]
+        if args.scs_indirect:
+            cmd += ["--scs-indirect"]
+
+        env = dict(os.environ)
+        for var in BLAS_THREAD_VARS:
+            env[var] = str(blas_threads)
+
+        def preexec():
+            # New process group so that children are killed on timeout
+            os.setsid()
+            if memory_limit:
+                resource.setrlimit(
+                    resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+        self.start_time = time.time()
+        self.process = subprocess.Popen(
+            cmd, env=env, stdout=self.log, stderr=subprocess.STDOUT,
+            preexec_fn=preexec)
+
+    def poll(self):
+        """Returns results if finished, None otherwise."""
+        if self.process.poll() is None:
+            if time.time() - self.start_time < self.timeout:
+                return None
+            os.killpg(self.process.pid, signal.SIGKILL)
+            self.process.wait()
+            return self.finish("timeout")
+
+        if self.process.returncode == 0:
+            return self.finish("ok")
+
+        # Killed without a timeout, typically by the kernel OOM killer
+        if self.process.returncode == -signal.SIGKILL:
+            return self.finish("memory")
+
+        self.log.seek(0)
+        output = self.log.read()
+        if "MemoryError" in output or "bad_alloc" in output:
+            return self.finish("memory")
+        logging.warning("%s %s failed:\n%s",
+                        self.benchmark, self.problem.name, output)
+        return self.finish("error")
+
+    def finish(self, status):
+        with open(self.results_file) as f:
+            results = benchmark_results.read_results(f)
+        os.remove(self.results_file)
+        self.log.close()
+
+        # Record trials which did not complete as outcomes
+        for trial in xrange(len(results), self.trials):
+            result = dict((metric, None)
+                          for metric in benchmark_results.METRICS)
+            result.update({
+                "benchmark": self.benchmark,
+                "problem": self.problem.name,
+                "trial": trial,
+                "status": status,
+                "total_time": (
+                    time.time() - self.start_time if status == "timeout"
+                    else None),
+            })
+            results.append(result)
+        return results
+
+def run_benchmarks_parallel(benchmarks, problems, trials=1, workers=1,
+                            timeout=3600, memory_limit=None, blas_threads=1):
+    """Runs each benchmark and problem in a separate process.
+
+    Up to workers processes are run concurrently and results are yielded as
+    they complete, so may be in a different order than the problems.
+    Timeouts and running out of memory are recorded in the status of each
+    result.
+    """
+    pending = [(b, p) for p in problems for b in benchmarks]
+    pending.reverse()
+    running = []
+    while pending or running:
+        while pending and len(running) < workers:
+            benchmark, problem = pending.pop()
+            logging.debug("starting %s %s", benchmark, problem.name)
+            running.append(Worker(
+                benchmark, problem, trials, timeout, memory_limit,
+                blas_threads))
+
+        time.sleep(0.1)
+        for worker in list(running):
+            results = worker.poll()
+            if results is None:
+                continue
+            running.remove(worker)
+            for result in results:
+                yield result
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -223,6 +396,22 @@ if __name__ == "__main__":
     parser.add_argument("--scs-indirect", action="store_true")
     parser.add_argument("--iterations", type=int)
     parser.add_argument("--write")
+    parser.add_argument("--trials", type=int, default=1)
+    parser.add_argument("--results", help="Write JSON results to this file")
+    parser.add_argument("--baseline", help="Compare to JSON results in this file")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative slowdown reported as a regression")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Run problems in this many worker processes")
+    parser.add_argument("--timeout", type=float, default=3600,
+                        help="Time limit in seconds for each worker")
+    parser.add_argument("--memory-limit", type=float,
+                        help="Address space limit in GB for each worker")
+    parser.add_argument("--blas-threads", type=int, default=1)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--scaling", action="store_true",
+                        help="Fit time versus size, e.g. for PROBLEMS_SCALE")
+    parser.add_argument("--scaling-fits", help="Write JSON fits to this file")
     args = parser.parse_args()
 
     problems = locals()[args.problem_set]
@@ -251,8 +440,58 @@ if __name__ == "__main__":
                 problem.create(), args.write, problem.name)
         sys.exit(0)
 
-    for result in run_benchmarks([args.benchmark], problems):
-        print "\t".join(str(x) for x in result)
+    benchmarks = args.benchmark.split(",")
+    if args.worker:
+        # Write each trial as it completes so results survive a timeout
+        with open(args.results, "w") as f:
+            for result in run_benchmarks(
+                    benchmarks, problems, args.trials, measure_rss=True):
+                benchmark_results.write_results([result], f)
+                f.flush()
+        sys.exit(0)
+
+    if args.workers:
+        memory_limit = (
+            int(args.memory_limit*(1<<30)) if args.memory_limit else None)
+        results_iter = run_benchmarks_parallel(
+            benchmarks, problems, args.trials, args.workers, args.timeout,
+            memory_limit, args.blas_threads)
+    else:
+        results_iter = run_benchmarks(benchmarks, problems, args.trials)
+
+    results = []
+    for result in results_iter:
+        print "\t".join(str(x) for x in (
+            result["benchmark"], "%-15s" % result["problem"],
+            result["total_time"], result["objective"], result["status"]))
+        sys.stdout.flush()
+        results.append(result)
+
+    if args.results:
+        with open(args.results, "w") as f:
+            benchmark_results.write_results(results, f)
+
+    failed = False
+    if args.scaling:
+        fits = benchmark_scaling.fit_scaling(results)
+        benchmark_scaling.print_fits(fits)
+        if args.scaling_fits:
+            with open(args.scaling_fits, "w") as f:
+                benchmark_scaling.write_fits(fits, f)
+        failed |= bool(benchmark_scaling.alerts(fits))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = benchmark_results.read_results(f)
+        regressions = benchmark_results.compare(
+            results, baseline, args.threshold)
+        benchmark_results.print_regressions(
+            regressions, args.threshold, sys.stderr)
+        failed |= bool(regressions)
+
+    sys.exit(1 if failed else 0)
 
 else:
-    args = argparse.Namespace()
+    args = argparse.Namespace(
+        debug=False, iterations=None, scs_indirect=False,
+        problem_set="PROBLEMS")
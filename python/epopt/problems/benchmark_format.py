@@ -105,7 +105,7 @@ if __name__ == "__main__":
     results = {}
 
     for line in sys.stdin:
-        benchmark, problem, time, value = line.split()
+        benchmark, problem, time, value = line.split()[:4]
         results[(problem, benchmark)] = (float(time), float(value))
 
     problems = set(k[0] for k in results)
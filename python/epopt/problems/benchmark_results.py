@@ -0,0 +1,122 @@
+"""Machine readable benchmark results and comparison against a baseline.
+
+Results are stored as JSON, one record per line, with a record for each trial
+of each (benchmark, problem) pair.
+"""
+
+import argparse
+import json
+import sys
+
+from collections import namedtuple
+
+import numpy as np
+
+# Metrics recorded for each trial, those not applicable to a benchmark (e.g.
+# iteration counts for SCS) are left as None.
+METRICS = [
+    "create_time",
+    "compile_time",
+    "init_time",
+    "iteration_time",
+    "total_time",
+    "num_iterations",
+    "r_norm",
+    "s_norm",
+    "objective",
+    "peak_rss",
+]
+
+# Metrics where an increase is considered a regression
+TIME_METRICS = ["compile_time", "init_time", "iteration_time", "total_time"]
+
+Regression = namedtuple(
+    "Regression", ["benchmark", "problem", "metric", "baseline", "value"])
+
+def write_results(results, f):
+    for result in results:
+        f.write(json.dumps(result, sort_keys=True) + "\n")
+
+def read_results(f):
+    return [json.loads(line) for line in f if line.strip()]
+
+def summarize(results):
+    """Median of each metric over trials, keyed by (benchmark, problem)."""
+    trials = {}
+    for result in results:
+        key = (result["benchmark"], result["problem"])
+        trials.setdefault(key, []).append(result)
+
+    summary = {}
+    for key, key_results in trials.items():
+        summary[key] = {}
+        for metric in METRICS:
+            values = [r[metric] for r in key_results
+                      if r.get(metric) is not None]
+            summary[key][metric] = (
+                float(np.median(values)) if values else None)
+    return summary
+
+def compare(results, baseline, threshold=0.1, metrics=TIME_METRICS,
+            min_time=1e-2):
+    """Returns regressions of more than threshold relative to the baseline.
+
+    Times below min_time seconds in both are ignored as they are dominated by
+    noise.
+    """
+    summary = summarize(results)
+    baseline_summary = summarize(baseline)
+
+    regressions = []
+    for key in sorted(summary):
+        if key not in baseline_summary:
+            continue
+        for metric in metrics:
+            value = summary[key][metric]
+            baseline_value = baseline_summary[key][metric]
+            if value is None or baseline_value is None:
+                continue
+            if max(value, baseline_value) < min_time:
+                continue
+            if value > (1+threshold)*baseline_value:
+                regressions.append(Regression(
+                    key[0], key[1], metric, baseline_value, value))
+    return regressions
+
+def print_comparison(results, baseline, f=sys.stdout):
+    summary = summarize(results)
+    baseline_summary = summarize(baseline)
+
+    f.write("%-10s %-20s %10s %10s %8s\n" % (
+        "benchmark", "problem", "baseline", "time", "ratio"))
+    for key in sorted(summary):
+        value = summary[key]["total_time"]
+        baseline_value = baseline_summary.get(key, {}).get("total_time")
+        if value is None or not baseline_value:
+            continue
+        f.write("%-10s %-20s %9.3fs %9.3fs %8.2f\n" % (
+            key[0], key[1], baseline_value, value, value/baseline_value))
+
+def print_regressions(regressions, threshold, f=sys.stdout):
+    for r in regressions:
+        f.write(
+            "REGRESSION %s %s %s: %.4f -> %.4f (+%.0f%%, threshold %.0f%%)\n" %
+            (r.benchmark, r.problem, r.metric, r.baseline, r.value,
+             100*(r.value/r.baseline - 1), 100*threshold))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("results")
+    parser.add_argument("baseline")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with open(args.results) as f:
+        results = read_results(f)
+    with open(args.baseline) as f:
+        baseline = read_results(f)
+
+    print_comparison(results, baseline)
+    regressions = compare(results, baseline, args.threshold)
+    print_regressions(regressions, args.threshold)
+    sys.exit(1 if regressions else 0)
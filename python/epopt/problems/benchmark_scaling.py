@@ -0,0 +1,118 @@
+"""Empirical scaling analysis of benchmark results over problem size sweeps.
+
+Problems in a sweep share a family name with the size appended, e.g.
+lasso_10, lasso_13, ..., and are fit against the size of their constant data
+with a power law, time = c*size^k, separately for each phase of the solve.
+"""
+
+import argparse
+import json
+import re
+import sys
+
+from collections import namedtuple
+
+import numpy as np
+
+from epopt.problems import benchmark_results
+
+PHASES = ["compile_time", "init_time", "iteration_time"]
+
+# Expected exponents for each phase, relative to the size of the data. Init
+# time includes matrix factorizations which can be super-linear.
+EXPECTED_EXPONENTS = {
+    "compile_time": 1.0,
+    "init_time": 1.5,
+    "iteration_time": 1.0,
+}
+
+# Overrides for particular families, keyed by (family, phase)
+FAMILY_EXPECTED_EXPONENTS = {}
+
+# Slack allowed above the expected exponent before alerting
+DEFAULT_SLACK = 0.25
+
+Fit = namedtuple(
+    "Fit", ["family", "phase", "exponent", "coefficient", "r_squared",
+            "num_points", "expected"])
+
+def family(problem_name):
+    """Strips the trailing size from the name of a problem in a sweep."""
+    return re.sub(r"_\d+$", "", problem_name)
+
+def fit_power_law(sizes, times):
+    """Least squares fit of log(time) = log(c) + k*log(size)."""
+    x = np.log(sizes)
+    y = np.log(times)
+    A = np.vstack([np.ones(len(x)), x]).T
+    (log_c, k), _, _, _ = np.linalg.lstsq(A, y, rcond=-1)
+
+    residual = y - A.dot([log_c, k])
+    total = y - np.mean(y)
+    ss_total = total.dot(total)
+    r_squared = 1 - residual.dot(residual)/ss_total if ss_total > 0 else 1.
+    return k, np.exp(log_c), r_squared
+
+def fit_scaling(results, min_points=3):
+    """Fits time versus data size for each family and phase."""
+    summary = benchmark_results.summarize(results)
+
+    sizes = {}
+    for result in results:
+        if result.get("data_size"):
+            key = (result["benchmark"], result["problem"])
+            sizes[key] = result["data_size"]
+
+    points = {}
+    for key, metrics in summary.items():
+        if key not in sizes:
+            continue
+        for phase in PHASES:
+            if metrics[phase] and metrics[phase] > 0:
+                points.setdefault((family(key[1]), phase), []).append(
+                    (sizes[key], metrics[phase]))
+
+    fits = []
+    for (name, phase), phase_points in sorted(points.items()):
+        if len(set(p[0] for p in phase_points)) < min_points:
+            continue
+        size, time = zip(*phase_points)
+        exponent, coefficient, r_squared = fit_power_law(size, time)
+        expected = FAMILY_EXPECTED_EXPONENTS.get(
+            (name, phase), EXPECTED_EXPONENTS[phase])
+        fits.append(Fit(name, phase, exponent, coefficient, r_squared,
+                        len(phase_points), expected))
+    return fits
+
+def alerts(fits, slack=DEFAULT_SLACK):
+    return [fit for fit in fits if fit.exponent > fit.expected + slack]
+
+def print_fits(fits, slack=DEFAULT_SLACK, f=sys.stdout):
+    f.write("%-20s %-15s %8s %10s %6s %6s %8s\n" % (
+        "family", "phase", "exponent", "coef", "r^2", "points", "expected"))
+    for fit in fits:
+        f.write("%-20s %-15s %8.2f %10.2e %6.2f %6d %8.2f%s\n" % (
+            fit.family, fit.phase, fit.exponent, fit.coefficient,
+            fit.r_squared, fit.num_points, fit.expected,
+            "  ALERT" if fit.exponent > fit.expected + slack else ""))
+
+def write_fits(fits, f):
+    for fit in fits:
+        f.write(json.dumps(fit._asdict(), sort_keys=True) + "\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("results", help="JSON results from benchmark.py")
+    parser.add_argument("--slack", type=float, default=DEFAULT_SLACK)
+    parser.add_argument("--fits", help="Write JSON fits to this file")
+    args = parser.parse_args()
+
+    with open(args.results) as f:
+        results = benchmark_results.read_results(f)
+
+    fits = fit_scaling(results)
+    print_fits(fits, args.slack)
+    if args.fits:
+        with open(args.fits, "w") as f:
+            write_fits(fits, f)
+    sys.exit(1 if alerts(fits, args.slack) else 0)
@@ -1,12 +1,87 @@
 
 import argparse
+import time
 
 from epopt.problems import benchmark
+from epopt.problems import benchmark_results
+from epopt.problems import benchmark_scaling
 from epopt.problems import lasso
 from epopt.problems.problem_instance import ProblemInstance
 
 
 def test_benchmarks():
-    benchmark.run_benchmarks(
-        [lambda p: 0],
-        [ProblemInstance("lasso", lasso.create, dict(m=5, n=10))])
+    results = list(benchmark.run_benchmarks(
+        ["epsilon"],
+        [ProblemInstance("lasso", lasso.create, dict(m=5, n=10))],
+        trials=2))
+
+    assert len(results) == 2
+    for result in results:
+        for metric in benchmark_results.METRICS:
+            if metric != "peak_rss":
+                assert result[metric] is not None, metric
+        # Only measured in worker processes running a single problem
+        assert result["peak_rss"] is None
+        assert result["num_iterations"] > 0
+        assert result["compile_time"] + result["init_time"] > 0
+
+def test_compare():
+    def result(problem, total_time):
+        return {"benchmark": "epsilon", "problem": problem,
+                "total_time": total_time}
+
+    baseline = [result("a", 1.0), result("a", 1.2), result("b", 2.0)]
+    results = [result("a", 1.1), result("b", 3.0), result("c", 1.0)]
+
+    regressions = benchmark_results.compare(results, baseline, threshold=0.2)
+    assert len(regressions) == 1
+    assert regressions[0].problem == "b"
+    assert regressions[0].metric == "total_time"
+
+class FakeClock(object):
+    """Advances an hour each time it is read, so that any timeout shorter than
+    this expires on the first poll of a worker."""
+    def __init__(self):
+        self.now = 0
+
+    def time(self):
+        self.now += 3600
+        return self.now
+
+    def sleep(self, secs):
+        time.sleep(secs)
+
+def test_benchmarks_parallel_timeout():
+    problems = [p for p in benchmark.PROBLEMS if p.name == "lasso"]
+    benchmark.time = FakeClock()
+    try:
+        results = list(benchmark.run_benchmarks_parallel(
+            ["epsilon"], problems, trials=2, timeout=60))
+    finally:
+        benchmark.time = time
+
+    assert len(results) == 2
+    for result in results:
+        assert result["status"] == "timeout"
+        assert result["objective"] is None
+
+def test_scaling():
+    results = []
+    for n in [10, 20, 40, 80]:
+        results.append({
+            "benchmark": "epsilon",
+            "problem": "lasso_%d" % n,
+            "data_size": n,
+            "compile_time": 1e-3*n,
+            "init_time": 1e-3*n,
+            "iteration_time": 1e-6*n**2,
+        })
+
+    fits = dict(((f.family, f.phase), f)
+                for f in benchmark_scaling.fit_scaling(results))
+    assert abs(fits["lasso", "compile_time"].exponent - 1) < 1e-8
+    assert abs(fits["lasso", "iteration_time"].exponent - 2) < 1e-8
+
+    alerts = benchmark_scaling.alerts(fits.values())
+    assert [(f.family, f.phase) for f in alerts] == [
+        ("lasso", "iteration_time")]
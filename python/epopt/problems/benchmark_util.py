@@ -2,6 +2,7 @@
 import errno
 import os
 import resource
+import sys
 
 from epopt import constant
 from epopt import cvxpy_expr
@@ -69,3 +70,13 @@ def write_problem(cvxpy_prob, location, name):
 
 def cpu_time():
     return resource.getrusage(resource.RUSAGE_SELF).ru_utime
+
+def peak_rss():
+    """Peak resident set size of this process in bytes.
+
+    This is the maximum over the lifetime of the process, so it only
+    corresponds to a single problem when that is all the process runs.
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux and bytes on OS X
+    return rss if sys.platform == "darwin" else rss*1024
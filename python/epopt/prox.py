@@ -38,14 +38,14 @@ def eval_prox_impl(prob, v_map, lam=1, prox_function_type=None, epigraph=False):
             f_expr.prox_function.epigraph != epigraph):
         raise ProblemError("prox did not compile to right type", problem)
 
-    v_bytes_map = {cvxpy_expr.variable_id(var):
-                   numpy.array(val, dtype=numpy.float64).tobytes(order="F")
+    v_array_map = {cvxpy_expr.variable_id(var):
+                   numpy.asfortranarray(val, dtype=numpy.float64)
                    for var, val in v_map.iteritems()}
 
     values = _solve.eval_prox(
         f_expr.SerializeToString(),
         lam,
         problem.expression_data(),
-        v_bytes_map)
+        v_array_map)
 
     cvxpy_solver.set_solution(prob, values)
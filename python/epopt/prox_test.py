@@ -170,6 +170,13 @@ PROX_TESTS = [
     #prox("SIGMA_MAX", lambda: cp.sigma_max(X)),
     prox("AFFINE", lambda: randn(n).T*x),
     prox("CONSTANT", lambda: 0),
+    prox("FUSED", lambda: cp.norm1(x), lambda: [x >= 0]),
+    prox("FUSED", lambda: cp.norm1(x), lambda: [x >= -0.5, x <= 0.5]),
+    prox("FUSED", lambda: cp.norm1(x) + cp.sum_squares(x)),
+    prox("FUSED", lambda: f_hinge() + cp.sum_squares(x - 1)),
+    prox("FUSED", lambda: cp.sum_entries(cp.exp(x)), C_non_negative_scaled),
+    prox("FUSED", lambda: cp.sum_squares(x), lambda: [x >= 0, x <= 1]),
+    prox("FUSED", None, lambda: C_non_negative_scaled_elemwise() + [x <= 1]),
     prox("LAMBDA_MAX", lambda: cp.lambda_max(X)),
     prox("LOG_SUM_EXP", lambda: cp.log_sum_exp(x)),
     prox("MAX", lambda: cp.max_entries(x)),
@@ -317,3 +324,17 @@ def test_second_order_cone():
     for v_map in v_maps:
         prob = cp.Problem(cp.Minimize(0), [cp.norm(x) <= t])
         yield run_prox, ProxFunction.SECOND_ORDER_CONE, prob, v_map
+
+def test_matrix_values():
+    # Non-square variable with a value which is neither C nor Fortran
+    # contiguous, values are exchanged in column-major order
+    np.random.seed(0)
+    Y = cp.Variable(3, 5)
+    V = np.random.randn(6, 5)[::2]
+    assert not V.flags.c_contiguous and not V.flags.f_contiguous
+
+    prob = cp.Problem(cp.Minimize(cp.sum_squares(Y)))
+    eval_prox_impl(prob, {Y: V}, lam=0.5,
+                   prox_function_type=ProxFunction.SUM_SQUARE)
+    assert Y.value.shape == (3, 5)
+    np.testing.assert_allclose(Y.value, V/2, rtol=1e-8)
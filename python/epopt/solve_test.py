@@ -57,6 +57,11 @@ PARAMS = [
     dict(use_epigraph=True),
     dict(use_epigraph=False),
     dict(solver="PROX_ADMM_TWO_BLOCK"),
+    dict(precision="SINGLE"),
+    dict(num_threads=2),
+    dict(normalize=True),
+    dict(presolve=False),
+    dict(simplify_linear_maps=False),
 ]
 
 def solve_problem(problem_instance, params):
@@ -81,3 +86,17 @@ def test_solve():
     for problem in PROBLEMS:
         for params in PARAMS:
             yield solve_problem, problem, dict(params)
+
+def test_matrix_values():
+    # Non-square variable and data which is neither C nor Fortran contiguous,
+    # values are returned in column-major order
+    np.random.seed(0)
+    X = cp.Variable(3, 5)
+    A = np.random.randn(6, 5)[::2]
+    assert not A.flags.c_contiguous and not A.flags.f_contiguous
+
+    prob = cp.Problem(cp.Minimize(cp.sum_squares(X - A) + cp.norm1(X)))
+    cvxpy_solver.solve(prob, rel_tol=1e-6, abs_tol=1e-6)
+    assert X.value.shape == (3, 5)
+    np.testing.assert_allclose(
+        X.value, np.sign(A)*np.maximum(np.abs(A) - 0.5, 0), atol=1e-4)
@@ -1,8 +1,13 @@
 #include <Python.h>
 
+#define NPY_NO_DEPRECATED_API NPY_1_7_API_VERSION
+#include <numpy/arrayobject.h>
+
 #include <setjmp.h>
 #include <stdlib.h>
 
+#include <set>
+
 #include <glog/logging.h>
 
 #include "epsilon/algorithms/prox_admm.h"
@@ -21,6 +26,7 @@ static PyObject* SolveError;
 
 std::unordered_map<std::string, std::unique_ptr<Solver>> global_solver_cache;
 
+// Values are NumPy arrays, read in column-major order to match vec()
 BlockVector GetVariableVector(PyObject* vars) {
   BlockVector x;
 
@@ -29,27 +35,66 @@ BlockVector GetVariableVector(PyObject* vars) {
   PyObject* value;
   while (PyDict_Next(vars, &pos, &key, &value)) {
     const char* key_str = PyString_AsString(key);
-    char* value_str;
-    Py_ssize_t value_str_len;
-    PyString_AsStringAndSize(value, &value_str, &value_str_len);
     CHECK(key_str != nullptr);
-    CHECK(value_str != nullptr);
-    CHECK(value_str_len % sizeof(double) == 0);
 
+    // Only copies if value is not already a Fortran-ordered double array
+    PyArrayObject* array = reinterpret_cast<PyArrayObject*>(
+        PyArray_FROMANY(value, NPY_DOUBLE, 0, 0, NPY_ARRAY_IN_FARRAY));
+    CHECK(array != nullptr);
     x(key_str) = Eigen::Map<const Eigen::VectorXd>(
-        reinterpret_cast<const double*>(value_str),
-        value_str_len/sizeof(double));
+        static_cast<const double*>(PyArray_DATA(array)),
+        PyArray_SIZE(array));
+    Py_DECREF(array);
   }
   return x;
 }
 
-PyObject* GetVariableMap(const BlockVector& x) {
+void DeleteVector(PyObject* capsule) {
+  delete static_cast<Eigen::VectorXd*>(PyCapsule_GetPointer(capsule, nullptr));
+}
+
+// Returns a 1-D NumPy array which takes ownership of the vector's buffer
+// without copying it, or nullptr with the Python error set on failure.
+PyObject* MoveToArray(Eigen::VectorXd* x) {
+  Eigen::VectorXd* data = new Eigen::VectorXd(std::move(*x));
+  npy_intp dims[1] = {data->rows()};
+  PyObject* array = PyArray_SimpleNewFromData(
+      1, dims, NPY_DOUBLE, data->data());
+  if (array == nullptr) {
+    delete data;
+    return nullptr;
+  }
+
+  PyObject* capsule = PyCapsule_New(data, nullptr, &DeleteVector);
+  if (capsule == nullptr) {
+    Py_DECREF(array);
+    delete data;
+    return nullptr;
+  }
+
+  // Steals the reference to capsule, also on failure
+  if (PyArray_SetBaseObject(
+          reinterpret_cast<PyArrayObject*>(array), capsule) < 0) {
+    Py_DECREF(array);
+    return nullptr;
+  }
+  return array;
+}
+
+// Returns a dict of variable values, or nullptr with the Python error set on
+// failure.
+PyObject* GetVariableMap(
+    const std::set<std::string>& keys, BlockVector* x) {
   PyObject* vars = PyDict_New();
-  for (auto iter : x.data()) {
-    PyObject* val = PyString_FromStringAndSize(
-        reinterpret_cast<const char*>(iter.second.data()),
-        iter.second.rows()*sizeof(double));
-    PyDict_SetItemString(vars, iter.first.c_str(), val);
+  if (vars == nullptr)
+    return nullptr;
+  for (const std::string& key : keys) {
+    PyObject* val = MoveToArray(&(*x)(key));
+    if (val == nullptr) {
+      Py_DECREF(vars);
+      return nullptr;
+    }
+    PyDict_SetItemString(vars, key.c_str(), val);
     Py_DECREF(val);
   }
   return vars;
@@ -161,20 +206,12 @@ static PyObject* Solve(PyObject* self, PyObject* args) {
     std::string status_str = solver->status().SerializeAsString();
 
     // Get results
-    PyObject* vars = PyDict_New();
-    {
-      for (const Expression* expr : GetVariables(problem)) {
-        const std::string& var_id = expr->variable().variable_id();
-        Eigen::VectorXd x = block_x(var_id);
-
-        PyObject* val = PyString_FromStringAndSize(
-            reinterpret_cast<const char*>(x.data()),
-            x.rows()*sizeof(double));
-
-        PyDict_SetItemString(vars, var_id.c_str(), val);
-        Py_DECREF(val);
-      }
-    }
+    std::set<std::string> var_ids;
+    for (const Expression* expr : GetVariables(problem))
+      var_ids.insert(expr->variable().variable_id());
+    PyObject* vars = GetVariableMap(var_ids, &block_x);
+    if (vars == nullptr)
+      return nullptr;
 
     PyObject* retval = Py_BuildValue("s#O", status_str.data(), status_str.size(), vars);
     Py_DECREF(vars);
@@ -231,7 +268,9 @@ static PyObject* EvalProx(PyObject* self, PyObject* args) {
         f_expr.prox_function().epigraph());
     op->Init(ProxOperatorArg(f_expr.prox_function(), data_map, H, A));
     BlockVector x = op->Apply(v);
-    PyObject* vars = GetVariableMap(x);
+    PyObject* vars = GetVariableMap(x.keys(), &x);
+    if (vars == nullptr)
+      return nullptr;
     PyObject* retval = Py_BuildValue("O", vars);
     Py_DECREF(vars);
     return retval;
@@ -283,6 +322,8 @@ PyMODINIT_FUNC init_solve() {
   if (m == nullptr)
     return;
 
+  import_array();
+
   SolveError = PyErr_NewException(
       const_cast<char*>("_solve.error"), nullptr, nullptr);
   Py_INCREF(SolveError);
@@ -0,0 +1,46 @@
+"""Compiling and solving problems built from Epsilon expressions.
+
+This does not depend on CVXPY, which is only needed to convert CVXPY problems
+in cvxpy_solver.
+"""
+
+from epopt import _solve
+from epopt import constant
+from epopt.compiler import compile_cache
+from epopt.compiler import compiler
+from epopt.proto.epsilon.solver_pb2 import SolverStatus
+
+def compile_expression(problem, solver_params):
+    """Compiles a problem built from Epsilon expressions."""
+    if solver_params.compile_cache_dir:
+        return compile_cache.compile_problem(problem, solver_params)
+    return compiler.compile_problem(problem, solver_params)
+
+def solve_compiled(problem, param_values, solver_params):
+    """Solves a compiled problem given the values of its parameters by id.
+
+    Returns the solver status and the values of all variables, including those
+    eliminated by presolve.
+    """
+    data = problem.expression_data()
+    if len(problem.objective.arg) == 1 and not problem.constraint:
+        # TODO(mwytock): Should probably parameterize the proximal operators so
+        # they can take A=0 instead of just using a large lambda here
+        lam = 1e12
+        values = _solve.eval_prox(
+            problem.objective.arg[0].SerializeToString(),
+            lam,
+            data,
+            {})
+        solver_status = SolverStatus(state=SolverStatus.OPTIMAL)
+    else:
+        status_str, values = _solve.solve(
+            problem.SerializeToString(),
+            [(param_id, constant.store(value, data).SerializeToString())
+             for param_id, value in param_values.iteritems()],
+            solver_params.SerializeToString(),
+            data)
+        solver_status = SolverStatus.FromString(status_str)
+
+    values.update(problem.fixed_values)
+    return solver_status, values
@@ -88,6 +88,13 @@ def linear_map_name(linear_map, name_map):
     elif linear_map.linear_map_type == LinearMap.TRANSPOSE:
         assert len(linear_map.arg) == 1
         return "transpose(" + linear_map_name(linear_map.arg[0], name_map) + ")"
+    elif linear_map.linear_map_type in (
+            LinearMap.SELECT, LinearMap.PERMUTE, LinearMap.SCATTER):
+        return "%s(%d, %s, %s)" % (
+            LinearMap.Type.Name(linear_map.linear_map_type).lower(),
+            linear_map.offset,
+            list(linear_map.stride),
+            list(linear_map.shape.dim))
 
     raise ValueError("unknown linear map type: %d" % linear_map.linear_map_type)
 
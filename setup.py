@@ -44,6 +44,14 @@ class BuildPyCommand(build_py):
         cmd = [PROTOC, "-I", PROTO_DIR, src, "--python_out=" + dst_dir]
         subprocess.check_call(cmd)
 
+class BuildExtCommand(build_ext):
+    def finalize_options(self):
+        build_ext.finalize_options(self)
+        # Imported here rather than at the top so that numpy can first be
+        # installed as a requirement
+        import numpy
+        self.include_dirs.append(numpy.get_include())
+
 class CleanCommand(Command):
     user_options = []
     def initialize_options(self):
@@ -74,7 +82,7 @@ epsilon_lib = os.path.join(BUILD_CC_DIR, "libepsilon.a")
 solve = Extension(
     name = "epopt._solve",
     sources = ["python/epopt/solvemodule.cc"],
-    libraries = ["blas"],
+    libraries = ["blas", "pthread"],
     language = "c++",
     extra_compile_args = ["-std=c++14"],
     depends = [epsilon_lib],
@@ -113,11 +121,16 @@ setup(
         "problems/mnist_tiny.mat",
     ]},
     ext_modules = [solve],
+    setup_requires = [
+        "numpy >= 1.7",
+    ],
     install_requires = [
         "cvxpy == 0.3.6",
+        "numpy >= 1.7",
         "protobuf >= 3.0.0a3"
     ],
     cmdclass = {
+        "build_ext": BuildExtCommand,
         "build_py": BuildPyCommand,
         "clean": CleanCommand
     }
@@ -10,9 +10,71 @@
 #include "epsilon/prox/prox.h"
 #include "epsilon/util/logging.h"
 #include "epsilon/util/string.h"
+#include "epsilon/vector/equilibrate.h"
 #include "epsilon/vector/vector_operator.h"
 #include "epsilon/vector/vector_util.h"
 
+// Number of Ruiz equilibration iterations when normalizing
+const int kEquilibrateIterations = 10;
+
+// Maximum number of iterations between residual checks, as a multiple of
+// epoch_iterations.
+const int kMaxEpochScale = 8;
+
+// Prox operators which allow their variables to be scaled by a diagonal
+// matrix, either since they are elementwise or solve a linear system.
+bool AllowsDiagonalScaling(const ProxFunction& f) {
+  if (f.epigraph() || f.has_axis())
+    return false;
+
+  switch (f.prox_function_type()) {
+    case ProxFunction::AFFINE:
+    case ProxFunction::CONSTANT:
+    case ProxFunction::FUSED:
+    case ProxFunction::NON_NEGATIVE:
+    case ProxFunction::NORM_1:
+    case ProxFunction::SUM_DEADZONE:
+    case ProxFunction::SUM_EXP:
+    case ProxFunction::SUM_HINGE:
+    case ProxFunction::SUM_INV_POS:
+    case ProxFunction::SUM_LOGISTIC:
+    case ProxFunction::SUM_NEG_ENTR:
+    case ProxFunction::SUM_NEG_LOG:
+    case ProxFunction::SUM_QUANTILE:
+    case ProxFunction::SUM_SQUARE:
+    case ProxFunction::ZERO:
+      return true;
+    default:
+      return false;
+  }
+}
+
+// Norm of x with each block divided by the corresponding scaling, if any
+double UnscaledNorm(const BlockVector& x, const BlockVector& scale) {
+  double norm_squared = 0;
+  for (const auto& iter : x.data()) {
+    auto scale_iter = scale.data().find(iter.first);
+    norm_squared += scale_iter == scale.data().end() ?
+        iter.second.squaredNorm() :
+        iter.second.cwiseQuotient(scale_iter->second).squaredNorm();
+  }
+  return sqrt(norm_squared);
+}
+
+// Scales the columns of A by e, columns without a scaling are unchanged
+BlockMatrix ScaleColumns(const BlockMatrix& A, const BlockVector& e) {
+  const BlockMatrix E = ScalingMatrix(e);
+  BlockMatrix B;
+  for (const auto& col_iter : A.data()) {
+    for (const auto& row_iter : col_iter.second) {
+      B(row_iter.first, col_iter.first) = e.has_key(col_iter.first) ?
+          row_iter.second*E(col_iter.first, col_iter.first) :
+          row_iter.second;
+    }
+  }
+  return B;
+}
+
 ProxADMMSolver::ProxADMMSolver(
     const Problem& problem,
     const DataMap& data_map,
@@ -37,11 +99,37 @@ void ProxADMMSolver::InitConstraints() {
         affine::constraint_key(i),
         &A_, &b_);
   }
+  if (params_.normalize())
+    InitScaling();
   AT_ = A_.Transpose();
   m_ = A_.m();
   n_ = A_.n();
 }
 
+void ProxADMMSolver::InitScaling() {
+  // Variables whose prox operators require scalar arguments, and the
+  // constraints involving them, are left unscaled.
+  std::set<std::string> fixed_keys;
+  for (const Expression& f_expr : problem().objective().arg()) {
+    if (AllowsDiagonalScaling(f_expr.prox_function()))
+      continue;
+    for (const Expression* expr : GetVariables(f_expr))
+      fixed_keys.insert(expr->variable().variable_id());
+  }
+  for (const auto& col_iter : A_.data()) {
+    if (fixed_keys.find(col_iter.first) == fixed_keys.end())
+      continue;
+    for (const auto& row_iter : col_iter.second)
+      fixed_keys.insert(row_iter.first);
+  }
+
+  Equilibrate(A_, fixed_keys, kEquilibrateIterations, params_.min_scale(),
+              &d_, &e_);
+  const BlockMatrix D = ScalingMatrix(d_);
+  A_ = D*A_*ScalingMatrix(e_);
+  b_ = D*b_;
+}
+
 void ProxADMMSolver::InitProxOperators() {
   CHECK_EQ(Expression::ADD, problem().objective().expression_type());
   N_ = problem().objective().arg_size();
@@ -50,7 +138,10 @@ void ProxADMMSolver::InitProxOperators() {
   CHECK_EQ(1, params_.rho());
   const double sqrt_rho = sqrt(params_.rho());
 
-  prox_.clear();
+  // The previous prox operators are released only once the new ones are
+  // initialized so that factorizations which are unchanged in a warm start
+  // solve are shared, see BlockCholesky.
+  std::vector<std::unique_ptr<ProxOperator> > prox;
   AiT_.clear();
   for (int i = 0; i < N_; i++) {
     const Expression& f_expr = problem().objective().arg(i);
@@ -64,6 +155,8 @@ void ProxADMMSolver::InitProxOperators() {
           affine::arg_key(i),
           &H.A, &H.b);
     }
+    if (params_.normalize())
+      H.A = ScaleColumns(H.A, e_);
 
     AffineOperator A;
     std::set<std::string> constr_vars = A_.col_keys();
@@ -84,13 +177,26 @@ void ProxADMMSolver::InitProxOperators() {
     bool epigraph = f_expr.prox_function().epigraph();
     VLOG(1) << "prox " << i << ", initializing "
             << ProxFunction::Type_Name(type);
-    prox_.emplace_back(CreateProxOperator(type, epigraph));
-    prox_.back()->Init(ProxOperatorArg(f_expr.prox_function(), data_map_, H, A));
+    prox.emplace_back(CreateProxOperator(type, epigraph));
+    prox.back()->Init(ProxOperatorArg(
+        f_expr.prox_function(), data_map_, H, A, params_));
     VLOG(1) << "prox " << i << " init done";
 
     // TODO(mwytock): This is scaled by rho now, figure out what to do here
     AiT_.push_back(A.A.Transpose());
   }
+  prox_.swap(prox);
+}
+
+void ProxADMMSolver::InitPrecision() {
+  if (params_.precision() != SolverParams::SINGLE)
+    return;
+
+  VLOG(1) << "Converting constraints to single precision";
+  A_ = A_.SinglePrecision();
+  AT_ = AT_.SinglePrecision();
+  for (int i = 0; i < N_; i++)
+    AiT_[i] = AiT_[i].SinglePrecision();
 }
 
 void ProxADMMSolver::InitVariables() {
@@ -112,6 +218,7 @@ void ProxADMMSolver::Init() {
 
   InitConstraints();
   InitProxOperators();
+  InitPrecision();
   if (!params_.warm_start() || !initialized_) {
     InitVariables();
     initialized_ = true;
@@ -129,10 +236,21 @@ void ProxADMMSolver::Init() {
 }
 
 BlockVector ProxADMMSolver::Solve() {
+  Timer timer;
   Init();
-
+  status_.mutable_timing()->set_init_time(timer.GetTimeUsec()*1e-6);
+
+  // Residuals are computed every epoch_iterations_ iterations and always on
+  // the last one, the previous A_i*x_i are kept only for these iterations.
+  // Status is logged only on these iterations so that residuals are current.
+  y_prev_.resize(N_);
+  epoch_iterations_ = params_.epoch_iterations();
+  check_iter_ = -1;
+  int next_check_iter = 0;
+  int next_log_iter = 0;
   for (iter_ = 0; iter_ < params_.max_iterations(); iter_++) {
-    y_prev_ = y_;
+    const bool check = (iter_ == next_check_iter ||
+                        iter_ == params_.max_iterations() - 1);
 
     u_ -= b_;
     for (int i = 0; i < N_; i++)
@@ -141,28 +259,34 @@ BlockVector ProxADMMSolver::Solve() {
     for (int i = 0; i < N_; i++) {
       u_ += y_[i];
       x_[i] = prox_[i]->Apply(u_);
+      if (check)
+        y_prev_[i] = std::move(y_[i]);
       y_[i] = A_*x_[i];
       u_ -= y_[i];
       VLOG(2) << "x[" << i << "]: " << x_[i].DebugString();
     }
     VLOG(2) << "u: " << u_.DebugString();
 
-    if (iter_ % params_.epoch_iterations() == 0) {
+    if (check) {
       ComputeResiduals();
       if (status_.state() == SolverStatus::OPTIMAL)
         break;
-    }
+      UpdateEpochIterations();
+      next_check_iter = iter_ + epoch_iterations_;
 
-    if (iter_ % params_.log_iterations() == 0) {
-      LogStatus();
+      if (iter_ >= next_log_iter) {
+        LogStatus();
+        next_log_iter = iter_ + params_.log_iterations();
+      }
     }
   }
 
   if (iter_ == params_.max_iterations()) {
-    ComputeResiduals();
+    status_.set_num_iterations(iter_);
     status_.set_state(SolverStatus::MAX_ITERATIONS_REACHED);
   }
 
+  status_.mutable_timing()->set_total_time(timer.GetTimeUsec()*1e-6);
   LogStatus();
   UpdateStatus(status_);
   return GetSolution();
@@ -172,6 +296,10 @@ BlockVector ProxADMMSolver::GetSolution() {
   BlockVector retval;
   for (int i = 0; i < N_; i++)
     retval += x_[i];
+  for (const auto& iter : e_.data()) {
+    if (retval.has_key(iter.first))
+      retval(iter.first) = retval(iter.first).cwiseProduct(iter.second);
+  }
   return retval;
 }
 
@@ -182,29 +310,35 @@ void ProxADMMSolver::ComputeResiduals() {
   const double rel_tol = params_.rel_tol();
   const double rho = params_.rho();
 
+  // With equilibration, residuals are unscaled so that the tolerances refer
+  // to the original problem. The products A_i*x_i are those of the last
+  // iteration, y_[i].
   VLOG(3) << "compute r norm";
   BlockVector Ax_b = b_;
-  double max_Ai_xi_norm = b_.norm();
+  double max_Ai_xi_norm = UnscaledNorm(b_, d_);
   for (int i = 0; i < N_; i++) {
-    BlockVector Ai_xi = A_*x_[i];
-    max_Ai_xi_norm = fmax(max_Ai_xi_norm, Ai_xi.norm());
-    Ax_b += Ai_xi;
+    max_Ai_xi_norm = fmax(max_Ai_xi_norm, UnscaledNorm(y_[i], d_));
+    Ax_b += y_[i];
   }
 
+  // The dual residual for each term is A_i'*sum_{j > i}(y_j - y_prev_j),
+  // the running sum is accumulated in place.
   VLOG(3) << "compute s norm";
   double s_norm_squared = 0;
   BlockVector Ax_diff;
   for (int i = N_ - 2; i >= 0; i--) {
-    Ax_diff += y_[i+1] - y_prev_[i+1];
-    const double s_norm_i = (AiT_[i]*Ax_diff).norm();
+    Ax_diff += y_[i+1];
+    Ax_diff -= y_prev_[i+1];
+    const double s_norm_i = UnscaledNorm(AiT_[i]*Ax_diff, e_);
     s_norm_squared += s_norm_i*s_norm_i;
   }
 
   VLOG(3) << "set residuals";
-  r->set_r_norm(Ax_b.norm());
+  r->set_r_norm(UnscaledNorm(Ax_b, d_));
   r->set_s_norm(rho*sqrt(s_norm_squared));
   r->set_epsilon_primal(abs_tol*sqrt(m_) + rel_tol*max_Ai_xi_norm);
-  r->set_epsilon_dual(  abs_tol*sqrt(n_) + rel_tol*rho*(AT_*u_).norm());
+  r->set_epsilon_dual(
+      abs_tol*sqrt(n_) + rel_tol*rho*UnscaledNorm(AT_*u_, e_));
 
   if (r->r_norm() <= r->epsilon_primal() &&
       r->s_norm() <= r->epsilon_dual()) {
@@ -216,6 +350,30 @@ void ProxADMMSolver::ComputeResiduals() {
   status_.set_num_iterations(iter_);
 }
 
+void ProxADMMSolver::UpdateEpochIterations() {
+  const SolverStatus::Residuals& r = status_.residuals();
+  const int min_epoch = params_.epoch_iterations();
+  const int max_epoch = kMaxEpochScale*min_epoch;
+
+  // Distance from the stopping criteria, converged when this is at most one
+  const double gap = fmax(r.r_norm()/r.epsilon_primal(),
+                          r.s_norm()/r.epsilon_dual());
+  if (check_iter_ >= 0) {
+    // Assuming linear convergence at the rate since the last check, the next
+    // check is halfway to the predicted convergence. Without progress checks
+    // become less frequent.
+    const double rate = pow(gap/check_gap_, 1./(iter_ - check_iter_));
+    double epoch = 2.*epoch_iterations_;
+    if (rate < 1)
+      epoch = 0.5*log(gap)/-log(rate);
+    epoch_iterations_ = static_cast<int>(
+        fmin(fmax(epoch, min_epoch), max_epoch));
+  }
+  check_iter_ = iter_;
+  check_gap_ = gap;
+  VLOG(2) << "next residual check in " << epoch_iterations_ << " iterations";
+}
+
 void ProxADMMSolver::LogStatus() {
   const SolverStatus::Residuals& r = status_.residuals();
   std::string status = StringPrintf(
@@ -28,10 +28,13 @@ public:
 private:
   void Init();
   void InitConstraints();
+  void InitScaling();
   void InitProxOperators();
+  void InitPrecision();
   void InitVariables();
 
   void ComputeResiduals();
+  void UpdateEpochIterations();
   void LogStatus();
   BlockVector GetSolution();
 
@@ -49,6 +52,10 @@ private:
   std::vector<BlockMatrix> AiT_;
   std::vector<std::unique_ptr<ProxOperator> > prox_;
 
+  // Equilibration, the solver operates on D*A*E with x = E*x_scaled. Empty
+  // if the problem is not normalized.
+  BlockVector d_, e_;
+
   // Iteration variables
   int iter_;
   BlockVector u_;
@@ -58,10 +65,15 @@ private:
   // Iteration variables
   SolverStatus status_;
 
-  // For computing residuals
+  // For computing residuals, y_prev_ is only kept for check iterations
   std::vector<BlockVector> y_prev_;
   BlockMatrix AT_;
 
+  // Adaptive interval between residual checks, based on the distance from
+  // the stopping criteria at the last check
+  int epoch_iterations_, check_iter_;
+  double check_gap_;
+
   friend class ProxADMMSolverTest;
 };
 
@@ -42,7 +42,8 @@ void ProxADMMTwoBlockSolver::InitConstraints() {
   }
   // Prox for I(Ax + b = 0) constraint
   constr_prox_ = CreateProxOperator(ProxFunction::ZERO, false);
-  constr_prox_->Init(ProxOperatorArg(ProxFunction(), data_map_, H, A));
+  constr_prox_->Init(ProxOperatorArg(
+      ProxFunction(), data_map_, H, A, params_));
   VLOG(1) << "constr prox init done";
 
   m_ = H.A.m();
@@ -79,7 +80,8 @@ void ProxADMMTwoBlockSolver::InitProxOperators() {
     VLOG(1) << "prox " << i << ", initializing "
             << ProxFunction::Type_Name(type);
     prox_.emplace_back(CreateProxOperator(type, epigraph));
-    prox_.back()->Init(ProxOperatorArg(f_expr.prox_function(), data_map_, H, A));
+    prox_.back()->Init(ProxOperatorArg(
+        f_expr.prox_function(), data_map_, H, A, params_));
     VLOG(1) << "prox " << i << " init done";
   }
 }
@@ -94,7 +96,9 @@ void ProxADMMTwoBlockSolver::Init() {
 }
 
 BlockVector ProxADMMTwoBlockSolver::Solve() {
+  Timer timer;
   Init();
+  status_.mutable_timing()->set_init_time(timer.GetTimeUsec()*1e-6);
 
   for (iter_ = 0; iter_ < params_.max_iterations(); iter_++) {
     z_prev_ = z_;
@@ -127,6 +131,7 @@ BlockVector ProxADMMTwoBlockSolver::Solve() {
     status_.set_state(SolverStatus::MAX_ITERATIONS_REACHED);
   }
 
+  status_.mutable_timing()->set_total_time(timer.GetTimeUsec()*1e-6);
   LogStatus();
   UpdateStatus(status_);
   return x_;
@@ -1,10 +1,131 @@
-
 #include <glog/logging.h>
 #include <benchmark/benchmark.h>
 
 #include <Eigen/SparseCholesky>
 #include <Eigen/Cholesky>
 
+#include "epsilon/linear/dense_matrix_impl.h"
+#include "epsilon/linear/kronecker_product_impl.h"
+#include "epsilon/linear/linear_map.h"
+#include "epsilon/linear/selection_matrix_impl.h"
+#include "epsilon/linear/sparse_matrix_impl.h"
+#include "epsilon/util/benchmark_util.h"
+#include "epsilon/util/string.h"
+#include "epsilon/vector/vector_util.h"
+
+namespace linear_map {
+
+// Number of diagonal blocks in the Kronecker product I_k x B
+const int kKroneckerBlocks = 10;
+
+// Nonzeros per column for sparse matrices
+const int kSparseNonzeros = 10;
+
+const char* kImplTypeNames[] = {
+  "Dense",
+  "Sparse",
+  "Diagonal",
+  "Scalar",
+  "Kronecker",
+  "DenseCholesky",
+  "Selection",
+  "Basic",
+};
+
+// Creates a random n x n linear map of the given type, setting bytes to the
+// size of its representation.
+LinearMap CreateLinearMap(ImplType type, int n, int64_t* bytes) {
+  const int k = kKroneckerBlocks;
+  switch (type) {
+    case DENSE_MATRIX:
+      *bytes = 8*n*n;
+      return LinearMap(new DenseMatrixImpl(Eigen::MatrixXd::Random(n, n)));
+    case SPARSE_MATRIX:
+      *bytes = 12*n*kSparseNonzeros;
+      return LinearMap(new SparseMatrixImpl(
+          RandomSparse(n, n, static_cast<double>(kSparseNonzeros)/n)));
+    case DIAGONAL_MATRIX:
+      *bytes = 8*n;
+      return Diagonal(Eigen::VectorXd::Random(n));
+    case SCALAR_MATRIX:
+      *bytes = 8;
+      return Scalar(2, n);
+    case KRONECKER_PRODUCT:
+      *bytes = 8*(n/k)*(n/k);
+      return LinearMap(new KroneckerProductImpl(
+          Identity(k),
+          LinearMap(new DenseMatrixImpl(Eigen::MatrixXd::Random(n/k, n/k)))));
+    case DENSE_CHOLESKY: {
+      *bytes = 8*n*n;
+      Eigen::MatrixXd A = Eigen::MatrixXd::Random(n, n);
+      return LinearMap(new DenseMatrixImpl(
+          A.transpose()*A + Eigen::MatrixXd::Identity(n, n))).Inverse();
+    }
+    case SELECTION_MATRIX:
+      // Transpose of a k x n/k matrix
+      *bytes = 0;
+      return LinearMap(new SelectionMatrixImpl(n, 0, k, 1, n/k, k, false, 1));
+    case BASIC:
+      *bytes = 4*n*n;
+      return SinglePrecision(
+          LinearMap(new DenseMatrixImpl(Eigen::MatrixXd::Random(n, n))));
+    default:
+      LOG(FATAL) << "Unknown type: " << type;
+  }
+}
+
+void BM_Apply(benchmark::State& state, ImplType type) {
+  srand(0);
+  const int n = state.range(0);
+  int64_t bytes;
+  LinearMap A = CreateLinearMap(type, n, &bytes);
+  Eigen::VectorXd x = Eigen::VectorXd::Random(n);
+  {
+    AllocationCounter counter(&state);
+    while (state.KeepRunning()) {
+      benchmark::DoNotOptimize(A*x);
+    }
+  }
+  state.SetBytesProcessed(state.iterations()*(bytes + 16*n));
+}
+
+void BM_Multiply(benchmark::State& state, ImplType lhs, ImplType rhs) {
+  srand(0);
+  const int n = state.range(0);
+  int64_t lhs_bytes, rhs_bytes;
+  LinearMap A = CreateLinearMap(lhs, n, &lhs_bytes);
+  LinearMap B = CreateLinearMap(rhs, n, &rhs_bytes);
+  {
+    AllocationCounter counter(&state);
+    while (state.KeepRunning()) {
+      benchmark::DoNotOptimize(A*B);
+    }
+  }
+  state.SetBytesProcessed(state.iterations()*(lhs_bytes + rhs_bytes));
+}
+
+void RegisterBenchmarks() {
+  for (int i = 0; i < NUM_IMPL_TYPES; i++) {
+    const ImplType type = static_cast<ImplType>(i);
+    benchmark::RegisterBenchmark(
+        StringPrintf("BM_Apply/%s", kImplTypeNames[i]).c_str(),
+        BM_Apply, type)->Arg(100)->Arg(1000);
+  }
+
+  // BASIC only supports Apply()
+  for (int i = 0; i < BASIC; i++) {
+    for (int j = 0; j < BASIC; j++) {
+      benchmark::RegisterBenchmark(
+          StringPrintf("BM_Multiply/%s/%s",
+                       kImplTypeNames[i], kImplTypeNames[j]).c_str(),
+          BM_Multiply, static_cast<ImplType>(i), static_cast<ImplType>(j))
+          ->Arg(100)->Arg(500);
+    }
+  }
+}
+
+}  // namespace linear_map
+
 // void BM_Sparse_LDLT_Identity(benchmark::State& state) {
 //   const int n = state.range_x();
 //   Eigen::SparseMatrix<double> I(n, n);
@@ -38,4 +159,8 @@ void BM_DenseCholesky(benchmark::State& state) {
 }
 BENCHMARK(BM_DenseCholesky);
 
-BENCHMARK_MAIN();
+int main(int argc, char** argv) {
+  linear_map::RegisterBenchmarks();
+  benchmark::Initialize(&argc, argv);
+  benchmark::RunSpecifiedBenchmarks();
+}
@@ -0,0 +1,75 @@
+
+#include "epsilon/linear/dense_cholesky_impl.h"
+
+#include "epsilon/linear/dense_matrix_impl.h"
+#include "epsilon/util/string.h"
+#include "epsilon/vector/vector_util.h"
+
+namespace linear_map {
+
+DenseCholeskyImpl::DenseCholeskyImpl(const DenseMatrix& A)
+    : LinearMapImpl(DENSE_CHOLESKY),
+      alpha_(1) {
+  // NOTE(mwytock): This assumes matrix is symmetric, do we need non-symmetric?
+  CHECK_EQ(A.rows(), A.cols());
+  VLOG(1) << "Factoring " << A.rows() << " x " << A.cols();
+
+  std::shared_ptr<Factorization> factor_ptr(new Factorization);
+  factor_ptr->llt.compute(A);
+  factor_ptr->use_llt = factor_ptr->llt.info() == Eigen::Success;
+  if (!factor_ptr->use_llt) {
+    VLOG(1) << "LLT failed, falling back to LDLT";
+    factor_ptr->llt = Eigen::LLT<DenseMatrix>();
+    factor_ptr->ldlt.compute(A);
+    CHECK_EQ(factor_ptr->ldlt.info(), Eigen::Success)
+        << MatrixDebugString(A);
+  }
+  factor_ptr_ = factor_ptr;
+}
+
+LinearMapImpl::DenseMatrix DenseCholeskyImpl::Solve(
+    const DenseMatrix& B) const {
+  CHECK_EQ(n(), B.rows());
+  if (factor_ptr_->use_llt) {
+    return alpha_*factor_ptr_->llt.solve(B);
+  } else {
+    return alpha_*factor_ptr_->ldlt.solve(B);
+  }
+}
+
+LinearMapImpl::DenseVector DenseCholeskyImpl::Apply(
+    const DenseVector& x) const {
+  if (factor_ptr_->use_llt) {
+    return alpha_*factor_ptr_->llt.solve(x);
+  } else {
+    return alpha_*factor_ptr_->ldlt.solve(x);
+  }
+}
+
+LinearMapImpl* DenseCholeskyImpl::Inverse() const {
+  if (factor_ptr_->use_llt) {
+    return new DenseMatrixImpl(
+        (1/alpha_)*factor_ptr_->llt.reconstructedMatrix());
+  } else {
+    return new DenseMatrixImpl(
+        (1/alpha_)*factor_ptr_->ldlt.reconstructedMatrix());
+  }
+}
+
+std::string DenseCholeskyImpl::DebugString() const {
+  return StringPrintf(
+      "dense cholesky %d x %d, alpha=%3.4f (%s)",
+      m(), n(), alpha_, factor_ptr_->use_llt ? "LLT" : "LDLT");
+}
+
+bool DenseCholeskyImpl::operator==(const LinearMapImpl& other) const {
+  if (other.type() != DENSE_CHOLESKY ||
+      other.m() != m() ||
+      other.n() != n())
+    return false;
+
+  auto const& C = static_cast<const DenseCholeskyImpl&>(other);
+  return C.factor_ptr_.get() == factor_ptr_.get() && C.alpha_ == alpha_;
+}
+
+}  // namespace linear_map
@@ -0,0 +1,73 @@
+#ifndef EPSILON_LINEAR_DENSE_CHOLESKY_IMPL_H
+#define EPSILON_LINEAR_DENSE_CHOLESKY_IMPL_H
+
+#include <memory>
+
+#include <Eigen/Cholesky>
+
+#include "epsilon/linear/linear_map.h"
+
+namespace linear_map {
+
+// Represents alpha*A^{-1} for a symmetric matrix A through its Cholesky
+// factorization, Apply() is implemented with triangular solves so the inverse
+// is never formed explicitly.
+class DenseCholeskyImpl final : public LinearMapImpl {
+ public:
+  struct Factorization {
+    // LLT is used when A is positive definite, otherwise falls back to LDLT
+    bool use_llt;
+    Eigen::LLT<DenseMatrix> llt;
+    Eigen::LDLT<DenseMatrix> ldlt;
+  };
+
+  // Factors A
+  DenseCholeskyImpl(const DenseMatrix& A);
+
+  // Shares a pointer to the factorization
+  DenseCholeskyImpl(
+      std::shared_ptr<const Factorization> factor_ptr, double alpha) :
+      LinearMapImpl(DENSE_CHOLESKY),
+      factor_ptr_(factor_ptr),
+      alpha_(alpha) {}
+
+  int m() const override { return n_factor(); }
+  int n() const override { return n_factor(); }
+  std::string DebugString() const override;
+  DenseMatrix AsDense() const override {
+    return Solve(DenseMatrix::Identity(n(), n()));
+  }
+  DenseVector Apply(const DenseVector& x) const override;
+
+  // Inverse is symmetric
+  LinearMapImpl* Transpose() const override {
+    return new DenseCholeskyImpl(factor_ptr_, alpha_);
+  }
+
+  LinearMapImpl* Inverse() const override;
+
+  bool operator==(const LinearMapImpl& other) const override;
+
+  // Dense Cholesky API
+
+  // Computes alpha*A^{-1}*B
+  DenseMatrix Solve(const DenseMatrix& B) const;
+  double alpha() const { return alpha_; }
+  std::shared_ptr<const Factorization> factor_ptr() const {
+    return factor_ptr_;
+  }
+
+ private:
+  int n_factor() const {
+    return factor_ptr_->use_llt ?
+        factor_ptr_->llt.matrixLLT().rows() :
+        factor_ptr_->ldlt.matrixLDLT().rows();
+  }
+
+  std::shared_ptr<const Factorization> factor_ptr_;
+  double alpha_;
+};
+
+}  // namespace linear_map
+
+#endif  // EPSILON_LINEAR_DENSE_CHOLESKY_IMPL_H
@@ -0,0 +1,68 @@
+
+#include <gtest/gtest.h>
+
+#include "epsilon/linear/dense_cholesky_impl.h"
+#include "epsilon/linear/dense_matrix_impl.h"
+#include "epsilon/linear/scalar_matrix_impl.h"
+#include "epsilon/linear/sparse_matrix_impl.h"
+#include "epsilon/vector/vector_testutil.h"
+
+namespace linear_map {
+
+class DenseCholeskyImplTest : public testing::Test {
+ protected:
+  DenseCholeskyImplTest() {
+    srand(0);
+    Eigen::MatrixXd M = Eigen::MatrixXd::Random(4,4);
+    A0 = M*M.transpose() + Eigen::MatrixXd::Identity(4,4);
+    A0_inv = A0.inverse();
+    A_inv = LinearMap(new DenseMatrixImpl(A0)).Inverse();
+    B0 = Eigen::MatrixXd::Random(4,3);
+    B = LinearMap(new DenseMatrixImpl(B0));
+    x = Eigen::VectorXd::Random(4);
+  }
+
+  Eigen::MatrixXd A0, A0_inv, B0;
+  LinearMap A_inv, B;
+  Eigen::VectorXd x;
+};
+
+TEST_F(DenseCholeskyImplTest, Apply) {
+  EXPECT_EQ(DENSE_CHOLESKY, A_inv.impl().type());
+  EXPECT_TRUE(VectorEquals(A0_inv*x, A_inv.impl().Apply(x), 1e-8));
+  EXPECT_TRUE(VectorEquals(A0_inv*x, A_inv.Transpose().impl().Apply(x), 1e-8));
+  EXPECT_TRUE(MatrixEquals(A0, A_inv.Inverse().impl().AsDense(), 1e-8));
+}
+
+TEST_F(DenseCholeskyImplTest, Multiply) {
+  EXPECT_TRUE(MatrixEquals(A0_inv*B0, (A_inv*B).impl().AsDense(), 1e-8));
+  EXPECT_TRUE(MatrixEquals(
+      B0.transpose()*A0_inv, (B.Transpose()*A_inv).impl().AsDense(), 1e-8));
+
+  LinearMap C = 2*A_inv;
+  EXPECT_EQ(DENSE_CHOLESKY, C.impl().type());
+  EXPECT_TRUE(VectorEquals(2*A0_inv*x, C.impl().Apply(x), 1e-8));
+}
+
+TEST_F(DenseCholeskyImplTest, Add) {
+  LinearMap I(new ScalarMatrixImpl(4, 1));
+  EXPECT_TRUE(MatrixEquals(
+      A0_inv + Eigen::MatrixXd::Identity(4,4), (A_inv + I).impl().AsDense(),
+      1e-8));
+  EXPECT_TRUE(MatrixEquals(2*A0_inv, (A_inv + A_inv).impl().AsDense(), 1e-8));
+}
+
+TEST_F(DenseCholeskyImplTest, Indefinite) {
+  Eigen::MatrixXd D0 = A0;
+  D0(0,0) = -D0(0,0);
+  LinearMap D_inv = LinearMap(new DenseMatrixImpl(D0)).Inverse();
+  EXPECT_TRUE(VectorEquals(D0.inverse()*x, D_inv.impl().Apply(x), 1e-8));
+}
+
+TEST_F(DenseCholeskyImplTest, SparseInverse) {
+  LinearMap S_inv = LinearMap(
+      new SparseMatrixImpl(A0.sparseView())).Inverse();
+  EXPECT_TRUE(VectorEquals(A0_inv*x, S_inv.impl().Apply(x), 1e-8));
+}
+
+}  // namespace linear_map
@@ -2,6 +2,7 @@
 
 #include "epsilon/linear/dense_matrix_impl.h"
 
+#include "epsilon/linear/dense_cholesky_impl.h"
 #include "epsilon/linear/lapack.h"
 #include "epsilon/util/string.h"
 #include "epsilon/vector/vector_util.h"
@@ -19,14 +20,7 @@ DenseMatrixImpl::DenseMatrixImpl(const DenseMatrix& A)
 }
 
 LinearMapImpl* DenseMatrixImpl::Inverse() const {
-  VLOG(1) << "Factoring " << m() << " x " << n();
-
-  // NOTE(mwytock): This assumes matrix is symmetric, do we need non-symmetric?
-  CHECK_EQ(m(), n());
-  Eigen::LDLT<DenseMatrix> ldlt;
-  ldlt.compute(AsDense());
-  CHECK_EQ(ldlt.info(), Eigen::Success) << DebugString();
-  return new DenseMatrixImpl(ldlt.solve(DenseMatrix::Identity(n(), n())));
+  return new DenseCholeskyImpl(AsDense());
 }
 
 std::string DenseMatrixImpl::DebugString() const {
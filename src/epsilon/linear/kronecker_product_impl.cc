@@ -1,4 +1,9 @@
 #include "epsilon/linear/kronecker_product_impl.h"
+#include "epsilon/linear/dense_cholesky_impl.h"
+#include "epsilon/linear/diagonal_matrix_impl.h"
+#include "epsilon/linear/lapack.h"
+#include "epsilon/linear/scalar_matrix_impl.h"
+#include "epsilon/linear/sparse_matrix_impl.h"
 #include "epsilon/vector/vector_util.h"
 #include "epsilon/util/time.h"
 
@@ -42,19 +47,70 @@ LinearMap::SparseMatrix KroneckerProductImpl::AsSparse() const {
   return C;
 }
 
+namespace {
+
+// Applies A to each column of X, as a single matrix-matrix product or solve
+// where the type of A allows this.
+LinearMapImpl::DenseMatrix ApplyColumns(
+    const LinearMapImpl& A,
+    const LinearMapImpl::DenseMatrix& X) {
+  typedef LinearMapImpl::DenseMatrix DenseMatrix;
+  switch (A.type()) {
+    case DENSE_MATRIX: {
+      auto const& D = static_cast<const DenseMatrixImpl&>(A);
+      int m = D.m();
+      int k = D.n();
+      int n = X.cols();
+      int lda = *D.trans() == 'N' ? m : k;
+      char trans_x = 'N';
+      double alpha = 1;
+      double beta = 0;
+      DenseMatrix Y(m, n);
+      dgemm_(D.trans(), &trans_x,
+             &m, &n, &k, &alpha,
+             D.data(), &lda,
+             const_cast<double*>(X.data()), &k,
+             &beta,
+             Y.data(), &m);
+      return Y;
+    }
+    case SPARSE_MATRIX:
+      return static_cast<const SparseMatrixImpl&>(A).sparse()*X;
+    case DIAGONAL_MATRIX:
+      return static_cast<const DiagonalMatrixImpl&>(A).diagonal()*X;
+    case SCALAR_MATRIX:
+      return static_cast<const ScalarMatrixImpl&>(A).alpha()*X;
+    case DENSE_CHOLESKY:
+      return static_cast<const DenseCholeskyImpl&>(A).Solve(X);
+    default:
+      break;
+  }
+
+  DenseMatrix Y(A.m(), X.cols());
+  for (int j = 0; j < X.cols(); j++)
+    Y.col(j) = A.Apply(X.col(j));
+  return Y;
+}
+
+}  // namespace
+
+// Computes vec(B*X*A') with X = mat(x), when either factor is a multiple of
+// the identity this is a single product with the other factor.
 LinearMapImpl::DenseVector KroneckerProductImpl::Apply(
     const LinearMapImpl::DenseVector& x) const {
   const int m = B_.impl().n();
   const int n = A_.impl().n();
+  CHECK_EQ(m*n, x.rows());
+  Eigen::Map<const DenseMatrix> X(x.data(), m, n);
 
-  // Have to make copy to get DenseMatrixImpl
-  // TODO(mwytock): fix this
-  std::shared_ptr<DenseMatrixImpl::Data> data_ptr(new DenseMatrixImpl::Data);
-  data_ptr->data.reset(new double[m*n]);
-  memcpy(data_ptr->data.get(), x.data(), m*n*sizeof(double));
-  LinearMap X(new DenseMatrixImpl(m, n, data_ptr, 'N'));
+  if (A_.impl().type() == SCALAR_MATRIX) {
+    const double alpha = static_cast<const ScalarMatrixImpl&>(
+        A_.impl()).alpha();
+    return ToVector(alpha*ApplyColumns(B_.impl(), X));
+  }
 
-  return ToVector((A_*(B_*X).Transpose()).Transpose().impl().AsDense());
+  DenseMatrix BX = ApplyColumns(B_.impl(), X);
+  return ToVector(ApplyColumns(A_.impl(), BX.transpose()).transpose());
 }
 
 bool KroneckerProductImpl::operator==(const LinearMapImpl& other) const {
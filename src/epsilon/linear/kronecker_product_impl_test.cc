@@ -3,6 +3,7 @@
 
 #include "epsilon/vector/vector_testutil.h"
 #include "epsilon/linear/kronecker_product_impl.h"
+#include "epsilon/linear/scalar_matrix_impl.h"
 
 namespace linear_map {
 
@@ -19,4 +20,41 @@ TEST(KroneckerProductImplTest, Apply) {
       ToVector(B*X*A.transpose()), C.impl().Apply(ToVector(X)), 1e-8));
 }
 
+TEST(KroneckerProductImplTest, ApplyIdentity) {
+  srand(0);
+  Eigen::MatrixXd A = Eigen::MatrixXd::Random(4,5);
+  LinearMap I(new ScalarMatrixImpl(3, 2));
+  LinearMap K(new KroneckerProductImpl(I, LinearMap(new DenseMatrixImpl(A))));
+  LinearMap L(new KroneckerProductImpl(LinearMap(new DenseMatrixImpl(A)), I));
+
+  Eigen::MatrixXd X = Eigen::MatrixXd::Random(5,3);
+  Eigen::MatrixXd Y = Eigen::MatrixXd::Random(3,5);
+  EXPECT_TRUE(VectorEquals(
+      ToVector(2*A*X), K.impl().Apply(ToVector(X)), 1e-8));
+  EXPECT_TRUE(VectorEquals(
+      ToVector(2*Y*A.transpose()), L.impl().Apply(ToVector(Y)), 1e-8));
+  EXPECT_TRUE(VectorEquals(
+      ToVector(2*A.transpose()*ToMatrix(ToVector(2*A*X), 4, 3)),
+      K.Transpose().impl().Apply(K.impl().Apply(ToVector(X))), 1e-8));
+}
+
+TEST(KroneckerProductImplTest, InverseIdentity) {
+  srand(0);
+  Eigen::MatrixXd A = Eigen::MatrixXd::Random(4,3);
+  LinearMap I(new ScalarMatrixImpl(5, 1));
+  LinearMap K(new KroneckerProductImpl(I, LinearMap(new DenseMatrixImpl(A))));
+
+  // Factors only the small A'A + I, applied to all columns together
+  LinearMap M = (K.Transpose()*K + LinearMap(new ScalarMatrixImpl(15, 1)));
+  ASSERT_EQ(KRONECKER_PRODUCT, M.impl().type());
+  LinearMap M_inv = M.Inverse();
+  auto const& K_inv = static_cast<const KroneckerProductImpl&>(M_inv.impl());
+  EXPECT_EQ(3, K_inv.B().impl().m());
+
+  Eigen::MatrixXd X = Eigen::MatrixXd::Random(3,5);
+  Eigen::MatrixXd ATA = A.transpose()*A + Eigen::MatrixXd::Identity(3,3);
+  EXPECT_TRUE(VectorEquals(
+      ToVector(ATA.inverse()*X), M_inv.impl().Apply(ToVector(X)), 1e-8));
+}
+
 }  // namespace linear_map
@@ -6,6 +6,10 @@ void dgemv_(
     char* transa, int* m, int* n, double* alpha, double* A, int* lda, double* x,
     int* incx, double* beta, double* y, int* incy);
 
+void sgemv_(
+    char* transa, int* m, int* n, float* alpha, float* A, int* lda, float* x,
+    int* incx, float* beta, float* y, int* incy);
+
 void dgemm_(
     char *transa, char *transb, int *m, int *n, int *k,
     double *alpha, double *A, int *lda, double *B, int *ldb,
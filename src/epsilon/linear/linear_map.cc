@@ -6,6 +6,7 @@
 #include "epsilon/linear/kronecker_product_impl.h"
 #include "epsilon/linear/linear_map.h"
 #include "epsilon/linear/scalar_matrix_impl.h"
+#include "epsilon/linear/selection_matrix_impl.h"
 #include "epsilon/linear/sparse_matrix_impl.h"
 
 namespace linear_map {
@@ -77,6 +78,36 @@ LinearMapImpl* SparseMatrix(
     BuildSparseMatrix(proto.constant(), data_map));
 }
 
+// The proto describes the selection, scatter is its transpose
+LinearMapImpl* SelectionMatrix(const ::LinearMap& proto, bool scatter) {
+  const Size& shape = proto.shape();
+  CHECK(shape.dim_size() == 1 || shape.dim_size() == 2);
+  CHECK_EQ(shape.dim_size(), proto.stride_size());
+  const int rows = shape.dim(0);
+  const int cols = shape.dim_size() == 2 ? shape.dim(1) : 1;
+  const int stride1 = shape.dim_size() == 2 ? proto.stride(1) : 0;
+  CHECK_EQ(rows*cols, scatter ? proto.n() : proto.m());
+  return new SelectionMatrixImpl(
+      scatter ? proto.m() : proto.n(),
+      proto.offset(), proto.stride(0), stride1, rows, cols, scatter, 1);
+}
+
+LinearMapImpl* Select(
+    const ::LinearMap& proto, const DataMap& data_map) {
+  return SelectionMatrix(proto, false);
+}
+
+LinearMapImpl* Permute(
+    const ::LinearMap& proto, const DataMap& data_map) {
+  CHECK_EQ(proto.m(), proto.n());
+  return SelectionMatrix(proto, false);
+}
+
+LinearMapImpl* Scatter(
+    const ::LinearMap& proto, const DataMap& data_map) {
+  return SelectionMatrix(proto, true);
+}
+
 typedef LinearMapImpl*(*LinearMapFunction)(
     const ::LinearMap& linear_map, const DataMap& data_map);
 
@@ -84,7 +115,10 @@ std::unordered_map<int, LinearMapFunction> kLinearMapFunctions = {
   {::LinearMap::DENSE_MATRIX, &DenseMatrix},
   {::LinearMap::DIAGONAL_MATRIX, &DiagonalMatrix},
   {::LinearMap::KRONECKER_PRODUCT, &KroneckerProduct},
+  {::LinearMap::PERMUTE, &Permute},
   {::LinearMap::SCALAR, &Scalar},
+  {::LinearMap::SCATTER, &Scatter},
+  {::LinearMap::SELECT, &Select},
   {::LinearMap::SPARSE_MATRIX, &SparseMatrix},
   {::LinearMap::TRANSPOSE, &Transpose},
 };
@@ -152,12 +186,15 @@ uint64_t Nonzeros(ImplType type, uint64_t m, uint64_t n) {
   switch (type) {
     case DENSE_MATRIX:
     case SPARSE_MATRIX:
+    case DENSE_CHOLESKY:
       return m*n;
     case DIAGONAL_MATRIX:
       CHECK_EQ(m, n);
       return n;
     case SCALAR_MATRIX:
       return 1;
+    case SELECTION_MATRIX:
+      return std::min(m, n);
     default:
       LOG(FATAL) << "Not implemented";
   }
@@ -19,6 +19,8 @@ enum ImplType {
   DIAGONAL_MATRIX,
   SCALAR_MATRIX,
   KRONECKER_PRODUCT,
+  DENSE_CHOLESKY,
+  SELECTION_MATRIX,
   // only supports Apply()
   BASIC,
   NUM_IMPL_TYPES,
@@ -111,6 +113,11 @@ LinearMap Scalar(double alpha, int n);
 LinearMap BuildLinearMap(
     const ::LinearMap& linear_map, const DataMap& data_map);
 
+// Converts dense and sparse matrices to single precision storage, the
+// resulting linear maps only support Apply() and Transpose(). Other types are
+// returned unchanged.
+LinearMap SinglePrecision(const LinearMap& linear_map);
+
 Eigen::VectorXd GetDiagonal(const LinearMap& linear_map);
 double GetScalar(const LinearMap& linear_map);
 
@@ -1,9 +1,11 @@
 
+#include "epsilon/linear/dense_cholesky_impl.h"
 #include "epsilon/linear/dense_matrix_impl.h"
 #include "epsilon/linear/diagonal_matrix_impl.h"
 #include "epsilon/linear/kronecker_product_impl.h"
 #include "epsilon/linear/linear_map.h"
 #include "epsilon/linear/scalar_matrix_impl.h"
+#include "epsilon/linear/selection_matrix_impl.h"
 #include "epsilon/linear/sparse_matrix_impl.h"
 
 namespace linear_map {
@@ -222,6 +224,58 @@ LinearMapImpl* Add_KroneckerProduct_KroneckerProduct(
   }
 }
 
+// Sums involving an implicit inverse require forming it explicitly
+LinearMapImpl* Add_LinearMap_DenseCholesky(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  return new DenseMatrixImpl(lhs.AsDense() + rhs.AsDense());
+}
+
+LinearMapImpl* Add_DenseCholesky_LinearMap(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  return Add_LinearMap_DenseCholesky(rhs, lhs);
+}
+
+LinearMapImpl* Add_DenseCholesky_DenseCholesky(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  auto const& C1 = static_cast<const DenseCholeskyImpl&>(lhs);
+  auto const& C2 = static_cast<const DenseCholeskyImpl&>(rhs);
+
+  // alpha*A^{-1} + beta*A^{-1} = (alpha + beta)*A^{-1}
+  if (C1.factor_ptr().get() == C2.factor_ptr().get())
+    return new DenseCholeskyImpl(C1.factor_ptr(), C1.alpha() + C2.alpha());
+  return Add_LinearMap_DenseCholesky(lhs, rhs);
+}
+
+LinearMapImpl* Add_SelectionMatrix_LinearMap(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  if (rhs.type() == DENSE_MATRIX)
+    return new DenseMatrixImpl(lhs.AsDense() + rhs.AsDense());
+  return new SparseMatrixImpl(AsSparseMatrix(lhs) + AsSparseMatrix(rhs));
+}
+
+LinearMapImpl* Add_LinearMap_SelectionMatrix(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  return Add_SelectionMatrix_LinearMap(rhs, lhs);
+}
+
+LinearMapImpl* Add_SelectionMatrix_SelectionMatrix(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  auto const& S1 = static_cast<const SelectionMatrixImpl&>(lhs);
+  auto const& S2 = static_cast<const SelectionMatrixImpl&>(rhs);
+  if (S1.SameSelection(S2)) {
+    return new SelectionMatrixImpl(
+        S1.source_size(), S1.offset(), S1.stride0(), S1.stride1(),
+        S1.rows(), S1.cols(), S1.scatter(), S1.alpha() + S2.alpha());
+  }
+  return new SparseMatrixImpl(S1.AsSparse() + S2.AsSparse());
+}
+
 LinearMapImpl* Add_NotImplemented(
     const LinearMapImpl& lhs,
     const LinearMapImpl& rhs) {
@@ -236,6 +290,8 @@ LinearMapBinaryOp kAddTable
     &Add_DenseMatrix_DiagonalMatrix,
     &Add_DenseMatrix_ScalarMatrix,
     &Add_DenseMatrix_KroneckerProduct,
+    &Add_LinearMap_DenseCholesky,
+    &Add_LinearMap_SelectionMatrix,
     &Add_NotImplemented,
   },
   {
@@ -244,6 +300,8 @@ LinearMapBinaryOp kAddTable
     &Add_SparseMatrix_DiagonalMatrix,
     &Add_SparseMatrix_ScalarMatrix,
     &Add_SparseMatrix_KroneckerProduct,
+    &Add_LinearMap_DenseCholesky,
+    &Add_LinearMap_SelectionMatrix,
     &Add_NotImplemented,
   },
   {
@@ -252,6 +310,8 @@ LinearMapBinaryOp kAddTable
     &Add_DiagonalMatrix_DiagonalMatrix,
     &Add_DiagonalMatrix_ScalarMatrix,
     &Add_DiagonalMatrix_KroneckerProduct,
+    &Add_LinearMap_DenseCholesky,
+    &Add_LinearMap_SelectionMatrix,
     &Add_NotImplemented,
   },
   {
@@ -260,6 +320,8 @@ LinearMapBinaryOp kAddTable
     &Add_ScalarMatrix_DiagonalMatrix,
     &Add_ScalarMatrix_ScalarMatrix,
     &Add_ScalarMatrix_KroneckerProduct,
+    &Add_LinearMap_DenseCholesky,
+    &Add_LinearMap_SelectionMatrix,
     &Add_NotImplemented,
   },
   {
@@ -268,9 +330,33 @@ LinearMapBinaryOp kAddTable
     &Add_KroneckerProduct_DiagonalMatrix,
     &Add_KroneckerProduct_ScalarMatrix,
     &Add_KroneckerProduct_KroneckerProduct,
+    &Add_LinearMap_DenseCholesky,
+    &Add_LinearMap_SelectionMatrix,
     &Add_NotImplemented,
   },
   {
+    &Add_DenseCholesky_LinearMap,
+    &Add_DenseCholesky_LinearMap,
+    &Add_DenseCholesky_LinearMap,
+    &Add_DenseCholesky_LinearMap,
+    &Add_DenseCholesky_LinearMap,
+    &Add_DenseCholesky_DenseCholesky,
+    &Add_DenseCholesky_LinearMap,
+    &Add_NotImplemented,
+  },
+  {
+    &Add_SelectionMatrix_LinearMap,
+    &Add_SelectionMatrix_LinearMap,
+    &Add_SelectionMatrix_LinearMap,
+    &Add_SelectionMatrix_LinearMap,
+    &Add_SelectionMatrix_LinearMap,
+    &Add_LinearMap_DenseCholesky,
+    &Add_SelectionMatrix_SelectionMatrix,
+    &Add_NotImplemented,
+  },
+  {
+    &Add_NotImplemented,
+    &Add_NotImplemented,
     &Add_NotImplemented,
     &Add_NotImplemented,
     &Add_NotImplemented,
@@ -1,9 +1,11 @@
 
+#include "epsilon/linear/dense_cholesky_impl.h"
 #include "epsilon/linear/dense_matrix_impl.h"
 #include "epsilon/linear/diagonal_matrix_impl.h"
 #include "epsilon/linear/kronecker_product_impl.h"
 #include "epsilon/linear/linear_map.h"
 #include "epsilon/linear/scalar_matrix_impl.h"
+#include "epsilon/linear/selection_matrix_impl.h"
 #include "epsilon/linear/sparse_matrix_impl.h"
 #include "epsilon/linear/lapack.h"
 
@@ -240,6 +242,165 @@ LinearMapImpl* Multiply_KroneckerProduct_KroneckerProduct(
   return new SparseMatrixImpl(C.AsSparse()*D.AsSparse());
 }
 
+// Since the Cholesky maps are symmetric, A*C = (C*A')' and thus both products
+// are computed with triangular solves against the other operand.
+LinearMapImpl* Multiply_LinearMap_DenseCholesky(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  return new DenseMatrixImpl(
+      static_cast<const DenseCholeskyImpl&>(rhs).Solve(
+          lhs.AsDense().transpose()).transpose());
+}
+
+LinearMapImpl* Multiply_DenseCholesky_LinearMap(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  return new DenseMatrixImpl(
+      static_cast<const DenseCholeskyImpl&>(lhs).Solve(rhs.AsDense()));
+}
+
+LinearMapImpl* Multiply_ScalarMatrix_DenseCholesky(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  auto const& S = static_cast<const ScalarMatrixImpl&>(lhs);
+  auto const& C = static_cast<const DenseCholeskyImpl&>(rhs);
+  return new DenseCholeskyImpl(C.factor_ptr(), S.alpha()*C.alpha());
+}
+
+LinearMapImpl* Multiply_DenseCholesky_ScalarMatrix(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  return Multiply_ScalarMatrix_DenseCholesky(rhs, lhs);
+}
+
+LinearMapImpl* Multiply_SelectionMatrix_LinearMap(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  auto const& S = static_cast<const SelectionMatrixImpl&>(lhs);
+  if (rhs.type() == DENSE_MATRIX)
+    return new DenseMatrixImpl(S.AsSparse()*rhs.AsDense());
+  return new SparseMatrixImpl(S.AsSparse()*AsSparseMatrix(rhs));
+}
+
+LinearMapImpl* Multiply_LinearMap_SelectionMatrix(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  auto const& S = static_cast<const SelectionMatrixImpl&>(rhs);
+  if (lhs.type() == DENSE_MATRIX)
+    return new DenseMatrixImpl(lhs.AsDense()*S.AsSparse());
+  return new SparseMatrixImpl(AsSparseMatrix(lhs)*S.AsSparse());
+}
+
+LinearMapImpl* Multiply_ScalarMatrix_SelectionMatrix(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  auto const& A = static_cast<const ScalarMatrixImpl&>(lhs);
+  auto const& S = static_cast<const SelectionMatrixImpl&>(rhs);
+  return new SelectionMatrixImpl(
+      S.source_size(), S.offset(), S.stride0(), S.stride1(),
+      S.rows(), S.cols(), S.scatter(), A.alpha()*S.alpha());
+}
+
+LinearMapImpl* Multiply_SelectionMatrix_ScalarMatrix(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  return Multiply_ScalarMatrix_SelectionMatrix(rhs, lhs);
+}
+
+// Selecting from a one dimensional selection composes the offsets and strides,
+// returns nullptr if the selection can not be composed.
+LinearMapImpl* ComposeSelection(
+    const SelectionMatrixImpl& S2,
+    const SelectionMatrixImpl& S1) {
+  if (S1.cols() != 1)
+    return nullptr;
+  const int s = S1.stride0();
+  return new SelectionMatrixImpl(
+      S1.source_size(), S1.offset() + S2.offset()*s,
+      S2.stride0()*s, S2.stride1()*s, S2.rows(), S2.cols(), false,
+      S1.alpha()*S2.alpha());
+}
+
+LinearMapImpl* Multiply_SelectionMatrix_SelectionMatrix(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  auto const& S2 = static_cast<const SelectionMatrixImpl&>(lhs);
+  auto const& S1 = static_cast<const SelectionMatrixImpl&>(rhs);
+  std::unique_ptr<LinearMapImpl> C;
+  if (!S2.scatter() && !S1.scatter()) {
+    C.reset(ComposeSelection(S2, S1));
+  } else if (S2.scatter() && S1.scatter()) {
+    // S2*S1 = (S1'*S2')'
+    std::unique_ptr<LinearMapImpl> S1T(S1.Transpose());
+    std::unique_ptr<LinearMapImpl> S2T(S2.Transpose());
+    std::unique_ptr<LinearMapImpl> CT(ComposeSelection(
+        static_cast<const SelectionMatrixImpl&>(*S1T),
+        static_cast<const SelectionMatrixImpl&>(*S2T)));
+    if (CT)
+      C.reset(CT->Transpose());
+  } else if (!S2.scatter() && S1.scatter() && S2.Injective()) {
+    // Selecting elements which were just scattered gives the identity
+    std::unique_ptr<LinearMapImpl> S1T(S1.Transpose());
+    if (S2.SameSelection(static_cast<const SelectionMatrixImpl&>(*S1T)))
+      C.reset(new ScalarMatrixImpl(S2.m(), S1.alpha()*S2.alpha()));
+  }
+  if (C)
+    return C.release();
+  return new SparseMatrixImpl(S2.AsSparse()*S1.AsSparse());
+}
+
+// A selection of whole columns from a p x q matrix (in column-major order) is
+// kron(C, I_p) where C selects the columns, returns C or nullptr if S is not of
+// this form.
+LinearMapImpl* ColumnSelection(const SelectionMatrixImpl& S, int p) {
+  if (S.scatter()) {
+    std::unique_ptr<LinearMapImpl> ST(S.Transpose());
+    std::unique_ptr<LinearMapImpl> CT(ColumnSelection(
+        static_cast<const SelectionMatrixImpl&>(*ST), p));
+    return CT ? CT->Transpose() : nullptr;
+  }
+
+  const int n = S.source_size();
+  if (n % p != 0 || S.offset() % p != 0 || S.stride0() != 1)
+    return nullptr;
+
+  if (S.cols() == 1 && S.rows() % p == 0) {
+    // Contiguous columns
+    return new SelectionMatrixImpl(
+        n/p, S.offset()/p, 1, 0, S.rows()/p, 1, false, S.alpha());
+  }
+  if (S.rows() == p && S.stride1() % p == 0) {
+    return new SelectionMatrixImpl(
+        n/p, S.offset()/p, S.stride1()/p, 0, S.cols(), 1, false, S.alpha());
+  }
+  return nullptr;
+}
+
+// Selecting whole columns keeps the Kronecker structure, with
+// kron(A, B)*kron(C, I) = kron(A*C, B), so that systems involving products
+// such as kron(I, B) are factored only through the small B.
+LinearMapImpl* Multiply_KroneckerProduct_SelectionMatrix(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  auto const& K = static_cast<const KroneckerProductImpl&>(lhs);
+  auto const& S = static_cast<const SelectionMatrixImpl&>(rhs);
+  std::unique_ptr<LinearMapImpl> C(ColumnSelection(S, K.B().impl().n()));
+  if (C)
+    return new KroneckerProductImpl(K.A()*LinearMap(C.release()), K.B());
+  return Multiply_LinearMap_SelectionMatrix(lhs, rhs);
+}
+
+LinearMapImpl* Multiply_SelectionMatrix_KroneckerProduct(
+    const LinearMapImpl& lhs,
+    const LinearMapImpl& rhs) {
+  auto const& S = static_cast<const SelectionMatrixImpl&>(lhs);
+  auto const& K = static_cast<const KroneckerProductImpl&>(rhs);
+  std::unique_ptr<LinearMapImpl> C(ColumnSelection(S, K.B().impl().m()));
+  if (C)
+    return new KroneckerProductImpl(LinearMap(C.release())*K.A(), K.B());
+  return Multiply_SelectionMatrix_LinearMap(lhs, rhs);
+}
+
 LinearMapImpl* Multiply_NotImplemented(
     const LinearMapImpl& lhs,
     const LinearMapImpl& rhs) {
@@ -254,6 +415,8 @@ LinearMapBinaryOp kMultiplyTable
     &Multiply_DenseMatrix_DiagonalMatrix,
     &Multiply_DenseMatrix_ScalarMatrix,
     &Multiply_DenseMatrix_KroneckerProduct,
+    &Multiply_LinearMap_DenseCholesky,
+    &Multiply_LinearMap_SelectionMatrix,
     &Multiply_NotImplemented,
   },
   {
@@ -262,6 +425,8 @@ LinearMapBinaryOp kMultiplyTable
     &Multiply_SparseMatrix_DiagonalMatrix,
     &Multiply_SparseMatrix_ScalarMatrix,
     &Multiply_SparseMatrix_KroneckerProduct,
+    &Multiply_LinearMap_DenseCholesky,
+    &Multiply_LinearMap_SelectionMatrix,
     &Multiply_NotImplemented,
   },
   {
@@ -270,6 +435,8 @@ LinearMapBinaryOp kMultiplyTable
     &Multiply_DiagonalMatrix_DiagonalMatrix,
     &Multiply_DiagonalMatrix_ScalarMatrix,
     &Multiply_DiagonalMatrix_KroneckerProduct,
+    &Multiply_LinearMap_DenseCholesky,
+    &Multiply_LinearMap_SelectionMatrix,
     &Multiply_NotImplemented,
   },
   {
@@ -278,6 +445,8 @@ LinearMapBinaryOp kMultiplyTable
     &Multiply_ScalarMatrix_DiagonalMatrix,
     &Multiply_ScalarMatrix_ScalarMatrix,
     &Multiply_ScalarMatrix_KroneckerProduct,
+    &Multiply_ScalarMatrix_DenseCholesky,
+    &Multiply_ScalarMatrix_SelectionMatrix,
     &Multiply_NotImplemented,
   },
   {
@@ -286,9 +455,33 @@ LinearMapBinaryOp kMultiplyTable
     &Multiply_KroneckerProduct_DiagonalMatrix,
     &Multiply_KroneckerProduct_ScalarMatrix,
     &Multiply_KroneckerProduct_KroneckerProduct,
+    &Multiply_LinearMap_DenseCholesky,
+    &Multiply_KroneckerProduct_SelectionMatrix,
     &Multiply_NotImplemented,
   },
   {
+    &Multiply_DenseCholesky_LinearMap,
+    &Multiply_DenseCholesky_LinearMap,
+    &Multiply_DenseCholesky_LinearMap,
+    &Multiply_DenseCholesky_ScalarMatrix,
+    &Multiply_DenseCholesky_LinearMap,
+    &Multiply_DenseCholesky_LinearMap,
+    &Multiply_DenseCholesky_LinearMap,
+    &Multiply_NotImplemented,
+  },
+  {
+    &Multiply_SelectionMatrix_LinearMap,
+    &Multiply_SelectionMatrix_LinearMap,
+    &Multiply_SelectionMatrix_LinearMap,
+    &Multiply_SelectionMatrix_ScalarMatrix,
+    &Multiply_SelectionMatrix_KroneckerProduct,
+    &Multiply_LinearMap_DenseCholesky,
+    &Multiply_SelectionMatrix_SelectionMatrix,
+    &Multiply_NotImplemented,
+  },
+  {
+    &Multiply_NotImplemented,
+    &Multiply_NotImplemented,
     &Multiply_NotImplemented,
     &Multiply_NotImplemented,
     &Multiply_NotImplemented,
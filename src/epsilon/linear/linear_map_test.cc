@@ -6,6 +6,7 @@
 #include "epsilon/linear/kronecker_product_impl.h"
 #include "epsilon/linear/linear_map.h"
 #include "epsilon/linear/scalar_matrix_impl.h"
+#include "epsilon/linear/selection_matrix_impl.h"
 #include "epsilon/linear/sparse_matrix_impl.h"
 #include "epsilon/vector/vector_testutil.h"
 
@@ -186,4 +187,34 @@ TEST_F(LinearMapTest, Add_KroneckerScalar) {
   EXPECT_TRUE(MatrixEquals(S0+L0, (S+L).impl().AsDense(), 1e-8));
 }
 
+TEST_F(LinearMapTest, Multiply_KroneckerSelection) {
+  // kron(I_3, A) with columns 0 and 2 of its 2 x 3 argument or result, and
+  // the difference of adjacent columns of the result
+  LinearMap K(new KroneckerProductImpl(
+      LinearMap(new ScalarMatrixImpl(3, 1)), A));
+  LinearMap S(new SelectionMatrixImpl(6, 0, 1, 4, 2, 2, false, 1));
+  LinearMap T(new SelectionMatrixImpl(6, 0, 1, 0, 4, 1, false, 1));
+  LinearMap U(new SelectionMatrixImpl(6, 2, 1, 0, 4, 1, false, -1));
+  Eigen::MatrixXd K0 = K.impl().AsDense();
+  Eigen::MatrixXd S0 = S.impl().AsDense();
+  Eigen::MatrixXd T0 = T.impl().AsDense();
+  Eigen::MatrixXd U0 = U.impl().AsDense();
+
+  LinearMap KS = K*S.Transpose();
+  LinearMap SK = S*K;
+  LinearMap D = T*K + U*K;
+  EXPECT_EQ(KRONECKER_PRODUCT, KS.impl().type());
+  EXPECT_EQ(KRONECKER_PRODUCT, SK.impl().type());
+  EXPECT_EQ(KRONECKER_PRODUCT, D.impl().type());
+  EXPECT_EQ(KRONECKER_PRODUCT, (D.Transpose()*D).impl().type());
+  EXPECT_TRUE(MatrixEquals(K0*S0.transpose(), KS.impl().AsDense()));
+  EXPECT_TRUE(MatrixEquals(S0*K0, SK.impl().AsDense()));
+  EXPECT_TRUE(MatrixEquals(T0*K0 + U0*K0, D.impl().AsDense()));
+
+  // Selections which do not take whole columns
+  LinearMap R(new SelectionMatrixImpl(6, 1, 2, 0, 3, 1, false, 1));
+  EXPECT_EQ(SPARSE_MATRIX, (R*K).impl().type());
+  EXPECT_TRUE(MatrixEquals(R.impl().AsDense()*K0, (R*K).impl().AsDense()));
+}
+
 }  // namespace linear_map
@@ -0,0 +1,112 @@
+#include "epsilon/linear/selection_matrix_impl.h"
+
+#include <vector>
+
+#include "epsilon/linear/diagonal_matrix_impl.h"
+#include "epsilon/linear/kronecker_product_impl.h"
+#include "epsilon/linear/scalar_matrix_impl.h"
+#include "epsilon/linear/sparse_matrix_impl.h"
+
+namespace linear_map {
+
+LinearMapImpl::DenseVector SelectionMatrixImpl::Apply(
+    const LinearMapImpl::DenseVector& x) const {
+  CHECK_EQ(n(), x.rows());
+  const int k = rows_*cols_;
+  if (!scatter_) {
+    DenseVector y(k);
+    for (int j = 0; j < cols_; j++) {
+      const double* xj = x.data() + offset_ + j*stride1_;
+      double* yj = y.data() + j*rows_;
+      for (int i = 0; i < rows_; i++)
+        yj[i] = alpha_*xj[i*stride0_];
+    }
+    return y;
+  }
+
+  // Scatter accumulates as a selection may refer to the same element twice
+  DenseVector y = DenseVector::Zero(n_);
+  for (int j = 0; j < cols_; j++) {
+    const double* xj = x.data() + j*rows_;
+    double* yj = y.data() + offset_ + j*stride1_;
+    for (int i = 0; i < rows_; i++)
+      yj[i*stride0_] += alpha_*xj[i];
+  }
+  return y;
+}
+
+LinearMapImpl* SelectionMatrixImpl::Inverse() const {
+  // Only permutations are invertible, in which case the inverse is the
+  // transpose.
+  const int k = rows_*cols_;
+  CHECK_EQ(n_, k) << "Selection is not invertible: " << DebugString();
+  std::vector<bool> selected(n_, false);
+  for (int i = 0; i < k; i++) {
+    CHECK(!selected[index(i)])
+        << "Selection is not invertible: " << DebugString();
+    selected[index(i)] = true;
+  }
+  return new SelectionMatrixImpl(
+      n_, offset_, stride0_, stride1_, rows_, cols_, !scatter_, 1/alpha_);
+}
+
+bool SelectionMatrixImpl::SameSelection(
+    const SelectionMatrixImpl& other) const {
+  return (n_ == other.n_ &&
+          offset_ == other.offset_ &&
+          stride0_ == other.stride0_ &&
+          stride1_ == other.stride1_ &&
+          rows_ == other.rows_ &&
+          cols_ == other.cols_ &&
+          scatter_ == other.scatter_);
+}
+
+bool SelectionMatrixImpl::Injective() const {
+  if ((rows_ > 1 && stride0_ == 0) || (cols_ > 1 && stride1_ == 0))
+    return false;
+  return (rows_ == 1 || cols_ == 1 ||
+          std::abs(stride0_)*rows_ <= std::abs(stride1_) ||
+          std::abs(stride1_)*cols_ <= std::abs(stride0_));
+}
+
+bool SelectionMatrixImpl::operator==(const LinearMapImpl& other) const {
+  if (other.type() != SELECTION_MATRIX ||
+      other.m() != m() ||
+      other.n() != n())
+    return false;
+  auto const& S = static_cast<const SelectionMatrixImpl&>(other);
+  return SameSelection(S) && S.alpha() == alpha_;
+}
+
+LinearMap::SparseMatrix SelectionMatrixImpl::AsSparse() const {
+  const int k = rows_*cols_;
+  SparseMatrix A(k, n_);
+  std::vector<Eigen::Triplet<double> > coeffs;
+  coeffs.reserve(k);
+  for (int i = 0; i < k; i++)
+    coeffs.push_back(Eigen::Triplet<double>(i, index(i), alpha_));
+  A.setFromTriplets(coeffs.begin(), coeffs.end());
+  if (scatter_)
+    return A.transpose();
+  return A;
+}
+
+LinearMapImpl::SparseMatrix AsSparseMatrix(const LinearMapImpl& A) {
+  switch (A.type()) {
+    case SPARSE_MATRIX:
+      return static_cast<const SparseMatrixImpl&>(A).sparse();
+    case DIAGONAL_MATRIX:
+      return DiagonalSparse(
+          static_cast<const DiagonalMatrixImpl&>(A).diagonal().diagonal());
+    case SCALAR_MATRIX:
+      return static_cast<const ScalarMatrixImpl&>(A).AsSparse();
+    case KRONECKER_PRODUCT:
+      return static_cast<const KroneckerProductImpl&>(A).AsSparse();
+    case SELECTION_MATRIX:
+      return static_cast<const SelectionMatrixImpl&>(A).AsSparse();
+    default:
+      return A.AsDense().sparseView();
+  }
+}
+
+}  // namespace linear_map
@@ -0,0 +1,82 @@
+#ifndef EPSILON_LINEAR_SELECTION_MATRIX_IMPL_H
+#define EPSILON_LINEAR_SELECTION_MATRIX_IMPL_H
+
+#include "epsilon/linear/linear_map.h"
+#include "epsilon/util/string.h"
+#include "epsilon/vector/vector_util.h"
+
+namespace linear_map {
+
+// Strided selection of elements from a vector, scaled by alpha. Element (i,j)
+// of a rows x cols shape, in column-major order, selects
+// x[offset + i*stride0 + j*stride1]. This covers indexing, transposes,
+// diagonals and the placements used by stacking, with scatter (the transpose
+// of a selection) taking the elements back to their original positions.
+class SelectionMatrixImpl final : public LinearMapImpl {
+ public:
+  SelectionMatrixImpl(
+      int n, int offset, int stride0, int stride1, int rows, int cols,
+      bool scatter, double alpha)
+      : LinearMapImpl(SELECTION_MATRIX),
+        n_(n), offset_(offset), stride0_(stride0), stride1_(stride1),
+        rows_(rows), cols_(cols), scatter_(scatter), alpha_(alpha) {}
+
+  int m() const override { return scatter_ ? n_ : rows_*cols_; }
+  int n() const override { return scatter_ ? rows_*cols_ : n_; }
+  std::string DebugString() const override {
+    return StringPrintf(
+        "selection matrix: n=%d offset=%d stride=(%d,%d) shape=(%d,%d) "
+        "scatter=%d alpha=%3.4f",
+        n_, offset_, stride0_, stride1_, rows_, cols_, scatter_, alpha_);
+  }
+  DenseMatrix AsDense() const override {
+    return static_cast<DenseMatrix>(AsSparse());
+  }
+  DenseVector Apply(const DenseVector& x) const override;
+
+  LinearMapImpl* Transpose() const override {
+    return new SelectionMatrixImpl(
+        n_, offset_, stride0_, stride1_, rows_, cols_, !scatter_, alpha_);
+  }
+  LinearMapImpl* Inverse() const override;
+
+  bool operator==(const LinearMapImpl& other) const override;
+
+  // Selection matrix API
+  int offset() const { return offset_; }
+  int stride0() const { return stride0_; }
+  int stride1() const { return stride1_; }
+  int rows() const { return rows_; }
+  int cols() const { return cols_; }
+  bool scatter() const { return scatter_; }
+  double alpha() const { return alpha_; }
+
+  // Size of the vector elements are selected from
+  int source_size() const { return n_; }
+
+  // Index selected by element k of the shape
+  int index(int k) const {
+    return offset_ + (k % rows_)*stride0_ + (k / rows_)*stride1_;
+  }
+
+  // Same selection, ignoring alpha
+  bool SameSelection(const SelectionMatrixImpl& other) const;
+
+  // Whether each element is selected at most once, conservative for
+  // interleaved strides
+  bool Injective() const;
+
+  SparseMatrix AsSparse() const;
+
+ private:
+  int n_, offset_, stride0_, stride1_, rows_, cols_;
+  bool scatter_;
+  double alpha_;
+};
+
+// Sparse form of any linear map supporting AsDense()
+LinearMapImpl::SparseMatrix AsSparseMatrix(const LinearMapImpl& A);
+
+}  // namespace linear_map
+
+#endif  // EPSILON_LINEAR_SELECTION_MATRIX_IMPL_H
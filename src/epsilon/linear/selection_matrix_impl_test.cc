@@ -0,0 +1,95 @@
+#include <gtest/gtest.h>
+
+#include "epsilon/vector/vector_testutil.h"
+#include "epsilon/linear/dense_matrix_impl.h"
+#include "epsilon/linear/selection_matrix_impl.h"
+
+namespace linear_map {
+
+// Transpose of a 3x4 matrix
+LinearMap TransposeSelection() {
+  return LinearMap(new SelectionMatrixImpl(12, 0, 3, 1, 4, 3, false, 1));
+}
+
+// Elements 1, 3, 5 and 7 of a 10 element vector
+LinearMap StridedSelection() {
+  return LinearMap(new SelectionMatrixImpl(10, 1, 2, 0, 4, 1, false, 1));
+}
+
+TEST(SelectionMatrixImplTest, Apply) {
+  srand(0);
+  Eigen::MatrixXd X = Eigen::MatrixXd::Random(3, 4);
+  LinearMap A = TransposeSelection();
+  EXPECT_TRUE(VectorEquals(
+      ToVector(X.transpose()), A.impl().Apply(ToVector(X)), 1e-12));
+  EXPECT_TRUE(VectorEquals(
+      A.impl().AsDense()*ToVector(X), A.impl().Apply(ToVector(X)), 1e-12));
+
+  Eigen::VectorXd x = Eigen::VectorXd::Random(10);
+  Eigen::VectorXd y(4);
+  y << x(1), x(3), x(5), x(7);
+  EXPECT_TRUE(VectorEquals(y, StridedSelection().impl().Apply(x), 1e-12));
+}
+
+TEST(SelectionMatrixImplTest, Scatter) {
+  srand(0);
+  LinearMap A = StridedSelection().Transpose();
+  EXPECT_EQ(10, A.impl().m());
+  EXPECT_EQ(4, A.impl().n());
+
+  Eigen::VectorXd x = Eigen::VectorXd::Random(4);
+  EXPECT_TRUE(VectorEquals(
+      StridedSelection().impl().AsDense().transpose()*x,
+      A.impl().Apply(x), 1e-12));
+}
+
+TEST(SelectionMatrixImplTest, Compose) {
+  LinearMap A = StridedSelection();
+  LinearMap B(new SelectionMatrixImpl(4, 1, 2, 0, 2, 1, false, 2));
+  LinearMap C = B*A;
+  EXPECT_EQ(SELECTION_MATRIX, C.impl().type());
+  EXPECT_TRUE(MatrixEquals(
+      B.impl().AsDense()*A.impl().AsDense(), C.impl().AsDense(), 1e-12));
+
+  LinearMap CT = A.Transpose()*B.Transpose();
+  EXPECT_EQ(SELECTION_MATRIX, CT.impl().type());
+  EXPECT_TRUE(MatrixEquals(
+      C.impl().AsDense().transpose(), CT.impl().AsDense(), 1e-12));
+}
+
+TEST(SelectionMatrixImplTest, SelectScatter) {
+  LinearMap A = StridedSelection();
+  LinearMap I = A*A.Transpose();
+  EXPECT_EQ(SCALAR_MATRIX, I.impl().type());
+  EXPECT_TRUE(MatrixEquals(
+      Eigen::MatrixXd::Identity(4, 4), I.impl().AsDense(), 1e-12));
+
+  LinearMap P = A.Transpose()*A;
+  EXPECT_EQ(SPARSE_MATRIX, P.impl().type());
+  EXPECT_TRUE(MatrixEquals(
+      A.impl().AsDense().transpose()*A.impl().AsDense(),
+      P.impl().AsDense(), 1e-12));
+}
+
+TEST(SelectionMatrixImplTest, ScalarAdd) {
+  LinearMap A = TransposeSelection();
+  LinearMap B = 2*A + A;
+  EXPECT_EQ(SELECTION_MATRIX, B.impl().type());
+  EXPECT_TRUE(MatrixEquals(3*A.impl().AsDense(), B.impl().AsDense(), 1e-12));
+
+  srand(0);
+  Eigen::MatrixXd C = Eigen::MatrixXd::Random(12, 12);
+  LinearMap D = A + LinearMap(new DenseMatrixImpl(C));
+  EXPECT_EQ(DENSE_MATRIX, D.impl().type());
+  EXPECT_TRUE(MatrixEquals(A.impl().AsDense() + C, D.impl().AsDense(), 1e-12));
+}
+
+TEST(SelectionMatrixImplTest, Inverse) {
+  LinearMap A = TransposeSelection();
+  EXPECT_TRUE(MatrixEquals(
+      Eigen::MatrixXd::Identity(12, 12),
+      (A.Inverse()*A).impl().AsDense(), 1e-12));
+  EXPECT_EQ(A.Transpose(), A.Inverse());
+}
+
+}  // namespace linear_map
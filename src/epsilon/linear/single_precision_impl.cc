@@ -0,0 +1,132 @@
+
+#include "epsilon/linear/dense_matrix_impl.h"
+#include "epsilon/linear/lapack.h"
+#include "epsilon/linear/linear_map.h"
+#include "epsilon/linear/sparse_matrix_impl.h"
+#include "epsilon/util/string.h"
+
+namespace linear_map {
+
+// Dense matrix stored in single precision, multiplied with sgemv. Inputs and
+// outputs are still double precision vectors.
+class SingleDenseMatrixImpl final : public LinearMapImpl {
+ public:
+  typedef Eigen::MatrixXf SingleMatrix;
+
+  SingleDenseMatrixImpl(
+      std::shared_ptr<const SingleMatrix> A, char trans)
+      : LinearMapImpl(BASIC),
+        A_(A),
+        trans_(trans) {}
+
+  int m() const override { return trans_ == 'N' ? A_->rows() : A_->cols(); }
+  int n() const override { return trans_ == 'N' ? A_->cols() : A_->rows(); }
+  std::string DebugString() const override {
+    return StringPrintf(
+        "single dense matrix %d x %d%s", m(), n(), trans_ == 'N' ? "" : "'");
+  }
+
+  DenseMatrix AsDense() const override {
+    DenseMatrix A = A_->cast<double>();
+    return trans_ == 'N' ? A : static_cast<DenseMatrix>(A.transpose());
+  }
+
+  DenseVector Apply(const DenseVector& x) const override {
+    float alpha = 1;
+    float beta = 0;
+    int m = A_->rows();
+    int n = A_->cols();
+    int incx = 1;
+    int incy = 1;
+    Eigen::VectorXf xf = x.cast<float>();
+    Eigen::VectorXf yf(this->m());
+    sgemv_(const_cast<char*>(&trans_), &m, &n, &alpha,
+           const_cast<float*>(A_->data()), &m,
+           xf.data(), &incx, &beta,
+           yf.data(), &incy);
+    return yf.cast<double>();
+  }
+
+  LinearMapImpl* Transpose() const override {
+    return new SingleDenseMatrixImpl(A_, trans_ == 'T' ? 'N' : 'T');
+  }
+
+  LinearMapImpl* Inverse() const override {
+    LOG(FATAL) << "Not implemented";
+  }
+
+  bool operator==(const LinearMapImpl& other) const override {
+    LOG(FATAL) << "Not implemented";
+  }
+
+ private:
+  std::shared_ptr<const SingleMatrix> A_;
+  char trans_;
+};
+
+// Sparse matrix stored in single precision
+class SingleSparseMatrixImpl final : public LinearMapImpl {
+ public:
+  typedef Eigen::SparseMatrix<float> SingleSparseMatrix;
+
+  SingleSparseMatrixImpl(
+      std::shared_ptr<const SingleSparseMatrix> A, bool transpose)
+      : LinearMapImpl(BASIC),
+        A_(A),
+        transpose_(transpose) {}
+
+  int m() const override { return transpose_ ? A_->cols() : A_->rows(); }
+  int n() const override { return transpose_ ? A_->rows() : A_->cols(); }
+  std::string DebugString() const override {
+    return StringPrintf(
+        "single sparse matrix %d x %d, nnz=%d%s",
+        m(), n(), static_cast<int>(A_->nonZeros()), transpose_ ? "'" : "");
+  }
+
+  DenseMatrix AsDense() const override {
+    DenseMatrix A = static_cast<DenseMatrix>(A_->cast<double>());
+    return transpose_ ? static_cast<DenseMatrix>(A.transpose()) : A;
+  }
+
+  DenseVector Apply(const DenseVector& x) const override {
+    Eigen::VectorXf xf = x.cast<float>();
+    if (transpose_) {
+      return (A_->transpose()*xf).cast<double>();
+    } else {
+      return ((*A_)*xf).cast<double>();
+    }
+  }
+
+  LinearMapImpl* Transpose() const override {
+    return new SingleSparseMatrixImpl(A_, !transpose_);
+  }
+
+  LinearMapImpl* Inverse() const override {
+    LOG(FATAL) << "Not implemented";
+  }
+
+  bool operator==(const LinearMapImpl& other) const override {
+    LOG(FATAL) << "Not implemented";
+  }
+
+ private:
+  std::shared_ptr<const SingleSparseMatrix> A_;
+  bool transpose_;
+};
+
+LinearMap SinglePrecision(const LinearMap& linear_map) {
+  const LinearMapImpl& impl = linear_map.impl();
+  if (impl.type() == DENSE_MATRIX) {
+    std::shared_ptr<const Eigen::MatrixXf> A(
+        new Eigen::MatrixXf(impl.AsDense().cast<float>()));
+    return LinearMap(new SingleDenseMatrixImpl(A, 'N'));
+  } else if (impl.type() == SPARSE_MATRIX) {
+    auto const& S = static_cast<const SparseMatrixImpl&>(impl);
+    std::shared_ptr<const Eigen::SparseMatrix<float>> A(
+        new Eigen::SparseMatrix<float>(S.sparse().cast<float>()));
+    return LinearMap(new SingleSparseMatrixImpl(A, false));
+  }
+  return linear_map;
+}
+
+}  // namespace linear_map
@@ -0,0 +1,47 @@
+
+#include <gtest/gtest.h>
+
+#include "epsilon/linear/dense_matrix_impl.h"
+#include "epsilon/linear/scalar_matrix_impl.h"
+#include "epsilon/linear/sparse_matrix_impl.h"
+#include "epsilon/vector/vector_testutil.h"
+
+namespace linear_map {
+
+class SinglePrecisionImplTest : public testing::Test {
+ protected:
+  SinglePrecisionImplTest() {
+    srand(0);
+    A0 = Eigen::MatrixXd::Random(4,3);
+    x = Eigen::VectorXd::Random(3);
+    y = Eigen::VectorXd::Random(4);
+  }
+
+  Eigen::MatrixXd A0;
+  Eigen::VectorXd x, y;
+};
+
+TEST_F(SinglePrecisionImplTest, Dense) {
+  LinearMap A = SinglePrecision(LinearMap(new DenseMatrixImpl(A0)));
+  EXPECT_EQ(BASIC, A.impl().type());
+  EXPECT_TRUE(VectorEquals(A0*x, A.impl().Apply(x), 1e-5));
+  EXPECT_TRUE(VectorEquals(
+      A0.transpose()*y, A.Transpose().impl().Apply(y), 1e-5));
+  EXPECT_TRUE(MatrixEquals(A0, A.impl().AsDense(), 1e-5));
+}
+
+TEST_F(SinglePrecisionImplTest, Sparse) {
+  SparseXd S0 = A0.sparseView();
+  LinearMap A = SinglePrecision(LinearMap(new SparseMatrixImpl(S0)));
+  EXPECT_EQ(BASIC, A.impl().type());
+  EXPECT_TRUE(VectorEquals(A0*x, A.impl().Apply(x), 1e-5));
+  EXPECT_TRUE(VectorEquals(
+      A0.transpose()*y, A.Transpose().impl().Apply(y), 1e-5));
+}
+
+TEST_F(SinglePrecisionImplTest, Unchanged) {
+  LinearMap S = SinglePrecision(LinearMap(new ScalarMatrixImpl(3, 2)));
+  EXPECT_EQ(SCALAR_MATRIX, S.impl().type());
+}
+
+}  // namespace linear_map
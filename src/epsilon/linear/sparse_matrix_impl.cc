@@ -1,7 +1,7 @@
 
 #include <Eigen/SparseCholesky>
 
-#include "epsilon/linear/dense_matrix_impl.h"
+#include "epsilon/linear/dense_cholesky_impl.h"
 #include "epsilon/linear/scalar_matrix_impl.h"
 #include "epsilon/linear/sparse_matrix_impl.h"
 
@@ -70,10 +70,9 @@ LinearMapImpl* SparseMatrixImpl::Inverse() const {
     std::unique_ptr<LinearMapImpl> impl(new ScalarMatrixImpl(n(), alpha));
     return impl->Inverse();
   } else {
-    // TODO(mwytock): This should instead return Matrix LL', likely need to
-    // extend matrix types to include triangular and product types.
-    std::unique_ptr<LinearMapImpl> impl(new DenseMatrixImpl(A_));
-    return impl->Inverse();
+    // Factored densely as there is no sparse factorization impl type, this
+    // densifies the system regardless of its fill-in.
+    return new DenseCholeskyImpl(static_cast<DenseMatrix>(A_));
   }
 }
 
@@ -83,9 +82,14 @@ bool SparseMatrixImpl::operator==(const LinearMapImpl& other) const {
       other.n() != n())
     return false;
 
-  // Sparse matrix equality not implemented in Eigen?
-  // TODO(mwytock): Fix this
-  return false;
+  // Both are compressed, compare the underlying arrays
+  const SparseMatrix& B = static_cast<const SparseMatrixImpl&>(other).sparse();
+  const int nnz = A_.nonZeros();
+  return (B.nonZeros() == nnz &&
+          memcmp(B.outerIndexPtr(), A_.outerIndexPtr(),
+                 (A_.outerSize()+1)*sizeof(int)) == 0 &&
+          memcmp(B.innerIndexPtr(), A_.innerIndexPtr(), nnz*sizeof(int)) == 0 &&
+          memcmp(B.valuePtr(), A_.valuePtr(), nnz*sizeof(Scalar)) == 0);
 }
 
 }  // namespace linear_map
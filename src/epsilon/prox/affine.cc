@@ -31,7 +31,7 @@ class AffineProx final : public ProxOperator {
     VLOG(2) << "c: " << c.DebugString();
 
     BlockMatrix M = A + A.Transpose() - A.LeftIdentity();
-    chol_.Compute(M);
+    chol_.Compute(M, arg.precision() == SolverParams::SINGLE);
     g_ = -1*b - c;
   }
 
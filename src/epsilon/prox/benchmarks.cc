@@ -0,0 +1,145 @@
+#include <glog/logging.h>
+#include <benchmark/benchmark.h>
+
+#include "epsilon/affine/affine.h"
+#include "epsilon/linear/scalar_matrix_impl.h"
+#include "epsilon/prox/prox.h"
+#include "epsilon/util/benchmark_util.h"
+#include "epsilon/util/string.h"
+#include "epsilon/vector/vector_util.h"
+
+// Rows of each slice for functions applied along an axis
+const int kAxisRows = 10;
+
+enum Shape {
+  VECTOR,   // n x 1
+  MATRIX,   // n x n
+  COLUMNS,  // kAxisRows x n, applied to each column
+};
+
+struct ProxCase {
+  const char* name;
+  ProxFunction::Type type;
+  bool epigraph;
+  Shape shape;
+};
+
+// Prox operators which can be constructed without constant data, operators
+// such as AFFINE, ZERO and SUM_QUANTILE require a data map and are omitted.
+const ProxCase kProxCases[] = {
+  {"LogSumExp", ProxFunction::LOG_SUM_EXP, false, VECTOR},
+  {"Max", ProxFunction::MAX, false, VECTOR},
+  {"NonNegative", ProxFunction::NON_NEGATIVE, false, VECTOR},
+  {"Norm1", ProxFunction::NORM_1, false, VECTOR},
+  {"Norm2", ProxFunction::NORM_2, false, VECTOR},
+  {"SumDeadzone", ProxFunction::SUM_DEADZONE, false, VECTOR},
+  {"SumExp", ProxFunction::SUM_EXP, false, VECTOR},
+  {"SumHinge", ProxFunction::SUM_HINGE, false, VECTOR},
+  {"SumInvPos", ProxFunction::SUM_INV_POS, false, VECTOR},
+  {"SumLargest", ProxFunction::SUM_LARGEST, false, VECTOR},
+  {"SumLogistic", ProxFunction::SUM_LOGISTIC, false, VECTOR},
+  {"SumNegEntr", ProxFunction::SUM_NEG_ENTR, false, VECTOR},
+  {"SumNegLog", ProxFunction::SUM_NEG_LOG, false, VECTOR},
+  {"SumSquare", ProxFunction::SUM_SQUARE, false, VECTOR},
+  {"LambdaMax", ProxFunction::LAMBDA_MAX, false, MATRIX},
+  {"NegLogDet", ProxFunction::NEG_LOG_DET, false, MATRIX},
+  {"NormNuclear", ProxFunction::NORM_NUCLEAR, false, MATRIX},
+  {"Semidefinite", ProxFunction::SEMIDEFINITE, false, MATRIX},
+  {"LogSumExpEpigraph", ProxFunction::LOG_SUM_EXP, true, VECTOR},
+  {"MaxEpigraph", ProxFunction::MAX, true, VECTOR},
+  {"Norm1Epigraph", ProxFunction::NORM_1, true, VECTOR},
+  {"SumExpEpigraph", ProxFunction::SUM_EXP, true, VECTOR},
+  {"SumLargestEpigraph", ProxFunction::SUM_LARGEST, true, VECTOR},
+  {"SumSquareEpigraph", ProxFunction::SUM_SQUARE, true, VECTOR},
+  {"LambdaMaxEpigraph", ProxFunction::LAMBDA_MAX, true, MATRIX},
+  {"NormNuclearEpigraph", ProxFunction::NORM_NUCLEAR, true, MATRIX},
+  {"Norm2Axis", ProxFunction::NORM_2, false, COLUMNS},
+  {"MaxAxis", ProxFunction::MAX, false, COLUMNS},
+  {"LogSumExpAxisEpigraph", ProxFunction::LOG_SUM_EXP, true, COLUMNS},
+};
+
+void AddArg(int m, int n, const std::string& var_key, ProxFunction* f,
+            AffineOperator* H, AffineOperator* A) {
+  const int i = f->arg_size_size();
+  Size* size = f->add_arg_size();
+  size->add_dim(m);
+  size->add_dim(n);
+  H->A(affine::arg_key(i), var_key) = linear_map::LinearMap(
+      new linear_map::ScalarMatrixImpl(m*n, 1));
+  A->A(affine::constraint_key(i), var_key) = linear_map::LinearMap(
+      new linear_map::ScalarMatrixImpl(m*n, 1));
+}
+
+void BM_Apply(benchmark::State& state, ProxCase prox_case) {
+  srand(0);
+  const int n = state.range(0);
+  int rows = n, cols = 1;
+  if (prox_case.shape == MATRIX) {
+    cols = n;
+  } else if (prox_case.shape == COLUMNS) {
+    rows = kAxisRows;
+    cols = n;
+  }
+
+  ProxFunction f;
+  f.set_prox_function_type(prox_case.type);
+  f.set_epigraph(prox_case.epigraph);
+  f.set_alpha(1);
+  f.mutable_sum_largest_params()->set_k(std::max(rows*cols/10, 1));
+  f.mutable_scaled_zone_params()->set_m(0.5);
+
+  AffineOperator H, A;
+  AddArg(rows, cols, "x", &f, &H, &A);
+  if (prox_case.shape == COLUMNS) {
+    f.set_has_axis(true);
+    f.set_axis(0);
+    if (prox_case.epigraph)
+      AddArg(1, cols, "t", &f, &H, &A);
+  } else if (prox_case.epigraph) {
+    AddArg(1, 1, "t", &f, &H, &A);
+  }
+
+  SolverParams params;
+  DataMap data_map;
+  std::unique_ptr<ProxOperator> prox = CreateProxOperator(
+      prox_case.type, prox_case.epigraph);
+  prox->Init(ProxOperatorArg(f, data_map, H, A, params));
+
+  BlockVector v;
+  int64_t size = 0;
+  for (int i = 0; i < f.arg_size_size(); i++) {
+    const int arg_size = f.arg_size(i).dim(0)*f.arg_size(i).dim(1);
+    v(affine::constraint_key(i)) = Eigen::VectorXd::Random(arg_size);
+    size += arg_size;
+  }
+
+  {
+    AllocationCounter counter(&state);
+    while (state.KeepRunning()) {
+      benchmark::DoNotOptimize(prox->Apply(v));
+    }
+  }
+  state.SetBytesProcessed(state.iterations()*16*size);
+}
+
+void RegisterBenchmarks() {
+  for (const ProxCase& prox_case : kProxCases) {
+    benchmark::internal::Benchmark* b = benchmark::RegisterBenchmark(
+        StringPrintf("BM_Apply/%s", prox_case.name).c_str(),
+        BM_Apply, prox_case);
+    if (prox_case.shape == MATRIX) {
+      b->Arg(10)->Arg(100);
+    } else if (prox_case.epigraph) {
+      // Epigraph operators iterate to find t and are considerably slower
+      b->Arg(1000)->Arg(10000);
+    } else {
+      b->Arg(1000)->Arg(100000);
+    }
+  }
+}
+
+int main(int argc, char** argv) {
+  RegisterBenchmarks();
+  benchmark::Initialize(&argc, argv);
+  benchmark::RunSpecifiedBenchmarks();
+}
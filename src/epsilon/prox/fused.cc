@@ -0,0 +1,118 @@
+#include <limits>
+
+#include "epsilon/affine/affine.h"
+#include "epsilon/prox/prox.h"
+#include "epsilon/util/string.h"
+#include "epsilon/vector/vector_util.h"
+
+// Extracts the affine operator for the i-th argument as the 0-th argument
+AffineOperator GetArg(const AffineOperator& H, int i) {
+  AffineOperator Hi;
+  const std::string key = affine::arg_key(i);
+  for (const auto& col_iter : H.A.data()) {
+    for (const auto& row_iter : col_iter.second) {
+      if (row_iter.first == key)
+        Hi.A(affine::arg_key(0), col_iter.first) = row_iter.second;
+    }
+  }
+  if (H.b.has_key(key))
+    Hi.b(affine::arg_key(0)) = H.b(key);
+  return Hi;
+}
+
+// Sum of elementwise functions of the same variable, f_0(H_0(x)) + ... +
+// f_k(H_k(x)), with each H_i diagonal. Fused by the compiler so that the terms
+// do not each require their own copy of x. The SUM_SQUARE terms are absorbed
+// into the least squares term and the NON_NEGATIVE terms become bounds on x,
+// which can be applied after the prox of the remaining function as the
+// problem is separable.
+class FusedProx final : public ProxOperator {
+ public:
+  void Init(const ProxOperatorArg& arg) override {
+    const ProxFunction& f = arg.prox_function();
+    const std::set<std::string> var_keys = arg.affine_arg().A.col_keys();
+    CHECK_EQ(1, var_keys.size());
+    var_key_ = *var_keys.begin();
+
+    // The base function handles the prox, the first function which is not
+    // absorbed or failing that, the first SUM_SQUARE.
+    int base = -1;
+    for (int i = 0; i < f.fused_function_size(); i++) {
+      const ProxFunction::Type type = f.fused_function(i).prox_function_type();
+      CHECK(!f.fused_function(i).epigraph());
+      if (type != ProxFunction::NON_NEGATIVE &&
+          type != ProxFunction::SUM_SQUARE) {
+        CHECK_EQ(-1, base) << "Multiple base functions";
+        base = i;
+      }
+    }
+    for (int i = 0; base == -1 && i < f.fused_function_size(); i++) {
+      if (f.fused_function(i).prox_function_type() == ProxFunction::SUM_SQUARE)
+        base = i;
+    }
+    if (base == -1)
+      base = 0;
+
+    AffineOperator A = arg.affine_constraint();
+    for (int i = 0; i < f.fused_function_size(); i++) {
+      const ProxFunction& fi = f.fused_function(i);
+      const AffineOperator Hi = GetArg(arg.affine_arg(), i);
+      const linear_map::LinearMap& Di = Hi.A(affine::arg_key(0), var_key_);
+      Eigen::VectorXd gi = Eigen::VectorXd::Zero(Di.impl().m());
+      if (Hi.b.has_key(affine::arg_key(0)))
+        gi = Hi.b(affine::arg_key(0));
+
+      if (fi.prox_function_type() == ProxFunction::NON_NEGATIVE) {
+        AddBounds(linear_map::GetDiagonal(Di), gi);
+      } else if (i != base) {
+        // alpha*||D*x + g||^2 = (1/2)||sqrt(2*alpha)*(D*x + g)||^2
+        CHECK_EQ(ProxFunction::SUM_SQUARE, fi.prox_function_type());
+        const double beta = sqrt(2*fi.alpha());
+        const std::string key = StringPrintf("fused:%d", i);
+        A.A(key, var_key_) = beta*Di;
+        b_(key) = -beta*gi;
+      }
+    }
+
+    prox_ = CreateProxOperator(
+        f.fused_function(base).prox_function_type(), false);
+    prox_->Init(ProxOperatorArg(
+        f.fused_function(base), arg.data_map(),
+        GetArg(arg.affine_arg(), base), A, arg.params()));
+  }
+
+  BlockVector Apply(const BlockVector& v) override {
+    BlockVector vb = v;
+    vb += b_;
+    BlockVector x = prox_->Apply(vb);
+    if (lower_.rows() > 0)
+      x(var_key_) = x(var_key_).cwiseMax(lower_).cwiseMin(upper_);
+    return x;
+  }
+
+ private:
+  // Bounds from d.*x + g >= 0
+  void AddBounds(const Eigen::VectorXd& d, const Eigen::VectorXd& g) {
+    const int n = d.rows();
+    if (lower_.rows() == 0) {
+      lower_ = Eigen::VectorXd::Constant(
+          n, -std::numeric_limits<double>::infinity());
+      upper_ = Eigen::VectorXd::Constant(
+          n, std::numeric_limits<double>::infinity());
+    }
+    CHECK_EQ(n, lower_.rows());
+    for (int i = 0; i < n; i++) {
+      if (d(i) > 0) {
+        lower_(i) = std::max(lower_(i), -g(i)/d(i));
+      } else if (d(i) < 0) {
+        upper_(i) = std::min(upper_(i), -g(i)/d(i));
+      }
+    }
+  }
+
+  std::unique_ptr<ProxOperator> prox_;
+  std::string var_key_;
+  BlockVector b_;
+  Eigen::VectorXd lower_, upper_;
+};
+REGISTER_PROX_OPERATOR(FUSED, FusedProx);
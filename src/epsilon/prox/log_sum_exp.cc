@@ -20,48 +20,44 @@
 class LogSumExp final : public SmoothFunction {
 public:
   double eval(const Eigen::VectorXd &x) const override {
-    int n = x.rows();
-    double max_x = x.maxCoeff();
-    Eigen::VectorXd w(n);
-    for(int i=0; i<n; i++) {
-      w(i) = std::exp(x(i)-max_x);
-    }
-    return max_x + std::log(w.sum());
+    SmoothDerivatives d;
+    eval_derivatives(x, &d);
+    return d.f;
   }
   Eigen::VectorXd gradf(const Eigen::VectorXd &x) const override {
-    int n = x.rows();
-    double max_x = x.maxCoeff();
-    Eigen::VectorXd w(n);
-    for(int i=0; i<n; i++) {
-      w(i) = std::exp(x(i)-max_x);
-    }
-    w /= w.sum();
-    return w;
+    SmoothDerivatives d;
+    eval_derivatives(x, &d);
+    return d.g;
+  }
+  void eval_derivatives(
+      const Eigen::VectorXd &x, SmoothDerivatives* d) const override {
+    const double max_x = x.maxCoeff();
+    d->g = (x.array() - max_x).exp();
+    const double sum_w = d->g.sum();
+    d->g /= sum_w;
+    d->f = max_x + std::log(sum_w);
   }
   Eigen::VectorXd hess_inv(
+      const Eigen::VectorXd& lambda,
+      const Eigen::VectorXd& x,
+      const Eigen::VectorXd& v) const override {
+    SmoothDerivatives d;
+    eval_derivatives(x, &d);
+    return hess_inv_derivatives(lambda, x, d, v);
+  }
+  // The gradient is w, see above
+  Eigen::VectorXd hess_inv_derivatives(
       const Eigen::VectorXd& lambda_,
       const Eigen::VectorXd& x,
+      const SmoothDerivatives& derivs,
       const Eigen::VectorXd& v) const override {
-    const int n = x.rows();
-    double lambda = lambda_(0);
-
-    Eigen::VectorXd w = gradf(x);
-
-    double t=0, r=0;
-    for(int i=0; i<n; i++) {
-      double wi = w(i);
-      double vi = v(i);
-      t += wi*wi/(1+lambda*wi);
-      r += vi*wi/(1+lambda*wi);
-    }
-    double s = lambda*r/(1-lambda*t);
-    Eigen::VectorXd Hinv_v(n);
-    for(int i=0; i<n; i++) {
-      double wi = w(i);
-      double vi = v(i);
-      Hinv_v(i) = vi/(1+lambda*wi) + wi/(1+lambda*wi) * s;
-    }
-    return Hinv_v;
+    const Eigen::VectorXd& w = derivs.g;
+    const double lambda = lambda_(0);
+    const Eigen::ArrayXd dinv = (1 + lambda*w.array()).inverse();
+    const double t = (w.array().square()*dinv).sum();
+    const double r = (v.array()*w.array()*dinv).sum();
+    const double s = lambda*r/(1-lambda*t);
+    return (dinv*(v.array() + w.array()*s)).matrix();
   }
 };
 
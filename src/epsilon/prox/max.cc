@@ -1,6 +1,6 @@
-
 #include "epsilon/affine/affine.h"
 #include "epsilon/expression/expression_util.h"
+#include "epsilon/prox/threshold.h"
 #include "epsilon/prox/vector_prox.h"
 #include "epsilon/vector/vector_util.h"
 
@@ -13,32 +13,29 @@ protected:
     const Eigen::VectorXd& v = input.value_vec(0);
     const double lambda = input.lambda();
 
-    int n = v.rows();
-    Eigen::VectorXd y_vec = v;
-    double *y = y_vec.data();
-    sort(y, y+n, std::greater<double>());
-
-    // lambda = \sum_i (v_i-t)_+ = \sum_{vi>=t} (v_i-t)
+    // lambda = \sum_i (v_i-t)_+
     //    x_i = min(t, v_i)
+    const double t = MaxThreshold(v, 0, lambda, &work_);
+    output->set_value(0, v.cwiseMin(t));
+  }
 
-    double t = 0;
-    double acc = -lambda, div = 0;
-    for(int i=0; i<n; i++) {
-      if(y[i]*div < acc)
-        break;
-      acc += y[i];
-      div += 1;
-      t = acc / div;
+  bool batched() const override { return true; }
+  void ApplyColumns(
+      const VectorProxInput& input,
+      int begin, int end,
+      VectorProxOutput* output) override {
+    const Eigen::MatrixXd& V = input.value_mat(0);
+    Eigen::MatrixXd* X = output->mutable_value_mat(0);
+    const double lambda = input.lambda();
+    std::vector<double> work;
+    for (int j = begin; j < end; j++) {
+      const double t = MaxThreshold(V.col(j), 0, lambda, &work);
+      X->col(j) = V.col(j).cwiseMin(t);
     }
-
-    // VLOG(1) << "t = " << t << "\n";
-
-    Eigen::VectorXd x(n);
-    for(int i=0; i<n; i++)
-      x(i) = std::min(v(i), t);
-
-    output->set_value(0, x);
   }
+
+ private:
+  std::vector<double> work_;
 };
 REGISTER_PROX_OPERATOR(MAX, MaxProx);
 
@@ -50,38 +47,33 @@ public:
       VectorProxOutput* output) override {
     const Eigen::VectorXd& v = input.value_vec(0);
     const double s = input.value(1);
-    const int n = v.rows();
 
-    Eigen::VectorXd y_vec = v;
-    double *y = y_vec.data();
-    sort(y, y+n, std::greater<double>());
-
-    if (s >= y[0]) {
-      output->set_value(0, v);
-      output->set_value(1, s);
-      return;
-    }
+    // t - s = \sum_i (v_i-t)_+
+    //   x_i = min(t, v_i)
+    const double t = MaxThreshold(v, 1, -s, &work_);
+    output->set_value(0, v.cwiseMin(t));
+    output->set_value(1, t);
+  }
 
-    // delta = \sum_i (v_i-s-delta)_+
-    //    x_i = v-(v_i-s-delta)_+
-    //    t = s + delta
-    double delta = 0;
-    double acc = 0, div = 1;
-    for(int i=0; i<n; i++) {
-      if(div * (y[i]-s) < acc)
-        break;
-      acc += y[i]-s;
-      div += 1;
-      delta = acc/div;
+ protected:
+  bool batched() const override { return true; }
+  void ApplyColumns(
+      const VectorProxInput& input,
+      int begin, int end,
+      VectorProxOutput* output) override {
+    const Eigen::MatrixXd& V = input.value_mat(0);
+    const Eigen::MatrixXd& S = input.value_mat(1);
+    Eigen::MatrixXd* X = output->mutable_value_mat(0);
+    Eigen::MatrixXd* T = output->mutable_value_mat(1);
+    std::vector<double> work;
+    for (int j = begin; j < end; j++) {
+      const double t = MaxThreshold(V.col(j), 1, -S(0,j), &work);
+      X->col(j) = V.col(j).cwiseMin(t);
+      (*T)(0,j) = t;
     }
-
-    double t = s + delta;
-    Eigen::VectorXd x(n);
-    for (int i=0; i < n; i++)
-      x(i) = v(i) - std::max(0., v(i)-t);
-
-    output->set_value(0, x);
-    output->set_value(1, t);
   }
+
+ private:
+  std::vector<double> work_;
 };
 REGISTER_EPIGRAPH_OPERATOR(MAX, MaxEpigraph);
@@ -1,28 +1,39 @@
 #include "epsilon/prox/newton.h"
 
+#include <cmath>
+#include <vector>
+
 #include "epsilon/affine/affine.h"
 #include "epsilon/expression/expression_util.h"
 #include "epsilon/prox/prox.h"
 #include "epsilon/vector/vector_util.h"
 
+// Residual of the prox optimality conditions, also returns the derivatives at
+// x in d.
 Eigen::VectorXd ProxResidual(
     const SmoothFunction& f,
     const Eigen::VectorXd& lambda,
     const Eigen::VectorXd& x,
-    const Eigen::VectorXd& v) {
-  return x-v+lambda.asDiagonal()*f.gradf(x);
+    const Eigen::VectorXd& v,
+    SmoothDerivatives* d) {
+  f.eval_derivatives(x, d);
+  return x-v+lambda.cwiseProduct(d->g);
 }
 
+// Residual of the epigraph optimality conditions, also returns the derivatives
+// at x in d.
 Eigen::VectorXd EpigraphResidual(
     const SmoothFunction& f,
     double lam,
     const Eigen::VectorXd& x, double t,
-    const Eigen::VectorXd& v, double s) {
+    const Eigen::VectorXd& v, double s,
+    SmoothDerivatives* d) {
   int n = x.rows();
   VectorXd r(x.rows()+2);
-  r.head(n) = x-v+lam*f.gradf(x);
+  f.eval_derivatives(x, d);
+  r.head(n) = x-v+lam*d->g;
   r(n) = t-s-lam;
-  r(n+1) = f.eval(x)-t;
+  r(n+1) = d->f-t;
   return r;
 }
 
@@ -44,21 +55,209 @@ Eigen::VectorXd SolveArrowheadSystem(
   return dinv_b + 1/rho * y.dot(b) * y;
 }
 
+// Residual of the prox optimality condition for a single coordinate of a
+// separable function, x is projected to the feasible set and the diagonal of
+// the Hessian there is returned in h.
+double CoordinateProxResidual(
+    const ElemwiseSmoothFunction& f,
+    double lambda,
+    double v,
+    double* x,
+    double* h) {
+  Eigen::VectorXd xi = f.proj_feasible(Eigen::VectorXd::Constant(1, *x));
+  Eigen::VectorXd g, hi;
+  f.derivatives(xi, nullptr, &g, &hi);
+  *x = xi(0);
+  *h = hi(0);
+  return xi(0) - v + lambda*g(0);
+}
+
+// Solves x + lambda*f'(x) = v for a single coordinate by bisection, which only
+// relies on the residual being nondecreasing in x as f is convex. Used when
+// the Newton line search stalls, returns whether the residual is below eps.
+bool BisectCoordinateProx(
+    const ElemwiseSmoothFunction& f,
+    double lambda,
+    double v,
+    double eps,
+    double* x,
+    double* r,
+    double* h) {
+  // Step away from x until the residual changes sign
+  double lo = *x, hi = *x, r_lo = *r, r_hi = *r, h_unused;
+  double step = std::max(std::abs(*r), 1.);
+  for (int iter = 0; r_lo > 0 || r_hi < 0; iter++, step *= 2) {
+    if (iter == 100)
+      return false;
+    double& y = r_lo > 0 ? lo : hi;
+    double& r_y = r_lo > 0 ? r_lo : r_hi;
+    double ny = r_lo > 0 ? y - step : y + step;
+    r_y = CoordinateProxResidual(f, lambda, v, &ny, &h_unused);
+    if (ny == y) {
+      // At the boundary of the feasible set
+      return false;
+    }
+    y = ny;
+  }
+
+  for (int iter = 0; iter < 200; iter++) {
+    double mid = lo + (hi - lo)/2;
+    if (mid <= lo || mid >= hi)
+      break;
+    *x = mid;
+    *r = CoordinateProxResidual(f, lambda, v, x, h);
+    if (std::abs(*r) < eps)
+      return true;
+    if (*r > 0) {
+      hi = mid;
+    } else {
+      lo = mid;
+    }
+  }
+  return false;
+}
+
+Eigen::VectorXd ApplySeparableNewtonProx(
+    const ElemwiseSmoothFunction& f,
+    const Eigen::VectorXd& lambda,
+    const Eigen::VectorXd& v) {
+  const int n = v.rows();
+  // Same overall tolerance on ||r||_2 as the non-separable version
+  const double eps = std::max(1e-12, 1e-10/std::sqrt(n));
+  const double beta = 0.001;
+  const double gamma = 0.5;
+
+  // The gradient and Hessian are evaluated together at each point so that
+  // the Newton step reuses the Hessian from the line search.
+  Eigen::VectorXd x = f.proj_feasible(f.prox_initial_guess(lambda, v));
+  Eigen::VectorXd r, h;
+  f.derivatives(x, nullptr, &r, &h);
+  r = x - v + lambda.cwiseProduct(r);
+
+  // Working set of coordinates which have not yet converged
+  std::vector<int> active;
+  active.reserve(n);
+  for (int i = 0; i < n; i++) {
+    if (std::abs(r(i)) >= eps)
+      active.push_back(i);
+  }
+
+  int iter = 0;
+  const int MAX_ITER = 100;
+  Eigen::VectorXd x_a, v_a, lambda_a, r_a, h_a, dx_a, theta_a, nx_a, nr_a, nh_a;
+  std::vector<int> search;
+  std::vector<bool> stalled_a;
+  int num_stalled = 0;
+  for (; iter < MAX_ITER && !active.empty(); iter++) {
+    const int k = active.size();
+    x_a.resize(k);
+    v_a.resize(k);
+    lambda_a.resize(k);
+    r_a.resize(k);
+    h_a.resize(k);
+    for (int j = 0; j < k; j++) {
+      const int i = active[j];
+      x_a(j) = x(i);
+      v_a(j) = v(i);
+      lambda_a(j) = lambda(i);
+      r_a(j) = r(i);
+      h_a(j) = h(i);
+    }
+    VLOG(3) << "Iter " << iter << ", " << k << " active coordinates";
+
+    // Newton step, (1 + lambda_i*f_i''(x_i))^{-1} r_i
+    dx_a = r_a.array() / (1 + lambda_a.array()*h_a.array());
+
+    // Backtracking line search, independently for each coordinate
+    theta_a = Eigen::VectorXd::Ones(k);
+    stalled_a.assign(k, false);
+    search.resize(k);
+    for (int j = 0; j < k; j++)
+      search[j] = j;
+    while (!search.empty()) {
+      const int m = search.size();
+      nx_a.resize(m);
+      for (int l = 0; l < m; l++) {
+        const int j = search[l];
+        nx_a(l) = x_a(j) - theta_a(j)*dx_a(j);
+      }
+      nx_a = f.proj_feasible(nx_a);
+      f.derivatives(nx_a, nullptr, &nr_a, &nh_a);
+
+      int m_next = 0;
+      for (int l = 0; l < m; l++) {
+        const int j = search[l];
+        nr_a(l) = nx_a(l) - v_a(j) + lambda_a(j)*nr_a(l);
+        if (std::abs(nr_a(l)) <= (1-beta*theta_a(j))*std::abs(r_a(j))) {
+          x_a(j) = nx_a(l);
+          r_a(j) = nr_a(l);
+          h_a(j) = nh_a(l);
+        } else if ((theta_a(j) *= gamma) > eps) {
+          search[m_next++] = j;
+        } else {
+          // Line search failed, e.g. as the Hessian is inaccurate, fall back
+          // to bisection for this coordinate. If that also fails the
+          // coordinate has stalled and is dropped from the working set
+          // without having converged.
+          VLOG(1) << "Separable Newton line search failed for coordinate "
+                  << active[j] << ", r = " << r_a(j);
+          if (!BisectCoordinateProx(f, lambda_a(j), v_a(j), eps,
+                                    &x_a(j), &r_a(j), &h_a(j))) {
+            VLOG(1) << "Bisection failed for coordinate " << active[j]
+                    << ", r = " << r_a(j);
+            stalled_a[j] = true;
+            num_stalled++;
+          }
+        }
+      }
+      search.resize(m_next);
+    }
+
+    // Write back and drop converged and stalled coordinates
+    int k_next = 0;
+    for (int j = 0; j < k; j++) {
+      const int i = active[j];
+      x(i) = x_a(j);
+      r(i) = r_a(j);
+      h(i) = h_a(j);
+      if (!stalled_a[j] && std::abs(r_a(j)) >= eps)
+        active[k_next++] = i;
+    }
+    active.resize(k_next);
+  }
+
+  if (active.empty() && num_stalled == 0) {
+    VLOG(2) << "Using " << iter << " separable Newton iterations.\n";
+  } else {
+    VLOG(1) << "Separable Newton won't converge for prox, "
+            << active.size() + num_stalled << " coordinates remaining, "
+            << num_stalled << " stalled\n";
+  }
+  return x;
+}
+
 Eigen::VectorXd ApplyNewtonProx(
     const SmoothFunction& f,
     const Eigen::VectorXd& lambda,
     const Eigen::VectorXd& v) {
+  const ElemwiseSmoothFunction* elemwise_f =
+      dynamic_cast<const ElemwiseSmoothFunction*>(&f);
+  if (elemwise_f)
+    return ApplySeparableNewtonProx(*elemwise_f, lambda, v);
+
   int n = v.rows();
   double eps = std::max(1e-12, 1e-10/n);
 
-  // init
+  // init, the residual and derivatives of the accepted point are kept from
+  // the line search
   Eigen::VectorXd x = f.proj_feasible(v);
+  SmoothDerivatives d, nd;
+  Eigen::VectorXd gx = ProxResidual(f, lambda, x, v, &d);
 
   int iter = 0;
   int MAX_ITER = 100;
   for(; iter < MAX_ITER; iter++) {
-    Eigen::VectorXd gx = ProxResidual(f, lambda, x, v);
-    Eigen::VectorXd dx = f.hess_inv(lambda, x, gx);
+    Eigen::VectorXd dx = f.hess_inv_derivatives(lambda, x, d, gx);
     VLOG(3) << "Iter " << iter << " gx: " << VectorDebugString(gx);
 
     // line search
@@ -69,9 +268,12 @@ Eigen::VectorXd ApplyNewtonProx(
     while(theta > eps) {
       Eigen::VectorXd nx = x - theta * dx;
       nx = f.proj_feasible(nx);
-      double nx_res = ProxResidual(f, lambda, nx, v).norm();
+      Eigen::VectorXd ngx = ProxResidual(f, lambda, nx, v, &nd);
+      double nx_res = ngx.norm();
       if(nx_res <= (1-beta*theta)*x_res) {
         x = nx;
+        std::swap(d, nd);
+        gx = ngx;
         x_res = nx_res;
         break;
       }
@@ -106,12 +308,25 @@ void NewtonProx::ApplyVector(
           *f_, input.lambda_vec(), input.value_vec(0)));
 }
 
-void NewtonEpigraph::ApplyVector(
+void NewtonProx::ApplyColumns(
     const VectorProxInput& input,
+    int begin, int end,
     VectorProxOutput* output) {
-  const SmoothFunction& f = *f_;
-  const Eigen::VectorXd& v = input.value_vec(0);
-  const double s =  input.value(1);
+  const Eigen::MatrixXd& V = input.value_mat(0);
+  Eigen::MatrixXd* X = output->mutable_value_mat(0);
+  const Eigen::VectorXd lambda = Eigen::VectorXd::Constant(
+      V.rows(), input.lambda());
+  for (int j = begin; j < end; j++)
+    X->col(j) = ApplyNewtonProx(*f_, lambda, V.col(j));
+}
+
+// Projects (v, s) onto the epigraph of f, writing the result to (x_out, t_out).
+void ApplyNewtonEpigraph(
+    const SmoothFunction& f,
+    const Eigen::VectorXd& v,
+    double s,
+    Eigen::VectorXd* x_out,
+    double* t_out) {
   const int n = v.rows();
   const double eps = std::max(1e-12, 1e-10/n);
 
@@ -120,26 +335,29 @@ void NewtonEpigraph::ApplyVector(
 
   // easy case
   if (feasible_dist < eps && f.eval(x) <= s) {
-    output->set_value(0, v);
-    output->set_value(1, s);
+    *x_out = v;
+    *t_out = s;
     return;
   }
 
-  // init
+  // init, the residual and derivatives of the accepted point are kept from
+  // the line search
   double t = s;
   double lam = 1;
+  SmoothDerivatives d, nd;
+  Eigen::VectorXd g = EpigraphResidual(f, lam, x, t, v, s, &d);
 
   int iter = 0;
   int MAX_ITER = 100;
   for(; iter < MAX_ITER; iter++) {
-    Eigen::VectorXd g = EpigraphResidual(f, lam, x, t, v, s);
     VLOG(2) << "Iter " << iter << "\n"
             << " lam: " << lam << "\n"
             << " x: " << VectorDebugString(x) << "\n"
             << " g: " << VectorDebugString(g);
 
     // construct arrowhead hessian matrix from newton step
-    Eigen::VectorXd nt_step = f.hess_inv(lam, x, g.head(n));
+    Eigen::VectorXd nt_step = f.hess_inv_derivatives(
+        Eigen::VectorXd::Constant(n, lam), x, d, g.head(n));
     double nt_res = g.head(n).dot(nt_step);
     Eigen::VectorXd step(n+2);
     double scale = (-nt_res+g(n)+g(n+1))/(nt_res+1);
@@ -162,12 +380,15 @@ void NewtonEpigraph::ApplyVector(
       double nlam = lam - theta*step(n+1);
       if(nlam < eps)
               nlam = eps;
-      double nx_res = EpigraphResidual(f, nlam, nx, nt, v, s).norm();
+      Eigen::VectorXd ng = EpigraphResidual(f, nlam, nx, nt, v, s, &nd);
+      double nx_res = ng.norm();
       VLOG(2) << "x_res = " << x_res << ", nx_res = " << nx_res << "\n";
       if(nx_res <= (1-beta*theta)*x_res) {
         x = nx;
         t = nt;
         lam = nlam;
+        g = ng;
+        std::swap(d, nd);
         x_res = nx_res;
         break;
       }
@@ -185,10 +406,35 @@ void NewtonEpigraph::ApplyVector(
     }
   }
 
+  *x_out = x;
+  *t_out = t;
+}
+
+void NewtonEpigraph::ApplyVector(
+    const VectorProxInput& input,
+    VectorProxOutput* output) {
+  Eigen::VectorXd x;
+  double t;
+  ApplyNewtonEpigraph(*f_, input.value_vec(0), input.value(1), &x, &t);
   output->set_value(0, x);
   output->set_value(1, t);
 }
 
+void NewtonEpigraph::ApplyColumns(
+    const VectorProxInput& input,
+    int begin, int end,
+    VectorProxOutput* output) {
+  const Eigen::MatrixXd& V = input.value_mat(0);
+  const Eigen::MatrixXd& S = input.value_mat(1);
+  Eigen::MatrixXd* X = output->mutable_value_mat(0);
+  Eigen::MatrixXd* T = output->mutable_value_mat(1);
+  Eigen::VectorXd x;
+  for (int j = begin; j < end; j++) {
+    ApplyNewtonEpigraph(*f_, V.col(j), S(0,j), &x, &(*T)(0,j));
+    X->col(j) = x;
+  }
+}
+
 void ImplicitNewtonEpigraph::ApplyVector(
     const VectorProxInput& input,
     VectorProxOutput* output) {
@@ -212,9 +458,11 @@ void ImplicitNewtonEpigraph::ApplyVector(
   for(; iter < max_iter; iter++) {
     x = ApplyNewtonProx(*f_, lam, v);
 
-    Eigen::VectorXd gx = f.gradf(x);
-    double glam = f.eval(x) - lam - s;
-    double hlam = -(f.hess_inv(lam, x, gx).dot(gx)) - 1;
+    SmoothDerivatives d;
+    f.eval_derivatives(x, &d);
+    double glam = d.f - lam - s;
+    double hlam = -(f.hess_inv_derivatives(
+        Eigen::VectorXd::Constant(x.rows(), lam), x, d, d.g).dot(d.g)) - 1;
     VLOG(2) << "glam = " << glam << ", hlam = " << hlam << "\n";
 
     res = std::abs(glam);
@@ -321,3 +569,15 @@ double LargestRealCubicRoot(double b, double c, double d) {
 	VLOG(2) << "Cubic iter = " << iter << ", f = " << m*m*m+b*m*m+c*m+d << "\n";
 	return m;
 }
+
+// Uses the approximation from Winitzki (2003), accurate to within a few percent
+// which is sufficient for initializing Newton, and the asymptotic expansion
+// for large z to avoid overflow.
+double LambertWApprox(double log_z) {
+  if (log_z > 20) {
+    const double L2 = std::log(log_z);
+    return log_z - L2 + L2/log_z;
+  }
+  const double a = std::log1p(std::exp(log_z));
+  return a*(1 - std::log1p(a)/(2 + a));
+}
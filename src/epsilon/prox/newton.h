@@ -3,6 +3,14 @@
 
 #include "epsilon/prox/vector_prox.h"
 
+// Value and derivatives of a SmoothFunction at a point, computed together by
+// eval_derivatives(). For elementwise functions h is the diagonal of the
+// Hessian, otherwise it is unused.
+struct SmoothDerivatives {
+  double f;
+  Eigen::VectorXd g, h;
+};
+
 class SmoothFunction {
  public:
   virtual double eval(const Eigen::VectorXd& x) const = 0;
@@ -18,17 +26,84 @@ class SmoothFunction {
   virtual Eigen::VectorXd proj_feasible(const Eigen::VectorXd& x) const {
     return x;
   }
+
+  // The derivatives at x together, and hess_inv() given d computed at x.
+  // Overriden by functions which share terms such as exponentials between
+  // these, the Newton methods below evaluate each point only once.
+  virtual void eval_derivatives(
+      const Eigen::VectorXd& x, SmoothDerivatives* d) const {
+    d->f = eval(x);
+    d->g = gradf(x);
+  }
+  virtual Eigen::VectorXd hess_inv_derivatives(const Eigen::VectorXd& lambda,
+      const Eigen::VectorXd& x, const SmoothDerivatives& d,
+      const Eigen::VectorXd& v) const {
+    return hess_inv(lambda, x, v);
+  }
 };
 
+// Separable function f(x) = \sum_i f_i(x_i), gradf(), hessf() and
+// proj_feasible() must operate elementwise so that they can be evaluated on any
+// subset of the coordinates.
 class ElemwiseSmoothFunction : public SmoothFunction {
  public:
   virtual Eigen::VectorXd hessf(const Eigen::VectorXd& x) const = 0;
+  // Starting point for solving x + lambda*f'(x) = v, overriden with closed
+  // forms or approximations where available.
+  virtual Eigen::VectorXd prox_initial_guess(
+      const Eigen::VectorXd& lambda, const Eigen::VectorXd& v) const {
+    return proj_feasible(v);
+  }
   virtual Eigen::VectorXd hess_inv(const Eigen::VectorXd& lambda,
       const Eigen::VectorXd& x, const Eigen::VectorXd& v) const override {
     int n = x.rows();
     Eigen::VectorXd hx = Eigen::VectorXd::Constant(n, 1.) + lambda.asDiagonal()*hessf(x);
     return (v.array() / hx.array()).matrix();
   }
+
+  // Computes those of f(x), the gradient and the diagonal of the Hessian
+  // which are non-null.
+  virtual void derivatives(
+      const Eigen::VectorXd& x,
+      double* f, Eigen::VectorXd* g, Eigen::VectorXd* h) const {
+    if (f) *f = eval(x);
+    if (g) *g = gradf(x);
+    if (h) *h = hessf(x);
+  }
+  void eval_derivatives(
+      const Eigen::VectorXd& x, SmoothDerivatives* d) const override {
+    derivatives(x, &d->f, &d->g, &d->h);
+  }
+  Eigen::VectorXd hess_inv_derivatives(const Eigen::VectorXd& lambda,
+      const Eigen::VectorXd& x, const SmoothDerivatives& d,
+      const Eigen::VectorXd& v) const override {
+    return (v.array() / (1 + lambda.array()*d.h.array())).matrix();
+  }
+};
+
+// Elementwise function implemented by a single kernel over Eigen arrays,
+// derivatives(), which computes the value, gradient and Hessian diagonal in
+// one pass with the transcendental terms shared between them.
+class FusedSmoothFunction : public ElemwiseSmoothFunction {
+ public:
+  double eval(const Eigen::VectorXd& x) const final {
+    double f;
+    derivatives(x, &f, nullptr, nullptr);
+    return f;
+  }
+  Eigen::VectorXd gradf(const Eigen::VectorXd& x) const final {
+    Eigen::VectorXd g;
+    derivatives(x, nullptr, &g, nullptr);
+    return g;
+  }
+  Eigen::VectorXd hessf(const Eigen::VectorXd& x) const final {
+    Eigen::VectorXd h;
+    derivatives(x, nullptr, nullptr, &h);
+    return h;
+  }
+  void derivatives(
+      const Eigen::VectorXd& x,
+      double* f, Eigen::VectorXd* g, Eigen::VectorXd* h) const override = 0;
 };
 
 // TODO(mwytock): Mark these final and have the registration mechanism accept a
@@ -41,6 +116,11 @@ protected:
   void ApplyVector(
       const VectorProxInput& input,
       VectorProxOutput* output) override;
+  bool batched() const override { return true; }
+  void ApplyColumns(
+      const VectorProxInput& input,
+      int begin, int end,
+      VectorProxOutput* output) override;
 
 private:
   std::unique_ptr<SmoothFunction> f_;
@@ -54,6 +134,11 @@ protected:
   void ApplyVector(
       const VectorProxInput& input,
       VectorProxOutput* output) override;
+  bool batched() const override { return true; }
+  void ApplyColumns(
+      const VectorProxInput& input,
+      int begin, int end,
+      VectorProxOutput* output) override;
 
 private:
   std::unique_ptr<SmoothFunction> f_;
@@ -90,6 +175,24 @@ class BisectionEpigraph : public VectorProx {
   std::unique_ptr<VectorProx> prox_;
 };
 
+// Computes argmin_x f(x) + 1/2||x - v||_{diag(lambda)^{-1}}^2 with damped
+// Newton, elementwise functions are dispatched to ApplySeparableNewtonProx().
+Eigen::VectorXd ApplyNewtonProx(
+    const SmoothFunction& f,
+    const Eigen::VectorXd& lambda,
+    const Eigen::VectorXd& v);
+
+// Coordinate-wise Newton, each coordinate has its own line search and is
+// dropped from the working set once it has converged. Coordinates whose line
+// search stalls are solved by bisection instead.
+Eigen::VectorXd ApplySeparableNewtonProx(
+    const ElemwiseSmoothFunction& f,
+    const Eigen::VectorXd& lambda,
+    const Eigen::VectorXd& v);
+
 double LargestRealCubicRoot(double b, double c, double d);
 
+// Approximates the Lambert W function W(z), z >= 0, given log(z).
+double LambertWApprox(double log_z);
+
 #endif  // EPSILON_PROX_NEWTON_H
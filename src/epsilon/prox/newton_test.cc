@@ -0,0 +1,131 @@
+
+#include <gtest/gtest.h>
+
+#include "epsilon/prox/newton.h"
+#include "epsilon/prox/sum_logistic.h"
+#include "epsilon/vector/vector_testutil.h"
+
+// f(x) = \sum_i exp(x_i), no closed form initial guess so that Newton starts
+// from v
+class TestExp final : public ElemwiseSmoothFunction {
+ public:
+  double eval(const Eigen::VectorXd& x) const override {
+    return x.array().exp().sum();
+  }
+  Eigen::VectorXd gradf(const Eigen::VectorXd& x) const override {
+    return x.array().exp();
+  }
+  Eigen::VectorXd hessf(const Eigen::VectorXd& x) const override {
+    return x.array().exp();
+  }
+};
+
+// f(x) = \sum_i 1/x_i, x > 0
+class TestInvPos final : public ElemwiseSmoothFunction {
+ public:
+  double eval(const Eigen::VectorXd& x) const override {
+    return x.cwiseInverse().sum();
+  }
+  Eigen::VectorXd gradf(const Eigen::VectorXd& x) const override {
+    return -x.array().square().inverse();
+  }
+  Eigen::VectorXd hessf(const Eigen::VectorXd& x) const override {
+    return 2*x.array().cube().inverse();
+  }
+  Eigen::VectorXd proj_feasible(const Eigen::VectorXd& x) const override {
+    return x.cwiseMax(1e-6);
+  }
+};
+
+// f(x) = \sum_i exp(x_i) with the sign of the Hessian flipped, so that the
+// Newton step is an ascent direction and the line search stalls
+class TestExpWrongHessian final : public ElemwiseSmoothFunction {
+ public:
+  double eval(const Eigen::VectorXd& x) const override {
+    return x.array().exp().sum();
+  }
+  Eigen::VectorXd gradf(const Eigen::VectorXd& x) const override {
+    return x.array().exp();
+  }
+  Eigen::VectorXd hessf(const Eigen::VectorXd& x) const override {
+    return -1e6*x.array().exp();
+  }
+};
+
+class NewtonTest : public testing::Test {
+ protected:
+  NewtonTest() {
+    srand(0);
+    v = 5*Eigen::VectorXd::Random(20);
+    lambda = Eigen::VectorXd::Random(20).cwiseAbs();
+    lambda(0) = 0;
+    lambda(1) = 10;
+  }
+
+  void ExpectOptimal(const SmoothFunction& f, const Eigen::VectorXd& x) {
+    EXPECT_TRUE(VectorEquals(
+        Eigen::VectorXd::Zero(v.rows()),
+        x - v + lambda.cwiseProduct(f.gradf(x)),
+        1e-8));
+  }
+
+  Eigen::VectorXd v, lambda;
+};
+
+TEST_F(NewtonTest, SeparableExp) {
+  TestExp f;
+  ExpectOptimal(f, ApplySeparableNewtonProx(f, lambda, v));
+}
+
+TEST_F(NewtonTest, SeparableInvPos) {
+  // Constrained to x > 0, so lambda = 0 is only optimal for v > 0
+  TestInvPos f;
+  v = v.tail(19).eval();
+  lambda = lambda.tail(19).eval();
+  ExpectOptimal(f, ApplySeparableNewtonProx(f, lambda, v));
+}
+
+TEST_F(NewtonTest, SeparableLineSearchStalls) {
+  TestExpWrongHessian f;
+  ExpectOptimal(f, ApplySeparableNewtonProx(f, lambda, v));
+}
+
+TEST_F(NewtonTest, SeparableFused) {
+  Logistic f;
+  SmoothDerivatives d;
+  f.eval_derivatives(v, &d);
+  EXPECT_NEAR(f.eval(v), d.f, 1e-12);
+  EXPECT_TRUE(VectorEquals(f.gradf(v), d.g, 1e-12));
+  EXPECT_TRUE(VectorEquals(f.hessf(v), d.h, 1e-12));
+  EXPECT_TRUE(VectorEquals(
+      f.hess_inv(lambda, v, d.g), f.hess_inv_derivatives(lambda, v, d, d.g),
+      1e-12));
+  ExpectOptimal(f, ApplySeparableNewtonProx(f, lambda, v));
+}
+
+TEST(Logistic, LargeArguments) {
+  // Reference computed directly in extended precision, where exp(800) is
+  // representable
+  Eigen::VectorXd x(6);
+  x << -800, -40, -1, 0, 40, 800;
+  Logistic f;
+  SmoothDerivatives d;
+  f.eval_derivatives(x, &d);
+
+  long double f0 = 0;
+  for (int i = 0; i < x.rows(); i++) {
+    const long double exp_xi = expl(x(i));
+    f0 += log1pl(exp_xi);
+    EXPECT_NEAR(exp_xi/(1 + exp_xi), d.g(i), 1e-15);
+    EXPECT_DOUBLE_EQ(static_cast<double>(exp_xi/((1 + exp_xi)*(1 + exp_xi))),
+                     d.h(i));
+  }
+  EXPECT_DOUBLE_EQ(static_cast<double>(f0), d.f);
+}
+
+TEST_F(NewtonTest, LambertW) {
+  for (double z : {1e-8, 0.5, 1., 10., 1e6, 1e30}) {
+    double w = LambertWApprox(std::log(z));
+    EXPECT_NEAR(z, w*std::exp(w), 0.1*z);
+  }
+}
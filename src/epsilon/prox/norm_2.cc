@@ -15,5 +15,19 @@ protected:
       output->set_value(0, Eigen::VectorXd::Zero(v.rows()));
     }
   }
+
+  bool batched() const override { return true; }
+  void ApplyColumns(
+      const VectorProxInput& input,
+      int begin, int end,
+      VectorProxOutput* output) override {
+    const double lambda = input.lambda();
+    const Eigen::MatrixXd& V = input.value_mat(0);
+    Eigen::MatrixXd* X = output->mutable_value_mat(0);
+    for (int j = begin; j < end; j++) {
+      const double v_norm = V.col(j).norm();
+      X->col(j) = std::max(0., 1 - lambda/v_norm)*V.col(j);
+    }
+  }
 };
 REGISTER_PROX_OPERATOR(NORM_2, Norm2Prox);
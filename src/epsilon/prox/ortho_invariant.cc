@@ -4,10 +4,53 @@
 #include "epsilon/prox/ortho_invariant.h"
 #include "epsilon/vector/vector_util.h"
 
+namespace {
+
+// Use the truncated decomposition only for large matrices with a subspace
+// that is a small fraction of the dimension.
+const int kMinTruncatedDim = 100;
+const int kMaxTruncatedFraction = 4;
+
+// Given values d sorted in decreasing order and x = prox(d), returns the
+// number of leading values after which the prox is either identically zero or
+// the identity, indicated by zero_tail.
+int ActiveRank(
+    const Eigen::VectorXd& d, const Eigen::VectorXd& x, bool* zero_tail) {
+  const int n = d.rows();
+  const double eps = 1e-10*std::max(d.lpNorm<Eigen::Infinity>(), 1.);
+  int zero_rank = 0, identity_rank = 0;
+  for (int i = 0; i < n; i++) {
+    if (std::abs(x(i)) > eps)
+      zero_rank = i+1;
+    if (std::abs(x(i) - d(i)) > eps)
+      identity_rank = i+1;
+  }
+  *zero_tail = zero_rank <= identity_rank;
+  return std::min(zero_rank, identity_rank);
+}
+
+// Bound on the magnitude of the eigenvalues of symmetric A other than the
+// leading ones, whose Ritz values are d. The squares of all eigenvalues sum to
+// ||A||_F^2 and each positive Ritz value is at most the corresponding
+// eigenvalue, so these account for part of the sum. Unlike ||A||_F alone, the
+// bound is small when the rest of the spectrum is, e.g. A low rank plus noise.
+double TailBound(const Eigen::MatrixXd& A, const Eigen::VectorXd& d) {
+  return std::sqrt(std::max(
+      A.squaredNorm() - d.cwiseMax(0).squaredNorm(), 0.));
+}
+
+}  // namespace
+
 void OrthoInvariantProx::Init(const ProxOperatorArg& arg) {
   VectorProx::Init(arg);
   m_ = arg.prox_function().arg_size(0).dim(0);
   n_ = arg.prox_function().arg_size(0).dim(1);
+
+  // These prox operators leave all but the largest values either at zero or
+  // unchanged, see ActiveRank().
+  truncate_ = (eigen_prox_type_ == ProxFunction::NORM_1 ||
+               eigen_prox_type_ == ProxFunction::NON_NEGATIVE ||
+               eigen_prox_type_ == ProxFunction::MAX);
 }
 
 void OrthoInvariantProx::ApplyVector(
@@ -20,12 +63,31 @@ void OrthoInvariantProx::ApplyVector(
   }
 
   Eigen::MatrixXd Y = ToMatrix(input.value_vec(0), m_, n_);
+  const double s = epigraph_ ? input.value(1) : 0;
 
-  Eigen::MatrixXd U, V, R;
-  Eigen::VectorXd d;
-  if (add_residual_)
-    R = (Y - Y.transpose()) / 2;
+  Eigen::MatrixXd X;
+  double t = 0;
+  if (!ApplyTruncated(Y, s, &X, &t))
+    ApplyFull(Y, s, &X, &t);
+
+  if (epigraph_) {
+    output->set_value(0, ToVector(X));
+    output->set_value(1, t);
+  } else {
+    if (add_residual_)
+      X += (Y - Y.transpose()) / 2;
+    else if (symmetric_part_)
+      X = (X + X.transpose())/2;
+
+    output->set_value(0, ToVector(X));
+  }
+}
 
+void OrthoInvariantProx::ApplyFull(
+    const Eigen::MatrixXd& Y, double s,
+    Eigen::MatrixXd* X, double* t) {
+  Eigen::MatrixXd U, V;
+  Eigen::VectorXd d;
   if (symmetric_part_) {
     Eigen::SelfAdjointEigenSolver<Eigen::MatrixXd> solver((Y + Y.transpose()) / 2);
     CHECK_EQ(solver.info(), Eigen::Success);
@@ -51,25 +113,76 @@ void OrthoInvariantProx::ApplyVector(
   }
   VLOG(2) << "\nD = " << VectorDebugString(d) << "\n";
 
-  if (epigraph_) {
-    const double s = input.value(1);
+  Eigen::VectorXd x_tilde;
+  ApplyEigen(d, s, &x_tilde, t);
+  *X = U*x_tilde.asDiagonal()*V.transpose();
 
-    Eigen::VectorXd x_tilde;
-    double t;
-    ApplyEigenEpigraph(d, s, &x_tilde, &t);
-    Eigen::MatrixXd X = U*x_tilde.asDiagonal()*V.transpose();
+  if (truncate_) {
+    // Eigen values are in increasing order, reverse for the active rank and
+    // the warm start of the truncated decomposition.
+    bool zero_tail;
+    rank_ = std::max(
+        ActiveRank(d.reverse(), x_tilde.reverse(), &zero_tail), 1);
+    subspace_.WarmStart(V.rowwise().reverse().leftCols(
+        std::min(rank_+1, static_cast<int>(V.cols()))));
+  }
+}
 
-    output->set_value(0, ToVector(X));
-    output->set_value(1, t);
+bool OrthoInvariantProx::ApplyTruncated(
+    const Eigen::MatrixXd& Y, double s,
+    Eigen::MatrixXd* X, double* t) {
+  const int n = std::min(m_, n_);
+  const int k = rank_+1;
+  const int p = 2*k + 5;
+  if (!truncate_ || n < kMinTruncatedDim || p > n/kMaxTruncatedFraction)
+    return false;
+
+  const Eigen::MatrixXd A = symmetric_part_ ? (Y + Y.transpose()) / 2 : Y;
+  if (!subspace_.Compute(A, k, p)) {
+    VLOG(2) << "Truncated decomposition did not converge, k = " << k;
+    return false;
+  }
+
+  // Pad the leading k values with upper and lower bounds for the remaining
+  // ones, if the prox is zero or the identity on these then it does not
+  // depend on the rest of the spectrum.
+  const Eigen::VectorXd& d = subspace_.d();
+  Eigen::VectorXd d_pad(n);
+  d_pad.head(k) = d.head(k);
+  d_pad.tail(n-k).fill(d(k-1));
+  if (symmetric_part_)
+    d_pad(n-1) = std::min(-TailBound(A, d.head(k)), d(k-1));
+  else
+    d_pad(n-1) = 0;
+
+  Eigen::VectorXd x_pad;
+  ApplyEigen(d_pad, s, &x_pad, t);
+
+  bool zero_tail;
+  const int rank = ActiveRank(d_pad, x_pad, &zero_tail);
+  VLOG(2) << "Truncated decomposition, k = " << k << ", rank = " << rank
+          << ", iterations = " << subspace_.iterations();
+  if (rank >= k)
+    return false;
+  rank_ = std::max(rank, 1);
+
+  const Eigen::MatrixXd U = subspace_.U().leftCols(k);
+  const Eigen::MatrixXd V = subspace_.V().leftCols(k);
+  if (zero_tail) {
+    *X = U*x_pad.head(k).asDiagonal()*V.transpose();
   } else {
-    Eigen::VectorXd x_tilde = ApplyEigenProx(d);
-    Eigen::MatrixXd X = U*x_tilde.asDiagonal()*V.transpose();
-    if (add_residual_)
-      X += R;
-    else if (symmetric_part_)
-      X = (X + X.transpose())/2;
+    *X = A + U*(x_pad.head(k) - d.head(k)).asDiagonal()*V.transpose();
+  }
+  return true;
+}
 
-    output->set_value(0, ToVector(X));
+void OrthoInvariantProx::ApplyEigen(
+    const Eigen::VectorXd& d, double s,
+    Eigen::VectorXd* x, double* t) {
+  if (epigraph_) {
+    ApplyEigenEpigraph(d, s, x, t);
+  } else {
+    *x = ApplyEigenProx(d);
   }
 }
 
@@ -2,6 +2,7 @@
 #define EPSILON_PROX_ORTHO_INVARIANT_H
 
 #include "epsilon/prox/vector_prox.h"
+#include "epsilon/vector/subspace_iteration.h"
 
 class OrthoInvariantProx : public VectorProx {
  public:
@@ -14,7 +15,10 @@ class OrthoInvariantProx : public VectorProx {
         symmetric_part_(symmetric_part),
         add_residual_(add_residual),
         epigraph_(epigraph),
-        init_eigen_prox_(false) {}
+        init_eigen_prox_(false),
+        truncate_(false),
+        rank_(1),
+        subspace_(symmetric_part) {}
 
   void Init(const ProxOperatorArg& arg) override;
 
@@ -26,6 +30,16 @@ class OrthoInvariantProx : public VectorProx {
  private:
   void InitEigenProx(double lambda);
 
+  // Computes X with a full decomposition
+  void ApplyFull(const Eigen::MatrixXd& Y, double s,
+                 Eigen::MatrixXd* X, double* t);
+  // Computes X with only the leading part of the spectrum, returns false if
+  // this is not possible.
+  bool ApplyTruncated(const Eigen::MatrixXd& Y, double s,
+                      Eigen::MatrixXd* X, double* t);
+  void ApplyEigen(const Eigen::VectorXd& d, double s,
+                  Eigen::VectorXd* x, double* t);
+
   Eigen::VectorXd ApplyEigenProx(const Eigen::VectorXd& v);
   void ApplyEigenEpigraph(
       const Eigen::VectorXd& v, double s,
@@ -38,6 +52,12 @@ class OrthoInvariantProx : public VectorProx {
   int m_, n_;
   double alpha_;
   std::unique_ptr<ProxOperator> eigen_prox_;
+
+  // Truncated decomposition, rank_ is the number of leading values changed by
+  // the prox in the previous iteration and determines the subspace size.
+  bool truncate_;
+  int rank_;
+  SubspaceIteration subspace_;
 };
 
 #endif  // EPSILON_PROX_ORTHO_INVARIANT_H
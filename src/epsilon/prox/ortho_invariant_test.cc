@@ -0,0 +1,145 @@
+#include <algorithm>
+#include <functional>
+
+#include <gtest/gtest.h>
+
+#include "epsilon/linear/scalar_matrix_impl.h"
+#include "epsilon/prox/prox.h"
+#include "epsilon/vector/vector_testutil.h"
+#include "epsilon/vector/vector_util.h"
+
+// Large enough for OrthoInvariantProx to use the truncated decomposition
+const int kDim = 200;
+
+class OrthoInvariantTest : public testing::Test {
+ protected:
+  OrthoInvariantTest() {
+    srand(0);
+    U_ = RandomOrthogonal(kDim);
+    V_ = RandomOrthogonal(kDim);
+  }
+
+  void Init(ProxFunction::Type type, double lam) {
+    ProxFunction f;
+    f.set_prox_function_type(type);
+    f.set_alpha(lam);
+    f.add_arg_size()->add_dim(kDim);
+    f.mutable_arg_size(0)->add_dim(kDim);
+
+    AffineOperator H, A;
+    H.A(affine::arg_key(0), "x") = linear_map::LinearMap(
+        new linear_map::ScalarMatrixImpl(kDim*kDim, 1));
+    A.A(affine::constraint_key(0), "x") = linear_map::LinearMap(
+        new linear_map::ScalarMatrixImpl(kDim*kDim, 1));
+
+    DataMap data_map;
+    prox_ = CreateProxOperator(type, false);
+    prox_->Init(ProxOperatorArg(f, data_map, H, A));
+  }
+
+  Eigen::MatrixXd Apply(const Eigen::MatrixXd& Y) {
+    BlockVector v;
+    v(affine::constraint_key(0)) = ToVector(Y);
+    return ToMatrix(prox_->Apply(v)("x"), kDim, kDim);
+  }
+
+  Eigen::MatrixXd RandomOrthogonal(int n) {
+    Eigen::HouseholderQR<Eigen::MatrixXd> qr(Eigen::MatrixXd::Random(n, n));
+    return qr.householderQ();
+  }
+
+  // Leading values followed by a tail drawn uniformly from [lo, hi]
+  Eigen::VectorXd Spectrum(
+      const std::vector<double>& head, double lo, double hi) {
+    Eigen::VectorXd d(kDim);
+    const int k = head.size();
+    d.head(k) = Eigen::Map<const Eigen::VectorXd>(head.data(), k);
+    d.tail(kDim-k) = lo + (hi-lo)/2*(
+        Eigen::VectorXd::Random(kDim-k).array() + 1);
+    return d;
+  }
+
+  // Matrices with a given spectrum, the references for each prox follow
+  Eigen::MatrixXd Symmetric(const Eigen::VectorXd& d) {
+    return U_*d.asDiagonal()*U_.transpose();
+  }
+  Eigen::MatrixXd General(const Eigen::VectorXd& d) {
+    return U_*d.asDiagonal()*V_.transpose();
+  }
+
+  std::unique_ptr<ProxOperator> prox_;
+  Eigen::MatrixXd U_, V_;
+};
+
+// Sort-based lam*max(.) prox, as in threshold_test
+Eigen::VectorXd MaxProxSort(const Eigen::VectorXd& v, double lambda) {
+  const int n = v.rows();
+  std::vector<double> y(v.data(), v.data()+n);
+  std::sort(y.begin(), y.end(), std::greater<double>());
+  double t = 0, acc = -lambda, div = 0;
+  for (int i = 0; i < n; i++) {
+    if (y[i]*div < acc)
+      break;
+    acc += y[i];
+    div += 1;
+    t = acc / div;
+  }
+  return v.cwiseMin(t);
+}
+
+// In each test the first call uses the full decomposition which sets the
+// active rank, the second the truncated one warm started from it and the third
+// changes the spectrum so that the active rank grows past the subspace and
+// ApplyTruncated() falls back to the full decomposition.
+
+TEST_F(OrthoInvariantTest, NormNuclear) {
+  const double lam = 1;
+  Init(ProxFunction::NORM_NUCLEAR, lam);
+
+  Eigen::VectorXd d = Spectrum({10, 9, 8}, 0, 0.5);
+  for (int i = 0; i < 2; i++) {
+    EXPECT_TRUE(MatrixEquals(
+        General((d.array() - lam).max(0)), Apply(General(d)), 1e-6));
+    d.tail(kDim-3) *= 0.9;
+  }
+
+  d = Spectrum({10, 9.5, 9, 8.5, 8, 7.5, 7, 6.5, 6, 5.5, 5, 4.5}, 0, 0.5);
+  EXPECT_TRUE(MatrixEquals(
+      General((d.array() - lam).max(0)), Apply(General(d)), 1e-6));
+}
+
+TEST_F(OrthoInvariantTest, LambdaMax) {
+  const double lam = 1.5;
+  Init(ProxFunction::LAMBDA_MAX, lam);
+
+  // The tail is of both signs and left unchanged by the prox
+  Eigen::VectorXd d = Spectrum({10, 9, 8}, -1, 1);
+  for (int i = 0; i < 2; i++) {
+    EXPECT_TRUE(MatrixEquals(
+        Symmetric(MaxProxSort(d, lam)), Apply(Symmetric(d)), 1e-6));
+    d.tail(kDim-3) *= 0.9;
+  }
+
+  d = Spectrum({10, 9.8, 9.6, 9.4, 9.2, 9, 8.8, 8.6, 8.4, 8.2, 8}, -1, 1);
+  EXPECT_TRUE(MatrixEquals(
+      Symmetric(MaxProxSort(d, lam)), Apply(Symmetric(d)), 1e-6));
+}
+
+TEST_F(OrthoInvariantTest, Semidefinite) {
+  Init(ProxFunction::SEMIDEFINITE, 1);
+
+  // Antisymmetric part is passed through unchanged
+  const Eigen::MatrixXd R = Eigen::MatrixXd::Random(kDim, kDim);
+  const Eigen::MatrixXd W = (R - R.transpose())/2;
+
+  Eigen::VectorXd d = Spectrum({5, 4, 3}, -2, -0.1);
+  for (int i = 0; i < 2; i++) {
+    EXPECT_TRUE(MatrixEquals(
+        Symmetric(d.cwiseMax(0)) + W, Apply(Symmetric(d) + W), 1e-6));
+    d.tail(kDim-3) *= 0.9;
+  }
+
+  d = Spectrum({12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 2, 1}, -2, -0.1);
+  EXPECT_TRUE(MatrixEquals(
+      Symmetric(d.cwiseMax(0)) + W, Apply(Symmetric(d) + W), 1e-6));
+}
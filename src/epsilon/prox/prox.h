@@ -7,6 +7,7 @@
 #include "epsilon/affine/affine.h"
 #include "epsilon/expression.pb.h"
 #include "epsilon/expression/var_offset_map.h"
+#include "epsilon/solver_params.pb.h"
 
 class ProxOperatorArg {
  public:
@@ -14,16 +15,20 @@ class ProxOperatorArg {
       const ProxFunction& prox_function,
       const DataMap& data_map,
       const AffineOperator& affine_arg,
-      const AffineOperator& affine_constraint)
+      const AffineOperator& affine_constraint,
+      const SolverParams& params = SolverParams::default_instance())
       : prox_function_(prox_function),
         data_map_(data_map),
         affine_arg_(affine_arg),
-        affine_constraint_(affine_constraint) {}
+        affine_constraint_(affine_constraint),
+        params_(params) {}
 
   const ProxFunction& prox_function() const { return prox_function_; }
   const DataMap& data_map() const { return data_map_; }
   const AffineOperator& affine_arg() const { return affine_arg_; }
   const AffineOperator& affine_constraint() const { return affine_constraint_; }
+  const SolverParams& params() const { return params_; }
+  SolverParams::Precision precision() const { return params_.precision(); }
 
  private:
   // Not owned by us
@@ -31,6 +36,7 @@ class ProxOperatorArg {
   const DataMap& data_map_;
   const AffineOperator& affine_arg_;
   const AffineOperator& affine_constraint_;
+  const SolverParams& params_;
 };
 
 // Abstract interface for proximal operator implementations
@@ -8,29 +8,24 @@
 #include <cmath>
 
 // \sum_i exp(x(i))
-class SumExp final : public ElemwiseSmoothFunction {
+class SumExp final : public FusedSmoothFunction {
 public:
-  double eval(const Eigen::VectorXd &x) const override {
-    int n = x.rows();
-    double sum = 0;
-    for(int i=0; i<n; i++){
-      sum +=  std::exp(x(i));
-    }
-    return sum;
+  void derivatives(
+      const Eigen::VectorXd &x,
+      double* f, Eigen::VectorXd* g, Eigen::VectorXd* h) const override {
+    const Eigen::ArrayXd exp_x = x.array().exp();
+    if (f) *f = exp_x.sum();
+    if (g) *g = exp_x;
+    if (h) *h = exp_x;
   }
-  Eigen::VectorXd gradf(const Eigen::VectorXd &x) const override {
-    int n = x.rows();
-    Eigen::VectorXd g(n);
+  // x + lambda*exp(x) = v has the solution x = v - W(lambda*exp(v))
+  Eigen::VectorXd prox_initial_guess(
+      const Eigen::VectorXd& lambda, const Eigen::VectorXd& v) const override {
+    int n = v.rows();
+    Eigen::VectorXd x(n);
     for(int i=0; i<n; i++)
-      g(i) = std::exp(x(i));
-    return g;
-  }
-  Eigen::VectorXd hessf(const Eigen::VectorXd &x) const override {
-    int n = x.rows();
-    Eigen::VectorXd h(n);
-    for(int i=0; i<n; i++)
-      h(i) = std::exp(x(i));
-    return h;
+      x(i) = v(i) - LambertWApprox(std::log(lambda(i)) + v(i));
+    return x;
   }
 };
 
@@ -8,33 +8,29 @@
 #include <cmath>
 
 // \sum_i 1/(xi)
-class InvPos final : public ElemwiseSmoothFunction {
+class InvPos final : public FusedSmoothFunction {
 public:
-  double eval(const Eigen::VectorXd &x) const override {
-    int n = x.rows();
-    double sum = 0;
-    for(int i=0; i<n; i++){
-      sum += 1/x(i);
-    }
-    return sum;
-  }
-  Eigen::VectorXd gradf(const Eigen::VectorXd &x) const override {
-    int n = x.rows();
-    Eigen::VectorXd g(n);
-    for(int i=0; i<n; i++)
-      g(i) = -1/(x(i)*x(i));
-    return g;
-  }
-  Eigen::VectorXd hessf(const Eigen::VectorXd &x) const override {
-    int n = x.rows();
-    Eigen::VectorXd h(n);
-    for(int i=0; i<n; i++)
-      h(i) = 2/(x(i)*x(i)*x(i));
-    return h;
+  void derivatives(
+      const Eigen::VectorXd &x,
+      double* f, Eigen::VectorXd* g, Eigen::VectorXd* h) const override {
+    const Eigen::ArrayXd inv_x = x.array().inverse();
+    if (f) *f = inv_x.sum();
+    if (g) *g = -inv_x.square();
+    if (h) *h = 2*inv_x.cube();
   }
   Eigen::VectorXd proj_feasible(const Eigen::VectorXd& x) const override {
     return x.cwiseMax(1e-6);
   }
+  // Solution is the positive root of x^3 - v*x^2 - lambda, this is an upper
+  // bound on it from which Newton converges monotonically.
+  Eigen::VectorXd prox_initial_guess(
+      const Eigen::VectorXd& lambda, const Eigen::VectorXd& v) const override {
+    int n = v.rows();
+    Eigen::VectorXd x(n);
+    for(int i=0; i<n; i++)
+      x(i) = std::max(v(i), 0.) + std::cbrt(lambda(i));
+    return x;
+  }
 };
 
 class SumInvPosProx : public NewtonProx {
@@ -1,9 +1,9 @@
 #include "epsilon/affine/affine.h"
 #include "epsilon/expression/expression_util.h"
+#include "epsilon/prox/newton.h"
+#include "epsilon/prox/threshold.h"
 #include "epsilon/prox/vector_prox.h"
 #include "epsilon/vector/vector_util.h"
-#include "epsilon/prox/newton.h"
-#include <cstdlib>
 
 class SumLargestProx : public VectorProx {
  public:
@@ -19,36 +19,10 @@ class SumLargestProx : public VectorProx {
     const double lambda = input.lambda();
     const Eigen::VectorXd& v = input.value_vec(0);
     const int n = v.rows();
-    Eigen::VectorXd y_vec = v;
-    double *y = y_vec.data();
-    sort(y, y+n, std::greater<double>());
 
-    // k *lam = \sum_i (y_i - q)_{0, lam}
-    // q = (#{y_i >= q+lam} lam +\sum_{q <= y_i < q+lam} y_i - k * lam)
-    //     / #{q <= y_i < q+lam}
-    // inside: the window of [q, q+lam)
-    // initialize with nothing inside
-    double q = 0;
-    double acc = - k_*lambda;
-    int inside = 0;
-    int i=0, j=0;
-    for(; i<n and j<n; ) {
-      //VLOG(2) << "acc=" <<  acc << ", yi = " << y[i] << ", yj = " << y[j] << "\n";
-      // yi < q and yj < q+lambda
-      if(y[i]*inside <= acc and (y[j]-lambda)*inside <= acc)
-        break;
-      // front-yi <= rear - yj, where rear-front=lam
-      if(y[i] >= y[j]-lambda) {
-        acc += y[i];
-        inside += 1;
-        i++;
-      } else {
-        acc += -y[j]+lambda;
-        inside -= 1;
-        j++;
-      }
-      q = acc / inside;
-    }
+    // k*lam = \sum_i min(max(v_i - q, 0), lam)
+    //   x_i = v_i - min(max(v_i - q, 0), lam)
+    const double q = SumLargestThreshold(v, lambda, k_, &work_);
     Eigen::VectorXd x(n);
     for(int i=0; i<n; i++) {
       x(i) = v(i) - std::max(0., std::min(lambda, v(i)-q));
@@ -57,24 +31,31 @@ class SumLargestProx : public VectorProx {
     output->set_value(0, x);
   }
 
-  double Eval(const VectorProxOutput* output) override {
-    const Eigen::VectorXd& x = output->value_vec(0);
-    int n = x.rows();
-    double* y = new double[n]; 
-    memcpy(y, x.data(), sizeof(*y)*n);
-    sort(y, y+n, std::greater<double>());
-
-    double sum = 0;
-    for(int i=0; i<k_; i++) {
-      sum += y[i];
+  bool batched() const override { return true; }
+  void ApplyColumns(
+      const VectorProxInput& input,
+      int begin, int end,
+      VectorProxOutput* output) override {
+    const double lambda = input.lambda();
+    const Eigen::MatrixXd& V = input.value_mat(0);
+    Eigen::MatrixXd* X = output->mutable_value_mat(0);
+    const int n = V.rows();
+    std::vector<double> work;
+    for (int j = begin; j < end; j++) {
+      const double q = SumLargestThreshold(V.col(j), lambda, k_, &work);
+      for(int i=0; i<n; i++) {
+        (*X)(i,j) = V(i,j) - std::max(0., std::min(lambda, V(i,j)-q));
+      }
     }
+  }
 
-    delete[] y; 
-    return sum;
+  double Eval(const VectorProxOutput* output) override {
+    return SumLargest(output->value_vec(0), k_, &work_);
   }
 
  private:
   int k_;
+  std::vector<double> work_;
 };
 REGISTER_PROX_OPERATOR(SUM_LARGEST, SumLargestProx);
 
@@ -1,35 +1,30 @@
+#include "epsilon/prox/sum_logistic.h"
+
+#include <cmath>
+
 #include "epsilon/affine/affine.h"
 #include "epsilon/expression/expression_util.h"
 #include "epsilon/prox/prox.h"
-#include "epsilon/prox/newton.h"
 #include "epsilon/vector/vector_util.h"
-#include <cmath>
 
-class Logistic final : public ElemwiseSmoothFunction {
-public:
-  double eval(const Eigen::VectorXd &x) const override {
-    int n = x.rows();
-    double sum = 0;
-    for(int i=0; i<n; i++){
-      sum += std::log(1+std::exp(x(i)));
-    }
-    return sum;
-  }
-  Eigen::VectorXd gradf(const Eigen::VectorXd &x) const override {
-    int n = x.rows();
-    Eigen::VectorXd g(n);
-    for(int i=0; i<n; i++)
-      g(i) = std::exp(x(i)) / (1+std::exp(x(i)));
-    return g;
-  }
-  Eigen::VectorXd hessf(const Eigen::VectorXd &x) const override {
-    int n = x.rows();
-    Eigen::VectorXd h(n);
-    for(int i=0; i<n; i++)
-      h(i) = std::exp(x(i)) / std::pow(1+std::exp(x(i)), 2);
-    return h;
-  }
-};
+void Logistic::derivatives(
+    const Eigen::VectorXd &x,
+    double* f, Eigen::VectorXd* g, Eigen::VectorXd* h) const {
+  const Eigen::ArrayXd e = (-x.array().abs()).exp();
+  if (f) *f = (x.array().max(0) + (1 + e).log()).sum();
+  if (!g && !h)
+    return;
+
+  const Eigen::ArrayXd inv_1pe = (1 + e).inverse();
+  if (g) *g = (x.array() >= 0).select(inv_1pe, e*inv_1pe);
+  if (h) *h = e*inv_1pe.square();
+}
+
+Eigen::VectorXd Logistic::prox_initial_guess(
+    const Eigen::VectorXd& lambda, const Eigen::VectorXd& v) const {
+  Eigen::VectorXd x0 = v - 0.5*lambda;
+  return v - lambda.cwiseProduct(gradf(x0));
+}
 
 class SumLogisticProx final : public NewtonProx {
 public:
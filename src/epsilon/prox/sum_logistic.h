@@ -0,0 +1,18 @@
+#ifndef EPSILON_PROX_SUM_LOGISTIC_H
+#define EPSILON_PROX_SUM_LOGISTIC_H
+
+#include "epsilon/prox/newton.h"
+
+// \sum_i log(1 + exp(x_i)), in terms of e_i = exp(-|x_i|) which cannot
+// overflow
+class Logistic final : public FusedSmoothFunction {
+public:
+  void derivatives(
+      const Eigen::VectorXd &x,
+      double* f, Eigen::VectorXd* g, Eigen::VectorXd* h) const override;
+  // Solution lies in (v-lambda, v), start from one step at the midpoint
+  Eigen::VectorXd prox_initial_guess(
+      const Eigen::VectorXd& lambda, const Eigen::VectorXd& v) const override;
+};
+
+#endif  // EPSILON_PROX_SUM_LOGISTIC_H
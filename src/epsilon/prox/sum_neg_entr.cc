@@ -8,31 +8,33 @@
 #include "epsilon/vector/vector_util.h"
 #include <cmath>
 
-class NegativeEntropy final : public ElemwiseSmoothFunction {
+class NegativeEntropy final : public FusedSmoothFunction {
 public:
-  double eval(const Eigen::VectorXd &x) const override {
-    int n = x.rows();
-    double sum = 0;
-    for(int i=0; i<n; i++){
-      if(x(i) <= 0)
-        continue;
-      sum += x(i)*std::log(x(i));
+  void derivatives(
+      const Eigen::VectorXd &x,
+      double* f, Eigen::VectorXd* g, Eigen::VectorXd* h) const override {
+    if (f || g) {
+      const Eigen::ArrayXd log_x = x.array().log();
+      if (f) *f = (x.array() > 0).select(x.array()*log_x, 0).sum();
+      if (g) *g = 1 + log_x;
     }
-    return sum;
-  }
-  Eigen::VectorXd gradf(const Eigen::VectorXd &x) const override {
-    int n = x.rows();
-    Eigen::VectorXd g(n);
-    for(int i=0; i<n; i++)
-      g(i) = 1+log(x(i));
-    return g;
+    if (h) *h = x.cwiseInverse();
   }
-  Eigen::VectorXd hessf(const Eigen::VectorXd &x) const override {
-    int n = x.rows();
-    Eigen::VectorXd h(n);
-    for(int i=0; i<n; i++)
-      h(i) = 1/x(i);
-    return h;
+  // x + lambda*(1+log(x)) = v has the solution
+  // x = lambda*W(exp((v-lambda)/lambda)/lambda)
+  Eigen::VectorXd prox_initial_guess(
+      const Eigen::VectorXd& lambda, const Eigen::VectorXd& v) const override {
+    int n = v.rows();
+    Eigen::VectorXd x(n);
+    for(int i=0; i<n; i++) {
+      if (lambda(i) <= 0) {
+        x(i) = v(i);
+        continue;
+      }
+      x(i) = lambda(i)*LambertWApprox(
+          (v(i)-lambda(i))/lambda(i) - std::log(lambda(i)));
+    }
+    return x;
   }
 
   Eigen::VectorXd proj_feasible(const Eigen::VectorXd& x) const override {
@@ -23,7 +23,7 @@ class SumSquareProx final : public ProxOperator {
     BlockMatrix M = alpha*(H + H.Transpose()) + (A + A.Transpose())
                     - H.LeftIdentity() - A.LeftIdentity();
     VLOG(2) << "M: " << M.DebugString();
-    chol_.Compute(M);
+    chol_.Compute(M, arg.precision() == SolverParams::SINGLE);
     b_ = -alpha*g;
     var_keys_ = H.col_keys();
   }
@@ -0,0 +1,142 @@
+#include "epsilon/prox/threshold.h"
+
+#include <algorithm>
+#include <functional>
+#include <limits>
+#include <random>
+
+// Pivots are chosen with a generator local to each call, rather than the global
+// state of random(), as these are called concurrently on the columns of
+// batched axis evaluation. This also makes the result independent of the
+// order in which columns are processed.
+typedef std::minstd_rand PivotGenerator;
+
+int RandomIndex(int n, PivotGenerator* rng) {
+  return std::uniform_int_distribution<int>(0, n-1)(*rng);
+}
+
+double MaxThreshold(
+    const Eigen::Ref<const Eigen::VectorXd>& v, double a, double c,
+    std::vector<double>* work) {
+  const int n = v.rows();
+  work->assign(v.data(), v.data()+n);
+  double* y = work->data();
+
+  // Elements known to be above t
+  double acc = 0;
+  int count = 0;
+
+  // Invariant: candidates are y[l..r)
+  PivotGenerator rng;
+  int l = 0, r = n;
+  while (l < r) {
+    const double p = y[l + RandomIndex(r-l, &rng)];
+
+    // 3 way partition into [greater, equal, less]
+    int i = l, j = l, k = r;
+    double greater = 0, equal = 0;
+    while (j < k) {
+      if (y[j] > p) {
+        greater += y[j];
+        std::swap(y[i++], y[j++]);
+      } else if (y[j] == p) {
+        equal += y[j];
+        j++;
+      } else {
+        std::swap(y[j], y[--k]);
+      }
+    }
+
+    // Value of \sum_i (v_i - p)_+ - a*p - c
+    const double g = (acc + greater) - (count + i-l)*p - a*p - c;
+    if (g < 0) {
+      // p > t, all elements >= p are above t
+      acc += greater + equal;
+      count += j-l;
+      l = j;
+    } else {
+      // p <= t, only elements > p can be above t
+      r = i;
+    }
+  }
+
+  if (count + a == 0)
+    return v.maxCoeff();
+  return (acc - c) / (count + a);
+}
+
+double SumLargestThreshold(
+    const Eigen::Ref<const Eigen::VectorXd>& v, double lambda, int k,
+    std::vector<double>* work) {
+  const int n = v.rows();
+  work->assign(v.data(), v.data()+n);
+  double* y = work->data();
+
+  // The function g(q) = \sum_i min(max(v_i - q, 0), lambda) - k*lambda is
+  // piecewise linear and decreasing with breakpoints v_i and v_i - lambda. We
+  // maintain an interval (lo, hi) containing the root, elements with no
+  // breakpoints in this interval have a fixed contribution to g(q).
+  double lo = -std::numeric_limits<double>::infinity();
+  double hi = std::numeric_limits<double>::infinity();
+  int full = 0;      // v_i - lambda >= hi, contributes lambda
+  int partial = 0;   // v_i - lambda <= lo and v_i >= hi, contributes v_i - q
+  double partial_sum = 0;
+
+  // Candidates with a breakpoint in (lo, hi) are y[0..m)
+  int m = n;
+  PivotGenerator rng;
+  while (m > 0) {
+    const double y_p = y[RandomIndex(m, &rng)];
+    double p = y_p;
+    if (y_p - lambda > lo && (y_p >= hi || RandomIndex(2, &rng)))
+      p = y_p - lambda;
+
+    double g = full*lambda + partial_sum - partial*p - k*lambda;
+    for (int i = 0; i < m; i++)
+      g += std::min(std::max(y[i] - p, 0.), lambda);
+
+    if (g > 0) {
+      lo = p;
+    } else if (g < 0) {
+      hi = p;
+    } else {
+      return p;
+    }
+
+    // Remove elements with no breakpoints left in (lo, hi)
+    for (int i = 0; i < m; ) {
+      if (y[i] - lambda >= hi) {
+        full++;
+      } else if (y[i] <= lo) {
+        // contributes zero
+      } else if (y[i] - lambda <= lo && y[i] >= hi) {
+        partial++;
+        partial_sum += y[i];
+      } else {
+        i++;
+        continue;
+      }
+      std::swap(y[i], y[--m]);
+    }
+  }
+
+  // g(q) is linear on (lo, hi)
+  if (partial > 0)
+    return (full*lambda + partial_sum - k*lambda) / partial;
+  return lo > -std::numeric_limits<double>::infinity() ? lo : hi;
+}
+
+double SumLargest(
+    const Eigen::Ref<const Eigen::VectorXd>& v, int k,
+    std::vector<double>* work) {
+  const int n = v.rows();
+  work->assign(v.data(), v.data()+n);
+  if (k < n)
+    std::nth_element(
+        work->begin(), work->begin()+k, work->end(), std::greater<double>());
+
+  double sum = 0;
+  for (int i = 0; i < std::min(k, n); i++)
+    sum += (*work)[i];
+  return sum;
+}
@@ -0,0 +1,29 @@
+// Threshold finding for projections onto simplex-like sets in expected linear
+// time, using randomized pivoting rather than sorting the input.
+
+#ifndef EPSILON_PROX_THRESHOLD_H
+#define EPSILON_PROX_THRESHOLD_H
+
+#include <vector>
+
+#include <Eigen/Dense>
+
+// Finds t such that \sum_i (v_i - t)_+ = c + a*t where a >= 0. If no element
+// of v is above t, i.e. c <= -a*max_i v_i, returns max_i v_i. The vector work
+// is used as scratch space and may be reused across calls.
+double MaxThreshold(
+    const Eigen::Ref<const Eigen::VectorXd>& v, double a, double c,
+    std::vector<double>* work);
+
+// Finds q such that \sum_i min(max(v_i - q, 0), lambda) = k*lambda. If
+// multiple q satisfy this, they all give the same value of the clipped terms.
+double SumLargestThreshold(
+    const Eigen::Ref<const Eigen::VectorXd>& v, double lambda, int k,
+    std::vector<double>* work);
+
+// Returns the sum of the k largest elements of v
+double SumLargest(
+    const Eigen::Ref<const Eigen::VectorXd>& v, int k,
+    std::vector<double>* work);
+
+#endif  // EPSILON_PROX_THRESHOLD_H
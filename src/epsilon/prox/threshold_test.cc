@@ -0,0 +1,164 @@
+
+#include <algorithm>
+#include <functional>
+#include <thread>
+
+#include <gtest/gtest.h>
+
+#include "epsilon/prox/threshold.h"
+#include "epsilon/vector/vector_testutil.h"
+
+// Sort-based reference implementations. Unlike the scan previously used by
+// SumLargestProx, SumLargestProxSort() continues once the upper end of the
+// window reaches the end of the array, stopping there is incorrect for k close
+// to n.
+Eigen::VectorXd MaxProxSort(const Eigen::VectorXd& v, double lambda) {
+  const int n = v.rows();
+  std::vector<double> y(v.data(), v.data()+n);
+  std::sort(y.begin(), y.end(), std::greater<double>());
+  double t = 0, acc = -lambda, div = 0;
+  for (int i = 0; i < n; i++) {
+    if (y[i]*div < acc)
+      break;
+    acc += y[i];
+    div += 1;
+    t = acc / div;
+  }
+  return v.cwiseMin(t);
+}
+
+double MaxEpigraphSort(const Eigen::VectorXd& v, double s) {
+  const int n = v.rows();
+  std::vector<double> y(v.data(), v.data()+n);
+  std::sort(y.begin(), y.end(), std::greater<double>());
+  if (s >= y[0])
+    return s;
+  double delta = 0, acc = 0, div = 1;
+  for (int i = 0; i < n; i++) {
+    if (div*(y[i]-s) < acc)
+      break;
+    acc += y[i]-s;
+    div += 1;
+    delta = acc/div;
+  }
+  return s + delta;
+}
+
+Eigen::VectorXd SumLargestProxSort(
+    const Eigen::VectorXd& v, double lambda, int k) {
+  const int n = v.rows();
+  std::vector<double> y(v.data(), v.data()+n);
+  std::sort(y.begin(), y.end(), std::greater<double>());
+  double q = 0, acc = -k*lambda;
+  int inside = 0, i = 0, j = 0;
+  while (j < n) {
+    if ((i == n || y[i]*inside <= acc) && (y[j]-lambda)*inside <= acc)
+      break;
+    if (i < n && y[i] >= y[j]-lambda) {
+      acc += y[i];
+      inside += 1;
+      i++;
+    } else {
+      acc += -y[j]+lambda;
+      inside -= 1;
+      j++;
+    }
+    q = acc / inside;
+  }
+  Eigen::VectorXd x(n);
+  for (int i = 0; i < n; i++)
+    x(i) = v(i) - std::max(0., std::min(lambda, v(i)-q));
+  return x;
+}
+
+Eigen::VectorXd SumLargestProx(
+    const Eigen::VectorXd& v, double lambda, int k, std::vector<double>* work) {
+  const double q = SumLargestThreshold(v, lambda, k, work);
+  Eigen::VectorXd x(v.rows());
+  for (int i = 0; i < v.rows(); i++)
+    x(i) = v(i) - std::max(0., std::min(lambda, v(i)-q));
+  return x;
+}
+
+class ThresholdTest : public testing::Test {
+ protected:
+  ThresholdTest() {
+    srand(0);
+  }
+
+  // Random vector, optionally with many ties
+  Eigen::VectorXd RandomVector(int n, bool ties) {
+    Eigen::VectorXd v = Eigen::VectorXd::Random(n);
+    if (ties) {
+      for (int i = 0; i < n; i++)
+        v(i) = std::round(4*v(i));
+    }
+    return v;
+  }
+
+  std::vector<double> work_;
+};
+
+TEST_F(ThresholdTest, Max) {
+  for (int trial = 0; trial < 200; trial++) {
+    const int n = 1 + rand() % 50;
+    const Eigen::VectorXd v = RandomVector(n, trial % 2);
+    const double lambda = trial % 10 == 0 ? 0 : 10.*rand()/RAND_MAX;
+    const double t = MaxThreshold(v, 0, lambda, &work_);
+    EXPECT_TRUE(VectorEquals(MaxProxSort(v, lambda), v.cwiseMin(t), 1e-10));
+  }
+}
+
+TEST_F(ThresholdTest, MaxEpigraph) {
+  for (int trial = 0; trial < 200; trial++) {
+    const int n = 1 + rand() % 50;
+    const Eigen::VectorXd v = RandomVector(n, trial % 2);
+    const double s = 4.*rand()/RAND_MAX - 2;
+    EXPECT_NEAR(MaxEpigraphSort(v, s), MaxThreshold(v, 1, -s, &work_), 1e-10);
+  }
+}
+
+TEST_F(ThresholdTest, SumLargest) {
+  for (int trial = 0; trial < 200; trial++) {
+    const int n = 1 + rand() % 50;
+    const Eigen::VectorXd v = RandomVector(n, trial % 2);
+    const double lambda = trial % 10 == 0 ? 0 : 2.*rand()/RAND_MAX;
+    const int k = 1 + rand() % n;
+    EXPECT_TRUE(VectorEquals(
+        SumLargestProxSort(v, lambda, k),
+        SumLargestProx(v, lambda, k, &work_), 1e-10));
+
+    std::vector<double> y(v.data(), v.data()+n);
+    std::sort(y.begin(), y.end(), std::greater<double>());
+    double sum = 0;
+    for (int i = 0; i < k; i++)
+      sum += y[i];
+    EXPECT_NEAR(sum, SumLargest(v, k, &work_), 1e-10);
+  }
+}
+
+TEST_F(ThresholdTest, Concurrent) {
+  // Pivots do not depend on shared state, so concurrent calls give exactly
+  // the same results as sequential ones
+  const int num_threads = 4;
+  std::vector<Eigen::VectorXd> v;
+  std::vector<double> expected;
+  for (int i = 0; i < num_threads; i++) {
+    v.push_back(RandomVector(1000, i % 2));
+    expected.push_back(MaxThreshold(v[i], 0, 1, &work_));
+  }
+
+  std::vector<double> actual(num_threads);
+  std::vector<std::thread> threads;
+  for (int i = 0; i < num_threads; i++) {
+    threads.emplace_back([&v, &actual, i]() {
+        std::vector<double> work;
+        for (int trial = 0; trial < 100; trial++)
+          actual[i] = MaxThreshold(v[i], 0, 1, &work);
+      });
+  }
+  for (std::thread& thread : threads)
+    thread.join();
+  for (int i = 0; i < num_threads; i++)
+    EXPECT_EQ(expected[i], actual[i]);
+}
@@ -1,6 +1,13 @@
 #include "epsilon/prox/vector_prox.h"
+
+#include <thread>
+
 #include "epsilon/vector/vector_util.h"
 
+// Minimum number of elements per thread for batched axis evaluation, threads
+// are created on each Apply() so this must be large enough to amortize that.
+const int kMinElementsPerThread = 50000;
+
 bool GetScalar(const BlockMatrix& A, double* alpha) {
   bool first = true;
   for (const auto& col_iter : A.data()) {
@@ -40,7 +47,7 @@ bool GetDiagonal(const BlockMatrix& A, Eigen::VectorXd* alpha) {
     if (first) {
       *alpha = alpha_i;
       first = false;
-    } else if (*alpha != alpha_i) {
+    } else if (alpha->rows() != alpha_i.rows() || *alpha != alpha_i) {
       return false;
     }
   }
@@ -134,6 +141,10 @@ void VectorProx::InitAxis(const ProxOperatorArg& arg) {
   prox_function_ = arg.prox_function();
   input_.prox_function_ = arg.prox_function();
   output_.prox_function_ = arg.prox_function();
+
+  num_threads_ = arg.params().num_threads();
+  if (num_threads_ <= 0)
+    num_threads_ = std::max(1U, std::thread::hardware_concurrency());
 }
 
 void VectorProx::PreProcessInput(const BlockVector& v) {
@@ -148,38 +159,62 @@ BlockVector VectorProx::Apply(const BlockVector& v) {
   PreProcessInput(v);
 
   if (prox_function_.has_axis()) {
-    const int n = prox_function_.arg_size_size();
-
-    // Set up inputs
-    input_.V_.resize(n);
-    output_.X_.resize(n);
-    if (prox_function_.has_axis()) {
-      for (int i = 0; i < n; i++) {
-        const Size& dims = prox_function_.arg_size(i);
-        input_.V_[i] = ToMatrix(
-            input_.v_(affine::arg_key(i)), dims.dim(0), dims.dim(1));
-        output_.X_[i] = Eigen::MatrixXd(dims.dim(0), dims.dim(1));
-      }
-    }
+    ApplyAxis();
+  } else {
+    ApplyVector(input_, &output_);
+  }
+
+  return PostProcessOutput(v);
+}
+
+void VectorProx::ApplyAxis() {
+  const int n = prox_function_.arg_size_size();
+  const bool transpose = prox_function_.axis() == 1;
+
+  // Set up inputs with each slice as a column
+  input_.V_.resize(n);
+  output_.X_.resize(n);
+  for (int i = 0; i < n; i++) {
+    const Size& dims = prox_function_.arg_size(i);
+    input_.V_[i] = ToMatrix(
+        input_.v_(affine::arg_key(i)), dims.dim(0), dims.dim(1));
+    if (transpose)
+      input_.V_[i].transposeInPlace();
+    output_.X_[i].resize(input_.V_[i].rows(), input_.V_[i].cols());
+  }
 
-    // Iterate over the other dimension
-    const Size& dims = prox_function_.arg_size(0);
-    const int k = dims.dim(1 - prox_function_.axis());
+  // Iterate over the other dimension
+  const int k = input_.V_[0].cols();
+  if (!batched() || input_.elementwise_) {
     for (int i = 0; i < k; i++) {
       input_.axis_iter_ = i;
       output_.axis_iter_ = i;
       ApplyVector(input_, &output_);
     }
-
-    // Copy outputs
-    for (int i = 0; i < n; i++) {
-      output_.x_(affine::arg_key(i)) = ToVector(output_.X_[i]);
-    }
   } else {
-    ApplyVector(input_, &output_);
+    const int max_threads = input_.V_[0].size()/kMinElementsPerThread;
+    const int num_threads = std::max(
+        1, std::min(num_threads_, std::min(k, max_threads)));
+    if (num_threads == 1) {
+      ApplyColumns(input_, 0, k, &output_);
+    } else {
+      std::vector<std::thread> threads;
+      for (int i = 0; i < num_threads; i++) {
+        threads.emplace_back(
+            &VectorProx::ApplyColumns, this, std::cref(input_),
+            k*i/num_threads, k*(i+1)/num_threads, &output_);
+      }
+      for (std::thread& thread : threads)
+        thread.join();
+    }
   }
 
-  return PostProcessOutput(v);
+  // Copy outputs
+  for (int i = 0; i < n; i++) {
+    if (transpose)
+      output_.X_[i].transposeInPlace();
+    output_.x_(affine::arg_key(i)) = ToVector(output_.X_[i]);
+  }
 }
 
 double VectorProxInput::lambda() const {
@@ -199,11 +234,7 @@ double VectorProxInput::value(int i) const {
 
 Eigen::VectorXd VectorProxInput::value_vec(int i) const {
   if (prox_function_.has_axis()) {
-    if (prox_function_.axis() == 0) {
-      return V_[i].col(axis_iter_);
-    } else {
-      return V_[i].row(axis_iter_);
-    }
+    return V_[i].col(axis_iter_);
   } else {
     return v_(affine::arg_key(i));
   }
@@ -223,11 +254,7 @@ void VectorProxOutput::set_value(int i, double x) {
 
 void VectorProxOutput::set_value(int i, const Eigen::VectorXd& x) {
   if (prox_function_.has_axis()) {
-    if (prox_function_.axis() == 0) {
-      X_[i].col(axis_iter_) = x;
-    } else {
-      X_[i].row(axis_iter_) = x;
-    }
+    X_[i].col(axis_iter_) = x;
   } else {
     x_(affine::arg_key(i)) = x;
   }
@@ -11,6 +11,9 @@ class VectorProxInput {
   double value(int i) const;
   Eigen::VectorXd value_vec(int i) const;
 
+  // Batched axis handling, each slice is a column
+  const Eigen::MatrixXd& value_mat(int i) const { return V_[i]; }
+
   void set_lambda(double lambda);
 
  private:
@@ -21,7 +24,7 @@ class VectorProxInput {
   double lambda_;
   BlockVector v_;
 
-  // Axis handling
+  // Axis handling, slices along either axis are stored as columns
   ProxFunction prox_function_;
   int axis_iter_;
   std::vector<Eigen::MatrixXd> V_;
@@ -35,6 +38,9 @@ class VectorProxOutput {
   double value(int i) const;
   const Eigen::VectorXd& value_vec(int i) const;
 
+  // Batched axis handling, each slice is a column
+  Eigen::MatrixXd* mutable_value_mat(int i) { return &X_[i]; }
+
  private:
   friend class VectorProx;
 
@@ -60,6 +66,20 @@ class VectorProx : public ProxOperator {
     throw "Eval not implemented.";
   };
 
+ protected:
+  // Batched evaluation along an axis, to be overridden by subclasses which
+  // return true from batched(). Applies the prox to columns [begin, end) of
+  // input.value_mat(i) writing the result to output->mutable_value_mat(i).
+  // This is called concurrently on disjoint column ranges, so must not modify
+  // any member state.
+  virtual bool batched() const { return false; }
+  virtual void ApplyColumns(
+      const VectorProxInput& input,
+      int begin, int end,
+      VectorProxOutput* output) {
+    LOG(FATAL) << "Not implemented";
+  }
+
  private:
   bool InitScalar(const ProxOperatorArg& arg);
   bool InitDiagonal(const ProxOperatorArg& arg);
@@ -67,6 +87,7 @@ class VectorProx : public ProxOperator {
 
   void PreProcessInput(const BlockVector& v);
   BlockVector PostProcessOutput(const BlockVector& v);
+  void ApplyAxis();
 
   BlockMatrix B_, C_, D_;
   BlockVector g_;
@@ -79,6 +100,7 @@ class VectorProx : public ProxOperator {
 
   // Axis handling
   ProxFunction prox_function_;
+  int num_threads_;
 };
 
 #endif  // EPSILON_PROX_VECTOR_H
@@ -0,0 +1,78 @@
+
+#include <gtest/gtest.h>
+
+#include "epsilon/linear/scalar_matrix_impl.h"
+#include "epsilon/prox/prox.h"
+#include "epsilon/vector/vector_testutil.h"
+#include "epsilon/vector/vector_util.h"
+
+class VectorProxTest : public testing::Test {
+ protected:
+  VectorProxTest() {
+    srand(0);
+  }
+
+  // Applies lam*||.||_2 along the given axis of a m x n matrix
+  Eigen::MatrixXd ApplyNorm2(
+      const Eigen::MatrixXd& V, double lam, int axis, int num_threads) {
+    const int m = V.rows();
+    const int n = V.cols();
+
+    ProxFunction f;
+    f.set_prox_function_type(ProxFunction::NORM_2);
+    f.set_alpha(lam);
+    f.set_has_axis(true);
+    f.set_axis(axis);
+    f.add_arg_size()->add_dim(m);
+    f.mutable_arg_size(0)->add_dim(n);
+
+    AffineOperator H, A;
+    H.A(affine::arg_key(0), "x") = linear_map::LinearMap(
+        new linear_map::ScalarMatrixImpl(m*n, 1));
+    A.A(affine::constraint_key(0), "x") = linear_map::LinearMap(
+        new linear_map::ScalarMatrixImpl(m*n, 1));
+
+    SolverParams params;
+    params.set_num_threads(num_threads);
+    DataMap data_map;
+    std::unique_ptr<ProxOperator> prox = CreateProxOperator(
+        ProxFunction::NORM_2, false);
+    prox->Init(ProxOperatorArg(f, data_map, H, A, params));
+
+    BlockVector v;
+    v(affine::constraint_key(0)) = ToVector(V);
+    return ToMatrix(prox->Apply(v)("x"), m, n);
+  }
+
+  // Reference computed one slice at a time
+  Eigen::MatrixXd Norm2Reference(
+      const Eigen::MatrixXd& V, double lam, int axis) {
+    Eigen::MatrixXd X = V;
+    if (axis == 1)
+      X.transposeInPlace();
+    for (int j = 0; j < X.cols(); j++)
+      X.col(j) *= std::max(0., 1 - lam/X.col(j).norm());
+    if (axis == 1)
+      X.transposeInPlace();
+    return X;
+  }
+};
+
+TEST_F(VectorProxTest, Norm2Axis) {
+  Eigen::MatrixXd V = Eigen::MatrixXd::Random(4, 10);
+  EXPECT_TRUE(MatrixEquals(
+      Norm2Reference(V, 0.5, 0), ApplyNorm2(V, 0.5, 0, 1), 1e-8));
+  EXPECT_TRUE(MatrixEquals(
+      Norm2Reference(V, 0.5, 1), ApplyNorm2(V, 0.5, 1, 1), 1e-8));
+}
+
+TEST_F(VectorProxTest, Norm2AxisThreads) {
+  // Large enough to be split across threads
+  Eigen::MatrixXd V = Eigen::MatrixXd::Random(3, 40000);
+  EXPECT_TRUE(MatrixEquals(
+      Norm2Reference(V, 0.5, 0), ApplyNorm2(V, 0.5, 0, 4), 1e-8));
+
+  Eigen::MatrixXd W = V.transpose();
+  EXPECT_TRUE(MatrixEquals(
+      Norm2Reference(W, 0.5, 1), ApplyNorm2(W, 0.5, 1, 0), 1e-8));
+}
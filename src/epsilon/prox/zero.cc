@@ -19,7 +19,7 @@ public:
     // [ A   0  -I ][ z ]   [ v ]
     BlockMatrix M = H + H.Transpose() + A + A.Transpose() - A.LeftIdentity();
     VLOG(2) << "M: " << M.DebugString();
-    chol_.Compute(M);
+    chol_.Compute(M, arg.precision() == SolverParams::SINGLE);
     b_ = -1*g;
     var_keys_ = H.col_keys();
   }
@@ -0,0 +1,69 @@
+
+#include "epsilon/util/benchmark_util.h"
+
+#include <stdlib.h>
+
+#include <algorithm>
+#include <atomic>
+#include <new>
+
+namespace {
+
+std::atomic<int64_t> num_allocs(0);
+std::atomic<int64_t> bytes_allocated(0);
+
+void CountAllocation(size_t size) {
+  num_allocs.fetch_add(1, std::memory_order_relaxed);
+  bytes_allocated.fetch_add(size, std::memory_order_relaxed);
+}
+
+}  // namespace
+
+int64_t NumAllocations() { return num_allocs.load(); }
+int64_t BytesAllocated() { return bytes_allocated.load(); }
+
+AllocationCounter::~AllocationCounter() {
+  const double iterations = std::max<double>(state_->iterations(), 1);
+  state_->counters["allocs"] = (NumAllocations() - num_allocs_)/iterations;
+  state_->counters["alloc_bytes"] =
+      (BytesAllocated() - bytes_allocated_)/iterations;
+}
+
+#ifdef __GLIBC__
+// With glibc we interpose malloc() directly so that allocations made by Eigen,
+// which bypasses operator new, are also counted.
+extern "C" {
+void* __libc_malloc(size_t size);
+void* __libc_calloc(size_t n, size_t size);
+void* __libc_realloc(void* ptr, size_t size);
+
+void* malloc(size_t size) {
+  CountAllocation(size);
+  return __libc_malloc(size);
+}
+
+void* calloc(size_t n, size_t size) {
+  CountAllocation(n*size);
+  return __libc_calloc(n, size);
+}
+
+void* realloc(void* ptr, size_t size) {
+  CountAllocation(size);
+  return __libc_realloc(ptr, size);
+}
+}  // extern "C"
+
+#else
+// Elsewhere we only see allocations made with operator new
+void* operator new(size_t size) {
+  CountAllocation(size);
+  void* ptr = malloc(size);
+  if (!ptr)
+    throw std::bad_alloc();
+  return ptr;
+}
+
+void operator delete(void* ptr) noexcept {
+  free(ptr);
+}
+#endif
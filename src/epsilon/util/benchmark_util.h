@@ -0,0 +1,31 @@
+// Utilities for google benchmark based microbenchmarks. Only linked into
+// benchmark binaries as it replaces the global allocator in order to count
+// heap allocations.
+
+#ifndef UTIL_BENCHMARK_UTIL_H
+#define UTIL_BENCHMARK_UTIL_H
+
+#include <stdint.h>
+
+#include <benchmark/benchmark.h>
+
+// Total number of heap allocations and bytes allocated by this process
+int64_t NumAllocations();
+int64_t BytesAllocated();
+
+// Counts heap allocations while in scope, reporting the number of allocations
+// and bytes allocated per iteration as counters on the benchmark state.
+class AllocationCounter {
+ public:
+  explicit AllocationCounter(benchmark::State* state)
+      : state_(state),
+        num_allocs_(NumAllocations()),
+        bytes_allocated_(BytesAllocated()) {}
+  ~AllocationCounter();
+
+ private:
+  benchmark::State* state_;
+  int64_t num_allocs_, bytes_allocated_;
+};
+
+#endif  // UTIL_BENCHMARK_UTIL_H
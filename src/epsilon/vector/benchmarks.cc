@@ -0,0 +1,108 @@
+#include <glog/logging.h>
+#include <benchmark/benchmark.h>
+
+#include "epsilon/linear/dense_matrix_impl.h"
+#include "epsilon/linear/linear_map.h"
+#include "epsilon/linear/sparse_matrix_impl.h"
+#include "epsilon/util/benchmark_util.h"
+#include "epsilon/util/string.h"
+#include "epsilon/vector/block_cholesky.h"
+#include "epsilon/vector/block_matrix.h"
+#include "epsilon/vector/block_vector.h"
+#include "epsilon/vector/vector_util.h"
+
+// Size of each block
+const int kBlockSize = 200;
+
+// Density of the sparse blocks
+const double kSparseDensity = 0.05;
+
+std::string BlockKey(const std::string& prefix, int i) {
+  return StringPrintf("%s:%d", prefix.c_str(), i);
+}
+
+// Constraint matrix with k row and column blocks, with dense blocks on the
+// diagonal and sparse blocks coupling adjacent variables, similar to that of
+// problems with several prox functions sharing variables.
+BlockMatrix CreateConstraintMatrix(int k) {
+  const int n = kBlockSize;
+  BlockMatrix A;
+  for (int i = 0; i < k; i++) {
+    A(BlockKey("c", i), BlockKey("x", i)) = linear_map::LinearMap(
+        new linear_map::DenseMatrixImpl(Eigen::MatrixXd::Random(n, n)));
+    if (i+1 < k) {
+      A(BlockKey("c", i), BlockKey("x", i+1)) = linear_map::LinearMap(
+          new linear_map::SparseMatrixImpl(
+              RandomSparse(n, n, kSparseDensity)));
+    }
+  }
+  return A;
+}
+
+BlockVector CreateVector(const std::set<std::string>& keys) {
+  BlockVector x;
+  for (const std::string& key : keys)
+    x(key) = Eigen::VectorXd::Random(kBlockSize);
+  return x;
+}
+
+// Bytes in the dense and sparse blocks of the constraint matrix
+int64_t ConstraintMatrixBytes(int k) {
+  const int n = kBlockSize;
+  return k*8*n*n + (k-1)*12*static_cast<int64_t>(kSparseDensity*n*n);
+}
+
+// Regularized normal equations [I A'; A -I] as factored by the ADMM solvers
+BlockMatrix CreateSystem(int k) {
+  BlockMatrix A = CreateConstraintMatrix(k);
+  return A + A.Transpose() + A.RightIdentity() - A.LeftIdentity();
+}
+
+void BM_BlockMatrixApply(benchmark::State& state) {
+  srand(0);
+  const int k = state.range(0);
+  BlockMatrix A = CreateConstraintMatrix(k);
+  BlockVector x = CreateVector(A.col_keys());
+  {
+    AllocationCounter counter(&state);
+    while (state.KeepRunning()) {
+      benchmark::DoNotOptimize(A*x);
+    }
+  }
+  state.SetBytesProcessed(state.iterations()*ConstraintMatrixBytes(k));
+}
+BENCHMARK(BM_BlockMatrixApply)->Arg(1)->Arg(10)->Arg(50);
+
+void BM_BlockCholeskyCompute(benchmark::State& state) {
+  srand(0);
+  const int k = state.range(0);
+  BlockMatrix M = CreateSystem(k);
+  {
+    AllocationCounter counter(&state);
+    while (state.KeepRunning()) {
+      BlockCholesky chol;
+      chol.Compute(M);
+    }
+  }
+  state.SetBytesProcessed(state.iterations()*2*ConstraintMatrixBytes(k));
+}
+BENCHMARK(BM_BlockCholeskyCompute)->Arg(1)->Arg(10);
+
+void BM_BlockCholeskySolve(benchmark::State& state) {
+  srand(0);
+  const int k = state.range(0);
+  BlockMatrix M = CreateSystem(k);
+  BlockCholesky chol;
+  chol.Compute(M);
+  BlockVector b = CreateVector(M.col_keys());
+  {
+    AllocationCounter counter(&state);
+    while (state.KeepRunning()) {
+      benchmark::DoNotOptimize(chol.Solve(b));
+    }
+  }
+  state.SetBytesProcessed(state.iterations()*2*ConstraintMatrixBytes(k));
+}
+BENCHMARK(BM_BlockCholeskySolve)->Arg(1)->Arg(10);
+
+BENCHMARK_MAIN();
@@ -1,5 +1,6 @@
 
 #include <limits>
+#include <mutex>
 
 #include "epsilon/vector/block_cholesky.h"
 
@@ -116,7 +117,45 @@ BlockVector BackSub(
   return b;
 }
 
-void BlockCholesky::Compute(BlockMatrix A) {
+// Factorizations which are currently in use, see BlockCholesky
+std::mutex kFactorizationsMutex;
+std::vector<std::weak_ptr<const BlockCholesky::Factorization>> kFactorizations;
+
+std::shared_ptr<const BlockCholesky::Factorization> FindFactorization(
+    const BlockMatrix& A, bool single_precision) {
+  std::lock_guard<std::mutex> l(kFactorizationsMutex);
+  std::shared_ptr<const BlockCholesky::Factorization> found;
+  auto iter = kFactorizations.begin();
+  while (iter != kFactorizations.end()) {
+    std::shared_ptr<const BlockCholesky::Factorization> factor = iter->lock();
+    if (!factor) {
+      iter = kFactorizations.erase(iter);
+      continue;
+    }
+    if (!found && factor->single_precision == single_precision &&
+        factor->A == A)
+      found = factor;
+    ++iter;
+  }
+  return found;
+}
+
+void AddFactorization(
+    std::shared_ptr<const BlockCholesky::Factorization> factor) {
+  std::lock_guard<std::mutex> l(kFactorizationsMutex);
+  kFactorizations.push_back(factor);
+}
+
+void BlockCholesky::Compute(BlockMatrix A, bool single_precision) {
+  factor_ptr_ = FindFactorization(A, single_precision);
+  if (factor_ptr_) {
+    VLOG(1) << "Reusing factorization";
+    return;
+  }
+
+  std::shared_ptr<Factorization> factor(new Factorization);
+  factor->A = A;
+  factor->single_precision = single_precision;
   const int n_cols = A.col_keys().size();
 
   for (int i = 0; i < n_cols; i++) {
@@ -124,14 +163,19 @@ void BlockCholesky::Compute(BlockMatrix A) {
     BlockMatrix Di_inv;
     Di_inv(key, key) = A(key, key).Inverse();
     BlockMatrix V = RemoveKey(&A, key);
-    L_ = L_ + V*Di_inv;
-    D_inv_ = D_inv_ + Di_inv;
+    factor->L = factor->L + V*Di_inv;
+    factor->D_inv = factor->D_inv + Di_inv;
     A = A - V*Di_inv*V.Transpose();
-    p_.push_back(key);
+    factor->p.push_back(key);
   }
-  LT_ = L_.Transpose();
+  if (single_precision)
+    factor->L = factor->L.SinglePrecision();
+  factor->LT = factor->L.Transpose();
+  factor_ptr_ = factor;
+  AddFactorization(factor_ptr_);
 }
 
 BlockVector BlockCholesky::Solve(const BlockVector& b) {
-  return BackSub(LT_, p_, D_inv_*ForwardSub(L_, p_, b));
+  const Factorization& f = *factor_ptr_;
+  return BackSub(f.LT, f.p, f.D_inv*ForwardSub(f.L, f.p, b));
 }
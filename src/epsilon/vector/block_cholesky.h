@@ -3,16 +3,36 @@
 #ifndef EPSILON_VECTOR_BLOCK_CHOLESKY_H
 #define EPSILON_VECTOR_BLOCK_CHOLESKY_H
 
+#include <memory>
+#include <vector>
+
 #include "epsilon/vector/block_matrix.h"
 
+// The factorization of a matrix is shared with any other BlockCholesky which
+// has computed it and is still alive. In particular, this avoids refactoring
+// the systems of prox operators which are re-initialized for a warm start
+// solve with unchanged data.
 class BlockCholesky {
  public:
-  void Compute(BlockMatrix A);
+  struct Factorization {
+    BlockMatrix A;
+    bool single_precision;
+    std::vector<std::string> p;
+    BlockMatrix D_inv, L, LT;
+  };
+
+  // With single_precision, the dense and sparse blocks of L are stored and
+  // applied in single precision, see linear_map::SinglePrecision(). The
+  // inverses of the diagonal blocks are kept in double precision.
+  void Compute(BlockMatrix A, bool single_precision = false);
   BlockVector Solve(const BlockVector& b);
 
+  std::shared_ptr<const Factorization> factor_ptr() const {
+    return factor_ptr_;
+  }
+
  private:
-  std::vector<std::string> p_;
-  BlockMatrix D_inv_, L_, LT_;
+  std::shared_ptr<const Factorization> factor_ptr_;
 };
 
 #endif  // EPSILON_VECTOR_BLOCK_CHOLESKY_H
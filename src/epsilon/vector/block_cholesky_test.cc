@@ -102,3 +102,63 @@ TEST(BlockCholesky, Basic) {
   EXPECT_TRUE(VectorEquals(x0.segment(0, 5), x("one"), 1e-8));
   EXPECT_TRUE(VectorEquals(x0.segment(5, 2), x("two"), 1e-8));
 }
+
+TEST(BlockCholesky, SinglePrecision) {
+  srand(0);
+  BlockMatrix A;
+  Eigen::MatrixXd A12 = Eigen::MatrixXd::Random(5, 2);
+  A("one", "one") = linear_map::Scalar(10, 5);
+  A("one", "two") = linear_map::LinearMap(new linear_map::DenseMatrixImpl(A12));
+  A("two", "one") = linear_map::LinearMap(
+      new linear_map::DenseMatrixImpl(A12.transpose()));
+  A("two", "two") = linear_map::Scalar(10, 2);
+
+  BlockVector b;
+  b("one") = Eigen::VectorXd::Random(5);
+  b("two") = Eigen::VectorXd::Random(2);
+
+  BlockCholesky chol, chol_single;
+  chol.Compute(A);
+  chol_single.Compute(A, true);
+  EXPECT_NE(chol.factor_ptr().get(), chol_single.factor_ptr().get());
+  BlockVector x = chol.Solve(b);
+  BlockVector x_single = chol_single.Solve(b);
+  EXPECT_TRUE(VectorEquals(x("one"), x_single("one"), 1e-6));
+  EXPECT_TRUE(VectorEquals(x("two"), x_single("two"), 1e-6));
+}
+
+TEST(BlockCholesky, SharedFactorization) {
+  srand(0);
+  Eigen::MatrixXd A12 = Eigen::MatrixXd::Random(5, 2);
+  auto build = [&A12](double alpha) {
+    BlockMatrix A;
+    A("one", "one") = linear_map::Scalar(alpha, 5);
+    A("one", "two") = linear_map::LinearMap(
+        new linear_map::DenseMatrixImpl(A12));
+    A("two", "one") = linear_map::LinearMap(
+        new linear_map::DenseMatrixImpl(A12.transpose()));
+    A("two", "two") = linear_map::Scalar(alpha, 2);
+    return A;
+  };
+
+  BlockVector b;
+  b("one") = Eigen::VectorXd::Random(5);
+  b("two") = Eigen::VectorXd::Random(2);
+
+  std::unique_ptr<BlockCholesky> chol1(new BlockCholesky);
+  BlockCholesky chol2, chol3;
+  chol1->Compute(build(10));
+  chol2.Compute(build(10));
+  chol3.Compute(build(20));
+  EXPECT_EQ(chol1->factor_ptr().get(), chol2.factor_ptr().get());
+  EXPECT_NE(chol1->factor_ptr().get(), chol3.factor_ptr().get());
+  BlockVector x = chol1->Solve(b);
+
+  // Only shared while in use
+  chol1.reset();
+  chol2 = BlockCholesky();
+  BlockCholesky chol4;
+  chol4.Compute(build(10));
+  EXPECT_TRUE(VectorEquals(x("one"), chol4.Solve(b)("one"), 1e-8));
+  EXPECT_TRUE(VectorEquals(x("two"), chol4.Solve(b)("two"), 1e-8));
+}
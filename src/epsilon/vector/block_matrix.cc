@@ -63,6 +63,18 @@ BlockMatrix BlockMatrix::Transpose() const {
   return transpose;
 }
 
+BlockMatrix BlockMatrix::SinglePrecision() const {
+  BlockMatrix single;
+  for (const auto& col_iter : data_) {
+    for (const auto& item_iter : col_iter.second) {
+      single.InsertOrAdd(
+          item_iter.first, col_iter.first,
+          linear_map::SinglePrecision(item_iter.second));
+    }
+  }
+  return single;
+}
+
 BlockMatrix BlockMatrix::Inverse() const {
   CHECK_EQ(m(), n()) << "Inverting non square matrix";
   BlockMatrix A_inv;
@@ -138,6 +150,26 @@ BlockMatrix operator-(const BlockMatrix& A, const BlockMatrix& B) {
   return A + (-1)*B;
 }
 
+bool operator==(const BlockMatrix& lhs, const BlockMatrix& rhs) {
+  if (lhs.data().size() != rhs.data().size())
+    return false;
+
+  for (const auto& col_iter : lhs.data()) {
+    auto rhs_col_iter = rhs.data().find(col_iter.first);
+    if (rhs_col_iter == rhs.data().end() ||
+        rhs_col_iter->second.size() != col_iter.second.size())
+      return false;
+
+    for (const auto& block_iter : col_iter.second) {
+      auto rhs_block_iter = rhs_col_iter->second.find(block_iter.first);
+      if (rhs_block_iter == rhs_col_iter->second.end() ||
+          !(rhs_block_iter->second == block_iter.second))
+        return false;
+    }
+  }
+  return true;
+}
+
 BlockMatrix operator*(double alpha, const BlockMatrix& A) {
   BlockMatrix C;
   for (const auto& col_iter : A.data_) {
@@ -52,6 +52,9 @@ class BlockMatrix {
   BlockMatrix Transpose() const;
   BlockMatrix Inverse() const;
 
+  // Converts each block with linear_map::SinglePrecision()
+  BlockMatrix SinglePrecision() const;
+
   // Returns a matrix such that IA = A or AI = A.
   BlockMatrix LeftIdentity() const;
   BlockMatrix RightIdentity() const;
@@ -83,4 +86,7 @@ BlockMatrix operator*(const BlockMatrix& A, double alpha);
 // Matrix-vector product
 BlockVector operator*(const BlockMatrix& lhs, const BlockVector& rhs);
 
+// Same keys with equal blocks
+bool operator==(const BlockMatrix& lhs, const BlockMatrix& rhs);
+
 #endif  // EPSILON_VECTOR_BLOCK_MATRIX_H
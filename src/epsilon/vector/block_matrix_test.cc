@@ -91,3 +91,21 @@ TEST_F(BlockMatrixTest, Inverse) {
   EXPECT_TRUE(VectorEquals(
       solver2.solve(b("0")), (AAT_inv*b)("0"), 1e-8));
 }
+
+TEST_F(BlockMatrixTest, Equals) {
+  BlockMatrix A, B;
+  A("0", "0") = linear_map::LinearMap(new linear_map::DenseMatrixImpl(A0_));
+  A("0", "1") = linear_map::LinearMap(new linear_map::SparseMatrixImpl(B0_));
+  B("0", "0") = linear_map::LinearMap(new linear_map::DenseMatrixImpl(A0_));
+  EXPECT_FALSE(A == B);
+  B("0", "1") = linear_map::LinearMap(new linear_map::SparseMatrixImpl(B0_));
+  EXPECT_TRUE(A == B);
+  B("1", "1") = linear_map::Identity(2);
+  EXPECT_FALSE(A == B);
+
+  SparseXd C0 = B0_;
+  C0.coeffRef(0,1) = 2;
+  BlockMatrix C = A;
+  C("0", "1") = linear_map::LinearMap(new linear_map::SparseMatrixImpl(C0));
+  EXPECT_FALSE(A == C);
+}
@@ -0,0 +1,175 @@
+#include "epsilon/vector/equilibrate.h"
+
+#include <glog/logging.h>
+
+#include "epsilon/linear/kronecker_product_impl.h"
+#include "epsilon/linear/selection_matrix_impl.h"
+#include "epsilon/linear/sparse_matrix_impl.h"
+#include "epsilon/vector/vector_util.h"
+
+namespace {
+
+// Updates row and col with the largest absolute values in each row and column
+// of diag(d)*A*diag(e).
+void MaxAbs(
+    const linear_map::LinearMap& A,
+    const Eigen::VectorXd& d,
+    const Eigen::VectorXd& e,
+    Eigen::VectorXd* row,
+    Eigen::VectorXd* col) {
+  const linear_map::LinearMapImpl& impl = A.impl();
+  switch (impl.type()) {
+    case linear_map::SCALAR_MATRIX:
+    case linear_map::DIAGONAL_MATRIX: {
+      const Eigen::VectorXd a =
+          linear_map::GetDiagonal(A).cwiseAbs().cwiseProduct(d).cwiseProduct(e);
+      *row = row->cwiseMax(a);
+      *col = col->cwiseMax(a);
+      break;
+    }
+    case linear_map::SPARSE_MATRIX: {
+      const SparseXd& S =
+          static_cast<const linear_map::SparseMatrixImpl&>(impl).sparse();
+      for (int j = 0; j < S.outerSize(); j++) {
+        for (SparseXd::InnerIterator iter(S, j); iter; ++iter) {
+          const double a = fabs(iter.value())*d(iter.row())*e(iter.col());
+          (*row)(iter.row()) = std::max((*row)(iter.row()), a);
+          (*col)(iter.col()) = std::max((*col)(iter.col()), a);
+        }
+      }
+      break;
+    }
+    case linear_map::SELECTION_MATRIX: {
+      const linear_map::SelectionMatrixImpl& S =
+          static_cast<const linear_map::SelectionMatrixImpl&>(impl);
+      for (int k = 0; k < S.rows()*S.cols(); k++) {
+        const int i = S.scatter() ? S.index(k) : k;
+        const int j = S.scatter() ? k : S.index(k);
+        const double a = fabs(S.alpha())*d(i)*e(j);
+        (*row)(i) = std::max((*row)(i), a);
+        (*col)(j) = std::max((*col)(j), a);
+      }
+      break;
+    }
+    case linear_map::KRONECKER_PRODUCT: {
+      // Scaling is uniform so the largest entries of A (x) B are the products
+      // of those of A and B.
+      const linear_map::KroneckerProductImpl& K =
+          static_cast<const linear_map::KroneckerProductImpl&>(impl);
+      const int mA = K.A().impl().m(), nA = K.A().impl().n();
+      const int mB = K.B().impl().m(), nB = K.B().impl().n();
+      Eigen::VectorXd rA = Eigen::VectorXd::Zero(mA);
+      Eigen::VectorXd cA = Eigen::VectorXd::Zero(nA);
+      Eigen::VectorXd rB = Eigen::VectorXd::Zero(mB);
+      Eigen::VectorXd cB = Eigen::VectorXd::Zero(nB);
+      MaxAbs(K.A(), Eigen::VectorXd::Ones(mA), Eigen::VectorXd::Ones(nA),
+             &rA, &cA);
+      MaxAbs(K.B(), Eigen::VectorXd::Ones(mB), Eigen::VectorXd::Ones(nB),
+             &rB, &cB);
+      const double alpha = d(0)*e(0);
+      for (int i = 0; i < mA; i++) {
+        row->segment(i*mB, mB) =
+            row->segment(i*mB, mB).cwiseMax(alpha*rA(i)*rB);
+      }
+      for (int j = 0; j < nA; j++) {
+        col->segment(j*nB, nB) =
+            col->segment(j*nB, nB).cwiseMax(alpha*cA(j)*cB);
+      }
+      break;
+    }
+    default: {
+      const Eigen::MatrixXd B =
+          d.asDiagonal()*impl.AsDense().cwiseAbs()*e.asDiagonal();
+      *row = row->cwiseMax(B.rowwise().maxCoeff());
+      *col = col->cwiseMax(B.colwise().maxCoeff().transpose());
+    }
+  }
+}
+
+// Scales s by 1/sqrt(norm), keeping the scaling within [min_scale,
+// 1/min_scale].
+void UpdateScaling(
+    const BlockVector& norm,
+    const std::set<std::string>& fixed_keys,
+    const std::set<std::string>& uniform_keys,
+    double min_scale,
+    BlockVector* s) {
+  for (const auto& iter : norm.data()) {
+    if (fixed_keys.find(iter.first) != fixed_keys.end())
+      continue;
+
+    Eigen::VectorXd norm_i = iter.second;
+    if (uniform_keys.find(iter.first) != uniform_keys.end())
+      norm_i.setConstant(norm_i.maxCoeff());
+
+    Eigen::VectorXd& s_i = (*s)(iter.first);
+    for (int j = 0; j < s_i.rows(); j++) {
+      if (norm_i(j) == 0)
+        continue;
+      s_i(j) = std::min(
+          std::max(s_i(j)/sqrt(norm_i(j)), min_scale), 1/min_scale);
+    }
+  }
+}
+
+}  // namespace
+
+void Equilibrate(
+    const BlockMatrix& A,
+    const std::set<std::string>& fixed_keys,
+    int iterations,
+    double min_scale,
+    BlockVector* d,
+    BlockVector* e) {
+  std::set<std::string> uniform_keys;
+  *d = BlockVector();
+  *e = BlockVector();
+  for (const auto& col_iter : A.data()) {
+    for (const auto& row_iter : col_iter.second) {
+      const linear_map::LinearMapImpl& impl = row_iter.second.impl();
+      if (impl.type() == linear_map::KRONECKER_PRODUCT) {
+        uniform_keys.insert(row_iter.first);
+        uniform_keys.insert(col_iter.first);
+      }
+      (*d)(row_iter.first) = Eigen::VectorXd::Ones(impl.m());
+      (*e)(col_iter.first) = Eigen::VectorXd::Ones(impl.n());
+    }
+  }
+
+  for (int k = 0; k < iterations; k++) {
+    BlockVector row_norm, col_norm;
+    for (const auto& iter : d->data())
+      row_norm(iter.first) = Eigen::VectorXd::Zero(iter.second.rows());
+    for (const auto& iter : e->data())
+      col_norm(iter.first) = Eigen::VectorXd::Zero(iter.second.rows());
+
+    for (const auto& col_iter : A.data()) {
+      for (const auto& row_iter : col_iter.second) {
+        MaxAbs(row_iter.second,
+               (*d)(row_iter.first),
+               (*e)(col_iter.first),
+               &row_norm(row_iter.first),
+               &col_norm(col_iter.first));
+      }
+    }
+
+    UpdateScaling(row_norm, fixed_keys, uniform_keys, min_scale, d);
+    UpdateScaling(col_norm, fixed_keys, uniform_keys, min_scale, e);
+  }
+
+  VLOG(2) << "d: " << d->DebugString();
+  VLOG(2) << "e: " << e->DebugString();
+}
+
+BlockMatrix ScalingMatrix(const BlockVector& d) {
+  BlockMatrix D;
+  for (const auto& iter : d.data()) {
+    const Eigen::VectorXd& d_i = iter.second;
+    if (d_i.rows() > 0 && (d_i.array() == d_i(0)).all()) {
+      D(iter.first, iter.first) = linear_map::Scalar(d_i(0), d_i.rows());
+    } else {
+      D(iter.first, iter.first) = linear_map::Diagonal(d_i);
+    }
+  }
+  return D;
+}
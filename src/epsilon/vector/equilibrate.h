@@ -0,0 +1,29 @@
+// Ruiz equilibration of a block matrix, computes diagonal scalings D and E so
+// that the rows and columns of D*A*E have approximately unit infinity norm.
+
+#ifndef EPSILON_VECTOR_EQUILIBRATE_H
+#define EPSILON_VECTOR_EQUILIBRATE_H
+
+#include <set>
+#include <string>
+
+#include "epsilon/vector/block_matrix.h"
+#include "epsilon/vector/block_vector.h"
+
+// Computes row scalings d, keyed by the row keys of A, and column scalings e,
+// keyed by the column keys. Row or column blocks with keys in fixed_keys keep
+// unit scaling and those adjacent to Kronecker product blocks are scaled
+// uniformly. The scalings are clamped to [min_scale, 1/min_scale].
+void Equilibrate(
+    const BlockMatrix& A,
+    const std::set<std::string>& fixed_keys,
+    int iterations,
+    double min_scale,
+    BlockVector* d,
+    BlockVector* e);
+
+// Diagonal block matrix with scaling d, blocks with uniform scaling are
+// represented as scalar matrices.
+BlockMatrix ScalingMatrix(const BlockVector& d);
+
+#endif  // EPSILON_VECTOR_EQUILIBRATE_H
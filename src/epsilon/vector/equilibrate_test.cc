@@ -0,0 +1,77 @@
+#include <gtest/gtest.h>
+
+#include "epsilon/linear/dense_matrix_impl.h"
+#include "epsilon/linear/kronecker_product_impl.h"
+#include "epsilon/linear/linear_map.h"
+#include "epsilon/linear/sparse_matrix_impl.h"
+#include "epsilon/vector/block_matrix.h"
+#include "epsilon/vector/equilibrate.h"
+#include "epsilon/vector/vector_testutil.h"
+#include "epsilon/vector/vector_util.h"
+
+class EquilibrateTest : public testing::Test {
+ protected:
+  EquilibrateTest() {
+    srand(0);
+
+    // Badly scaled columns, e.g. features with mixed units
+    Eigen::VectorXd s(4);
+    s << 1e-3, 1, 1e2, 1e4;
+    A0_ = Eigen::MatrixXd::Random(6, 4)*s.asDiagonal();
+    B0_ = Eigen::MatrixXd::Identity(6, 6);
+    A_("c", "x") = linear_map::LinearMap(new linear_map::DenseMatrixImpl(A0_));
+    A_("c", "y") = linear_map::LinearMap(new linear_map::SparseMatrixImpl(
+        (1e3*B0_).sparseView()));
+  }
+
+  Eigen::MatrixXd Scaled(const BlockVector& d, const BlockVector& e) {
+    Eigen::MatrixXd A(6, 10);
+    A << A0_, 1e3*B0_;
+    Eigen::VectorXd e_all(10);
+    e_all << e("x"), e("y");
+    return d("c").asDiagonal()*A*e_all.asDiagonal();
+  }
+
+  Eigen::MatrixXd A0_, B0_;
+  BlockMatrix A_;
+};
+
+TEST_F(EquilibrateTest, UnitNorms) {
+  BlockVector d, e;
+  Equilibrate(A_, {}, 20, 1e-6, &d, &e);
+  Eigen::MatrixXd A = Scaled(d, e).cwiseAbs();
+  EXPECT_TRUE(VectorEquals(
+      Eigen::VectorXd::Ones(6), A.rowwise().maxCoeff(), 1e-1));
+  EXPECT_TRUE(VectorEquals(
+      Eigen::VectorXd::Ones(10), A.colwise().maxCoeff().transpose(), 1e-1));
+}
+
+TEST_F(EquilibrateTest, FixedKeys) {
+  BlockVector d, e;
+  Equilibrate(A_, {"y"}, 20, 1e-6, &d, &e);
+  EXPECT_TRUE(VectorEquals(Eigen::VectorXd::Ones(6), e("y"), 1e-12));
+  EXPECT_EQ(linear_map::SCALAR_MATRIX,
+            ScalingMatrix(e)("y", "y").impl().type());
+  EXPECT_EQ(linear_map::DIAGONAL_MATRIX,
+            ScalingMatrix(e)("x", "x").impl().type());
+}
+
+TEST_F(EquilibrateTest, KroneckerUniform) {
+  BlockMatrix A;
+  A("c", "x") = linear_map::LinearMap(new linear_map::KroneckerProductImpl(
+      linear_map::LinearMap(new linear_map::DenseMatrixImpl(A0_)),
+      linear_map::Identity(3)));
+  BlockVector d, e;
+  Equilibrate(A, {}, 20, 1e-6, &d, &e);
+  EXPECT_TRUE(VectorEquals(
+      Eigen::VectorXd::Constant(18, d("c")(0)), d("c"), 1e-12));
+  EXPECT_TRUE(VectorEquals(
+      Eigen::VectorXd::Constant(12, e("x")(0)), e("x"), 1e-12));
+}
+
+TEST_F(EquilibrateTest, MinScale) {
+  BlockVector d, e;
+  Equilibrate(A_, {}, 20, 1e-1, &d, &e);
+  EXPECT_GE(e("x").minCoeff(), 1e-1);
+  EXPECT_LE(e("x").maxCoeff(), 1e1);
+}
@@ -0,0 +1,98 @@
+#include "epsilon/vector/subspace_iteration.h"
+
+#include <glog/logging.h>
+
+namespace {
+
+const int kKrylovDepth = 2;
+
+Eigen::MatrixXd Orthonormalize(const Eigen::MatrixXd& A) {
+  Eigen::HouseholderQR<Eigen::MatrixXd> qr(A);
+  return qr.householderQ()*Eigen::MatrixXd::Identity(
+      A.rows(), std::min(A.rows(), A.cols()));
+}
+
+}  // namespace
+
+void SubspaceIteration::InitSubspace(int n, int p) {
+  if (Q_.rows() == n && Q_.cols() == p)
+    return;
+
+  // Keep as much of the previous subspace as possible
+  Eigen::MatrixXd Q = Eigen::MatrixXd::Random(n, p);
+  if (Q_.rows() == n) {
+    const int p0 = std::min(p, static_cast<int>(Q_.cols()));
+    Q.leftCols(p0) = Q_.leftCols(p0);
+  }
+  Q_ = Orthonormalize(Q);
+}
+
+void SubspaceIteration::WarmStart(const Eigen::MatrixXd& Q) {
+  Q_ = Orthonormalize(Q);
+}
+
+bool SubspaceIteration::Compute(const Eigen::MatrixXd& A, int k, int p) {
+  const int n = A.cols();
+  CHECK_LE(k, p);
+  CHECK_LE(p, std::min(n, static_cast<int>(A.rows())));
+  if (symmetric_)
+    CHECK_EQ(A.rows(), n);
+
+  InitSubspace(n, p);
+  const double tol = tol_*std::max(A.norm(), 1e-12);
+
+  // Krylov subspace is [Q, BQ, ..., B^depth Q] where B = A or B = A'A
+  const int depth = std::max(1, std::min(
+      kKrylovDepth, std::min(n, static_cast<int>(A.rows()))/p - 1));
+  Eigen::MatrixXd K, AK, R;
+  for (iterations_ = 0; iterations_ < max_iterations_; iterations_++) {
+    K.resize(n, p*(depth+1));
+    K.leftCols(p) = Q_;
+    for (int j = 1; j <= depth; j++) {
+      Eigen::MatrixXd BKj = A*K.middleCols((j-1)*p, p);
+      if (!symmetric_)
+        BKj = A.transpose()*BKj;
+      K.middleCols(j*p, p) = Orthonormalize(BKj);
+    }
+    K = Orthonormalize(K);
+
+    // Rayleigh-Ritz on the Krylov subspace
+    AK = A*K;
+    if (symmetric_) {
+      Eigen::SelfAdjointEigenSolver<Eigen::MatrixXd> solver(K.transpose()*AK);
+      CHECK_EQ(solver.info(), Eigen::Success);
+      d_ = solver.eigenvalues().reverse().head(p);
+      const Eigen::MatrixXd W =
+          solver.eigenvectors().rowwise().reverse().leftCols(p);
+      U_ = K*W;
+      R = AK*W.leftCols(k) - U_.leftCols(k)*d_.head(k).asDiagonal();
+      Q_ = U_;
+    } else {
+      // Singular values from the eigen values of the (small) Gram matrix,
+      // accuracy is only lost for the trailing ones.
+      Eigen::SelfAdjointEigenSolver<Eigen::MatrixXd> solver(
+          AK.transpose()*AK);
+      CHECK_EQ(solver.info(), Eigen::Success);
+      d_ = solver.eigenvalues().reverse().head(p).cwiseMax(0).cwiseSqrt();
+      const Eigen::MatrixXd W =
+          solver.eigenvectors().rowwise().reverse().leftCols(p);
+      Eigen::VectorXd d_inv(p);
+      for (int i = 0; i < p; i++)
+        d_inv(i) = d_(i) > 0 ? 1/d_(i) : 0;
+      U_ = AK*W*d_inv.asDiagonal();
+      V_ = K*W;
+      R = A.transpose()*U_.leftCols(k) - V_.leftCols(k)*d_.head(k).asDiagonal();
+      Q_ = V_;
+    }
+
+    double res = 0;
+    for (int i = 0; i < k; i++)
+      res = std::max(res, R.col(i).norm());
+    VLOG(3) << "Subspace iteration " << iterations_ << ", res = " << res;
+    if (res <= tol) {
+      iterations_++;
+      return true;
+    }
+  }
+  return false;
+}
@@ -0,0 +1,50 @@
+// Computes the leading part of a symmetric eigenvalue decomposition or a
+// singular value decomposition with restarted block Krylov subspace iteration.
+// The subspace is kept between calls so that a sequence of nearby matrices,
+// e.g. the iterates of ADMM, can be decomposed with only a few iterations each.
+
+#ifndef EPSILON_VECTOR_SUBSPACE_ITERATION_H
+#define EPSILON_VECTOR_SUBSPACE_ITERATION_H
+
+#include <Eigen/Dense>
+
+class SubspaceIteration {
+ public:
+  // If symmetric, computes the largest algebraic eigenvalues of a symmetric
+  // matrix, otherwise the largest singular values.
+  SubspaceIteration(bool symmetric, int max_iterations = 10, double tol = 1e-6)
+      : symmetric_(symmetric),
+        max_iterations_(max_iterations),
+        tol_(tol),
+        iterations_(0) {}
+
+  // Computes the leading k values with a subspace of dimension p >= k, returns
+  // false if these have not converged to within tolerance. Values are sorted
+  // in decreasing order.
+  bool Compute(const Eigen::MatrixXd& A, int k, int p);
+
+  // Sets the initial subspace for the next call to Compute()
+  void WarmStart(const Eigen::MatrixXd& Q);
+
+  // Results, A ~= U*diag(d)*V'
+  const Eigen::VectorXd& d() const { return d_; }
+  const Eigen::MatrixXd& U() const { return U_; }
+  const Eigen::MatrixXd& V() const { return symmetric_ ? U_ : V_; }
+  int iterations() const { return iterations_; }
+
+ private:
+  void InitSubspace(int n, int p);
+
+  bool symmetric_;
+  int max_iterations_;
+  double tol_;
+  int iterations_;
+
+  // Orthonormal basis for the subspace, warm start for the next call
+  Eigen::MatrixXd Q_;
+
+  Eigen::VectorXd d_;
+  Eigen::MatrixXd U_, V_;
+};
+
+#endif  // EPSILON_VECTOR_SUBSPACE_ITERATION_H
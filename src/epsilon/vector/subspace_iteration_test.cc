@@ -0,0 +1,55 @@
+#include <gtest/gtest.h>
+
+#include "epsilon/vector/subspace_iteration.h"
+#include "epsilon/vector/vector_testutil.h"
+
+class SubspaceIterationTest : public testing::Test {
+ protected:
+  SubspaceIterationTest() {
+    srand(0);
+    // Low rank plus noise, so that the leading values are separated
+    Eigen::MatrixXd L = Eigen::MatrixXd::Random(60, 3);
+    Eigen::MatrixXd N = 1e-2*Eigen::MatrixXd::Random(60, 40);
+    A_ = L*Eigen::MatrixXd::Random(3, 40) + N;
+    S_ = L*L.transpose() - 0.5*Eigen::MatrixXd::Identity(60, 60);
+  }
+
+  Eigen::MatrixXd A_, S_;
+};
+
+TEST_F(SubspaceIterationTest, Symmetric) {
+  Eigen::SelfAdjointEigenSolver<Eigen::MatrixXd> solver(S_);
+  Eigen::VectorXd d = solver.eigenvalues().reverse();
+
+  SubspaceIteration subspace(true, 20, 1e-10);
+  ASSERT_TRUE(subspace.Compute(S_, 4, 8));
+  EXPECT_TRUE(VectorEquals(d.head(4), subspace.d().head(4), 1e-6));
+  const Eigen::MatrixXd U = subspace.U().leftCols(4);
+  EXPECT_TRUE(MatrixEquals(
+      S_*U, U*subspace.d().head(4).asDiagonal(), 1e-6));
+}
+
+TEST_F(SubspaceIterationTest, Singular) {
+  Eigen::JacobiSVD<Eigen::MatrixXd> svd(A_);
+  Eigen::VectorXd d = svd.singularValues();
+
+  SubspaceIteration subspace(false, 20, 1e-10);
+  ASSERT_TRUE(subspace.Compute(A_, 3, 6));
+  EXPECT_TRUE(VectorEquals(d.head(3), subspace.d().head(3), 1e-6));
+  const Eigen::MatrixXd U = subspace.U().leftCols(3);
+  const Eigen::MatrixXd V = subspace.V().leftCols(3);
+  EXPECT_TRUE(MatrixEquals(
+      A_*V, U*subspace.d().head(3).asDiagonal(), 1e-6));
+}
+
+TEST_F(SubspaceIterationTest, WarmStart) {
+  SubspaceIteration subspace(false, 20, 1e-10);
+  ASSERT_TRUE(subspace.Compute(A_, 3, 6));
+  const int iterations = subspace.iterations();
+
+  // Small perturbation converges immediately from the previous subspace
+  ASSERT_TRUE(subspace.Compute(
+      A_ + 1e-9*Eigen::MatrixXd::Random(60, 40), 3, 6));
+  EXPECT_EQ(1, subspace.iterations());
+  EXPECT_LE(subspace.iterations(), iterations);
+}
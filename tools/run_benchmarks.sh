@@ -1,22 +1,18 @@
 #!/bin/bash -eu
 #
-# Run Epsilon benchmarks using GNU parallel. 
+# Run Epsilon benchmarks in parallel, one worker process per core.
 
-benchmark="python -m epsilon.problems.benchmark"
+benchmark="python -m epopt.problems.benchmark"
 
 if [ $# -eq 1 ]; then
     names=$1
 else
-    names=$($benchmark --list-benchmarks)
+    names=$($benchmark --list-benchmarks | paste -sd, -)
 fi
-problems=$($benchmark --list-problems)
-time=3600
 
-# Epsilon is not multi-threaded (yet) but BLAS implementations used as a
-# backend to numpy can be.
-export OPENBLAS_NUM_THREADS=1
-
-parallel timelimit -t$time $benchmark \
-	 --benchmark {1} \
-	 --problem {2} \
-	 ::: $names ::: $problems
+# BLAS implementations used as a backend to numpy are pinned to a single
+# thread in each worker by the benchmark runner.
+$benchmark \
+    --benchmark $names \
+    --workers $(getconf _NPROCESSORS_ONLN) \
+    --timeout 3600
@@ -1,17 +1,8 @@
 #!/bin/bash -u
+#
+# Run Epsilon benchmarks one at a time, each in a separate worker process.
 
-cmd="python -m epsilon.problems.benchmark $*"
+cmd="python -m epopt.problems.benchmark $*"
 
-benchmarks=$($cmd --list-benchmarks)
-problems=$($cmd --list-problems)
-time=3600
-
-# Epsilon is not multi-threaded (yet) but BLAS implementations used as a
-# backend to numpy can be.
-export OPENBLAS_NUM_THREADS=1
-
-for problem in $problems; do
-    for benchmark in $benchmarks; do
-	timelimit -t$time $cmd --benchmark $benchmark --problem $problem
-    done
-done
+benchmarks=$($cmd --list-benchmarks | paste -sd, -)
+$cmd --benchmark $benchmarks --workers 1 --timeout 3600